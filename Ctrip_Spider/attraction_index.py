@@ -0,0 +1,142 @@
+"""
+地区景点索引模块
+按地区保存完整翻页得到的景点，内存中按景点ID和POI ID建立哈希索引，持久化到磁盘并按TTL过期
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+# 处理相对导入和绝对导入
+try:
+    from .config import ATTRACTION_INDEX_TTL
+except ImportError:
+    # 直接运行时使用绝对导入
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from Ctrip_Spider.config import ATTRACTION_INDEX_TTL
+
+
+class _DistrictIndex:
+    """单个地区的索引，by_id和by_poi_id指向同一批景点字典"""
+
+    def __init__(self, district_id: int, attractions: List[Dict], built_at: float, complete: bool = True):
+        self.district_id = district_id
+        self.attractions = attractions
+        self.built_at = built_at
+        self.complete = complete
+        self.by_id = {}
+        self.by_poi_id = {}
+        for attraction in attractions:
+            if attraction.get('id') not in ('', None):
+                self.by_id.setdefault(str(attraction['id']), attraction)
+            if attraction.get('poi_id') not in ('', None):
+                self.by_poi_id.setdefault(str(attraction['poi_id']), attraction)
+
+
+class AttractionIndex:
+    """按地区持久化的景点索引
+
+    每个地区一个JSON文件（{district_id}.json），保存构建时间和完整的景点列表；
+    首次访问时加载到内存并建立 景点ID -> 景点、POI ID -> 景点 两个哈希表，之后的查询不访问磁盘和网络。
+    超过ttl秒或翻页不完整的索引视为过期，由调用方重新翻页构建
+    """
+
+    def __init__(self, index_dir: str, ttl: float = ATTRACTION_INDEX_TTL):
+        """
+        初始化景点索引
+
+        Args:
+            index_dir: 索引目录
+            ttl: 索引有效期（秒）
+        """
+        self.index_dir = index_dir
+        self.ttl = ttl
+        self._districts: Dict[int, _DistrictIndex] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, district_id: int) -> str:
+        return os.path.join(self.index_dir, f'{district_id}.json')
+
+    def _load(self, district_id: int) -> Optional[_DistrictIndex]:
+        """获取地区索引，内存中没有时从磁盘加载（调用方持有锁）"""
+        index = self._districts.get(district_id)
+        if index is not None:
+            return index
+        try:
+            with open(self._path(district_id), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            index = _DistrictIndex(district_id, data['attractions'], float(data['built_at']),
+                                   bool(data.get('complete', True)))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        self._districts[district_id] = index
+        return index
+
+    def is_fresh(self, district_id: int) -> bool:
+        """地区索引是否存在、完整且未过期"""
+        with self._lock:
+            index = self._load(int(district_id))
+            return index is not None and index.complete and time.time() - index.built_at < self.ttl
+
+    def build(self, district_id: int, attractions: List[Dict], complete: bool = True):
+        """
+        用翻页得到的景点替换地区索引，并原子地写入磁盘
+
+        Args:
+            district_id: 地区ID
+            attractions: 该地区的全部景点
+            complete: 翻页是否完整，不完整的索引可以查询，但is_fresh始终为False
+        """
+        district_id = int(district_id)
+        index = _DistrictIndex(district_id, list(attractions), time.time(), complete)
+        data = {'district_id': district_id, 'built_at': index.built_at, 'complete': complete,
+                'attractions': index.attractions}
+        with self._lock:
+            os.makedirs(self.index_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=f'.{district_id}.', suffix='.tmp', dir=self.index_dir)
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(tmp_path, self._path(district_id))
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            self._districts[district_id] = index
+
+    def lookup(self, district_id: int, attraction_id) -> Optional[Dict]:
+        """
+        按景点ID或POI ID查找景点（不检查是否过期）
+
+        Args:
+            district_id: 地区ID
+            attraction_id: 景点ID或POI ID（整数或字符串）
+
+        Returns:
+            dict: 景点信息，索引不存在或未找到时返回None
+        """
+        key = str(attraction_id)
+        with self._lock:
+            index = self._load(int(district_id))
+            if index is None:
+                return None
+            return index.by_id.get(key) or index.by_poi_id.get(key)
+
+    def attractions(self, district_id: int) -> List[Dict]:
+        """地区索引中的全部景点，索引不存在时返回空列表"""
+        with self._lock:
+            index = self._load(int(district_id))
+            return list(index.attractions) if index else []
+
+    def invalidate(self, district_id: int):
+        """删除地区索引"""
+        district_id = int(district_id)
+        with self._lock:
+            self._districts.pop(district_id, None)
+            try:
+                os.remove(self._path(district_id))
+            except FileNotFoundError:
+                pass
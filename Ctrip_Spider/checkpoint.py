@@ -0,0 +1,79 @@
+"""
+爬取检查点模块
+按景点保存评论爬取进度（最后完成的页码、下一个序号、CSV字节偏移），中断后可从断点继续
+"""
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+
+class CheckpointStore:
+    """按景点保存爬取检查点，每个景点一个JSON文件
+
+    每次保存先写临时文件并fsync，再用os.replace原子替换，进程在任意时刻被中断，
+    磁盘上的检查点要么是旧版本要么是新版本，不会出现写了一半的文件
+    """
+
+    def __init__(self, checkpoint_dir: str):
+        """
+        初始化检查点存储
+
+        Args:
+            checkpoint_dir: 检查点目录
+        """
+        self.checkpoint_dir = checkpoint_dir
+        self._lock = threading.Lock()
+
+    def _path(self, poi_id: str) -> str:
+        return os.path.join(self.checkpoint_dir, f'{poi_id}.json')
+
+    def load(self, poi_id: str) -> Optional[Dict]:
+        """
+        读取景点的检查点
+
+        Returns:
+            dict: 检查点内容，不存在或已损坏时返回None
+        """
+        try:
+            with open(self._path(poi_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, poi_id: str, **state) -> Dict:
+        """
+        原子地写入景点的检查点
+
+        Args:
+            poi_id: 景点ID
+            **state: 检查点字段，如 last_page、row_index、byte_offset
+
+        Returns:
+            dict: 写入的检查点内容
+        """
+        checkpoint = dict(state, poi_id=poi_id, updated_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        path = self._path(poi_id)
+        with self._lock:
+            os.makedirs(self.checkpoint_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=f'.{poi_id}.', suffix='.tmp', dir=self.checkpoint_dir)
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(checkpoint, f, ensure_ascii=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        return checkpoint
+
+    def clear(self, poi_id: str):
+        """删除景点的检查点（爬取完成后调用）"""
+        try:
+            os.remove(self._path(poi_id))
+        except FileNotFoundError:
+            pass
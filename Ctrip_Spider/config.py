@@ -2,7 +2,7 @@
 爬虫配置文件
 用于统一管理反爬虫策略参数
 """
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
 # ==================== 延迟配置 ====================
 # 请求延迟范围（秒）
@@ -11,6 +11,27 @@ DELAY_RANGE: Tuple[float, float] = (1, 3)
 # 页面间额外延迟（秒）
 PAGE_DELAY: float = 1.0
 
+# ==================== 限速配置 ====================
+# 全局目标QPS（None表示按DELAY_RANGE的平均值换算）
+RATE_LIMIT_QPS: float = None
+
+# 令牌桶容量（允许的突发请求数）
+RATE_LIMIT_BURST: int = 1
+
+# 额外随机等待占平均间隔的比例（0~1），使请求间隔更自然
+RATE_LIMIT_JITTER: float = 0.2
+
+# 按接口的限速配置，格式: {'comments': (qps, burst), ...}
+# 可用接口名: 'search', 'list', 'detail', 'comments'
+ENDPOINT_RATE_LIMITS: Dict[str, Tuple[float, int]] = {}
+
+# 是否启用AIMD自适应限速（按接口和代理根据429/403/5xx、超时、延迟突增自动调整QPS）
+ADAPTIVE_RATE: bool = False
+
+# 自适应限速的QPS下限和上限
+ADAPTIVE_MIN_QPS: float = 0.05
+ADAPTIVE_MAX_QPS: float = 5.0
+
 # ==================== User-Agent配置 ====================
 # 是否启用User-Agent轮换
 USE_USER_AGENT_ROTATION: bool = True
@@ -43,6 +64,15 @@ PROXY_MAX_FAILS: int = 3
 # 代理测试URL
 PROXY_TEST_URL: str = "https://www.baidu.com"
 
+# 代理并发检查的最大线程数
+PROXY_CHECK_WORKERS: int = 20
+
+# 后台复检不活跃代理的间隔（秒）
+PROXY_REVALIDATE_INTERVAL: float = 300
+
+# 代理选取模式: 'random'、'round_robin' 或 'weighted'（按延迟和成功率加权），为None时与USER_AGENT_ROTATION_MODE相同
+PROXY_SELECTION_MODE: str = None
+
 # ==================== 请求配置 ====================
 # 请求超时时间（秒）
 REQUEST_TIMEOUT: int = 10
@@ -50,6 +80,27 @@ REQUEST_TIMEOUT: int = 10
 # 最大重试次数
 MAX_RETRIES: int = 3
 
+# 重试退避：首次重试的基础等待和单次等待上限（秒），按去相关抖动指数增长
+RETRY_BASE_DELAY: float = 0.5
+RETRY_MAX_DELAY: float = 30
+
+# 重试预算：重试请求数不超过首发请求数的比例，避免重试放大故障
+RETRY_BUDGET_RATIO: float = 0.1
+
+# 熔断：连续失败多少次后熔断，以及熔断冷却时间（秒）
+CIRCUIT_FAILURE_THRESHOLD: int = 5
+CIRCUIT_COOLDOWN: float = 30
+
+# ==================== 连接池配置 ====================
+# 每个会话缓存的主机连接池数量
+POOL_CONNECTIONS: int = 10
+
+# 每个主机保持的最大keep-alive连接数
+POOL_MAXSIZE: int = 10
+
+# 经代理访问时每个主机保持的最大连接数（None表示与POOL_MAXSIZE相同）
+PROXY_POOL_MAXSIZE: int = None
+
 # ==================== 日志配置 ====================
 # 日志目录
 LOG_DIR: str = "logs"
@@ -64,6 +115,45 @@ OUTPUT_DIR: str = "./Datasets"
 # CSV文件编码
 CSV_ENCODING: str = "utf-8-sig"
 
+# 评论CSV的写缓冲：累计多少行或距上次写出多少秒后写出到磁盘（检查点随写出推进）
+CSV_FLUSH_ROWS: int = 200
+CSV_FLUSH_INTERVAL: float = 5
+
+# SQLite存储：累计多少行或距上次提交多少秒后提交一次事务
+SQLITE_BATCH_SIZE: int = 500
+SQLITE_FLUSH_INTERVAL: float = 5
+
+# Parquet导出：压缩算法和单个行组的最大行数（每个行组只包含一个景点）
+PARQUET_COMPRESSION: str = "zstd"
+PARQUET_ROW_GROUP_SIZE: int = 100000
+
+# JSON Lines流式输出的fsync间隔（秒）
+JSONL_FSYNC_INTERVAL: float = 5
+
+# 地区景点索引（get_attraction_by_id使用）：索引目录、有效期（秒）和构建时翻页的并发数
+ATTRACTION_INDEX_DIR: str = "./Datasets/.attraction_index"
+ATTRACTION_INDEX_TTL: float = 7 * 24 * 3600
+ATTRACTION_INDEX_CONCURRENCY: int = 5
+
+# 接口响应缓存（景点详情和景点ID搜索）：缓存目录、按接口的有效期（秒）和总大小上限（字节）
+RESPONSE_CACHE_DIR: str = "./Datasets/.http_cache"
+RESPONSE_CACHE_TTLS: Dict[str, float] = {
+    'detail': 7 * 24 * 3600,
+    'search': 30 * 24 * 3600,
+}
+RESPONSE_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+
+# 批量搜索景点ID：关键词映射数据库路径、内存LRU容量和并发数（映射有效期同RESPONSE_CACHE_TTLS['search']）
+SIGHT_ID_MAP_PATH: str = "./Datasets/.sight_ids.db"
+SIGHT_ID_LRU_SIZE: int = 10000
+SIGHT_ID_CONCURRENCY: int = 5
+
+# 批量获取景点详情（get_details）的默认并发数
+DETAIL_CONCURRENCY: int = 5
+
+# 评论、景点详情和景点列表响应是否用msgspec按类型化结构解码（只解码用到的字段；未安装msgspec时自动使用json模块）
+TYPED_JSON_DECODE: bool = True
+
 # JSON文件缩进
 JSON_INDENT: int = 2
 
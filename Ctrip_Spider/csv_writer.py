@@ -0,0 +1,124 @@
+"""
+评论CSV写入模块
+每个景点文件保持一个长期打开的写入器，评论先进入内存缓冲，按行数或时间批量写出
+"""
+import csv
+import io
+import os
+import time
+from typing import Iterable, List, Optional
+
+# 处理相对导入和绝对导入
+try:
+    from .config import CSV_FLUSH_ROWS, CSV_FLUSH_INTERVAL
+except ImportError:
+    # 直接运行时使用绝对导入
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from Ctrip_Spider.config import CSV_FLUSH_ROWS, CSV_FLUSH_INTERVAL
+
+
+class BufferedCsvWriter:
+    """带写缓冲的CSV写入器
+
+    文件在整个爬取过程中只打开一次，每批行先格式化到内存缓冲，写出时一次write系统调用；
+    文件为空时在开头写入一次BOM（Excel据此识别UTF-8），追加到已有文件时不再写入。
+    写入器不加锁，同一文件只应由一个线程写入
+    """
+
+    def __init__(self, file_path: str, header: Optional[List[str]] = None, truncate: bool = False,
+                 flush_rows: int = CSV_FLUSH_ROWS, flush_interval: float = CSV_FLUSH_INTERVAL):
+        """
+        初始化写入器并打开文件
+
+        Args:
+            file_path: CSV文件路径
+            header: 表头，仅在文件为空时写入（立即写出到磁盘）
+            truncate: 是否清空已有文件
+            flush_rows: 缓冲累计多少行后写出
+            flush_interval: 距上次写出多少秒后写出
+        """
+        self.file_path = file_path
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self._file = open(file_path, 'w' if truncate else 'a', newline='', encoding='utf-8')
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+        self.rows = 0  # 打开以来接收的数据行数（含尚未写出的）
+        self.pending_rows = 0  # 缓冲中尚未写出的行数
+        self.flush_count = 0
+        self._last_flush = time.monotonic()
+
+        if self._file.tell() == 0:
+            self._file.write('\ufeff')
+            if header:
+                self._writer.writerow(header)
+            self.flush()
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def writerows(self, rows: Iterable[list]) -> int:
+        """
+        把一批行写入缓冲，要么整批写入要么不写入（中途出错时回退缓冲）
+
+        Returns:
+            int: 写入的行数
+        """
+        mark = self._buffer.tell()
+        count = 0
+        try:
+            for row in rows:
+                self._writer.writerow(row)
+                count += 1
+        except BaseException:
+            self._buffer.seek(mark)
+            self._buffer.truncate()
+            raise
+        self.rows += count
+        self.pending_rows += count
+        return count
+
+    def flush_due(self) -> bool:
+        """缓冲是否已达到行数或时间阈值"""
+        return self.pending_rows > 0 and (
+            self.pending_rows >= self.flush_rows or time.monotonic() - self._last_flush >= self.flush_interval)
+
+    def flush(self):
+        """把缓冲写出到磁盘"""
+        data = self._buffer.getvalue()
+        if data:
+            self._file.write(data)
+            self._buffer.seek(0)
+            self._buffer.truncate()
+        self._file.flush()
+        self.pending_rows = 0
+        self.flush_count += 1
+        self._last_flush = time.monotonic()
+
+    def tell(self) -> int:
+        """已写出到磁盘的字节数（不含缓冲）"""
+        return self._file.tell()
+
+    def discard(self):
+        """丢弃尚未写出的缓冲"""
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self.rows -= self.pending_rows
+        self.pending_rows = 0
+
+    def close(self):
+        """写出缓冲并关闭文件"""
+        if self._file.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
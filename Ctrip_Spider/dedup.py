@@ -0,0 +1,315 @@
+"""
+评论去重索引模块
+按 (景点ID, 评论ID) 持久化记录已保存的评论，跨页、跨次运行过滤重复评论
+"""
+import math
+import os
+import struct
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Optional
+
+_MASK64 = (1 << 64) - 1
+
+
+def _mix64(x: int) -> int:
+    """splitmix64混淆，把相邻的评论ID打散到整个64位空间"""
+    x = (x + 0x9E3779B97F4A7C15) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+def _to_native(ids: array) -> array:
+    """磁盘上统一使用小端序"""
+    if sys.byteorder == 'big':
+        ids.byteswap()
+    return ids
+
+
+class BloomFilter:
+    """64位整数的布隆过滤器，按容量和误判率确定位数和哈希次数"""
+
+    # 文件头: 已覆盖的ID数, 容量, 位数, 哈希次数
+    HEADER = struct.Struct('<QQQI')
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        """
+        初始化布隆过滤器
+
+        Args:
+            capacity: 预计容纳的ID数
+            error_rate: 达到容量时的误判率
+        """
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.num_bits = max(64, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.covered = 0  # 已加入的ID数（对应ID日志的前缀长度）
+
+    def _positions(self, value: int):
+        h1 = _mix64(value)
+        h2 = _mix64(h1) | 1
+        num_bits = self.num_bits
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % num_bits
+
+    def add(self, value: int):
+        bits = self.bits
+        for pos in self._positions(value):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.covered += 1
+
+    def might_contain(self, value: int) -> bool:
+        bits = self.bits
+        for pos in self._positions(value):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def to_bytes(self) -> bytes:
+        return self.HEADER.pack(self.covered, self.capacity, self.num_bits, self.num_hashes) + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Optional['BloomFilter']:
+        """从文件内容恢复，格式不符时返回None"""
+        if len(data) < cls.HEADER.size:
+            return None
+        covered, capacity, num_bits, num_hashes = cls.HEADER.unpack_from(data)
+        bits = data[cls.HEADER.size:]
+        if len(bits) != (num_bits + 7) // 8:
+            return None
+        bloom = cls.__new__(cls)
+        bloom.capacity = capacity
+        bloom.error_rate = None
+        bloom.num_bits = num_bits
+        bloom.num_hashes = num_hashes
+        bloom.bits = bytearray(bits)
+        bloom.covered = covered
+        return bloom
+
+
+class _PoiIds:
+    """单个景点的去重状态"""
+
+    def __init__(self, bloom: BloomFilter, count: int):
+        self.bloom = bloom
+        self.count = count  # ID日志中的ID数
+        self.exact = None  # 按需加载的有序ID数组
+        self.pending = set()  # 加载有序数组之后新增的ID
+        self.dirty = False  # 布隆过滤器是否需要写回磁盘
+
+
+class CommentDedupIndex:
+    """持久化的评论去重索引
+
+    每个景点两个文件：
+    - {poi_id}.ids: 只追加的ID日志（小端uint64），每条评论8字节，是精确的后备存储
+    - {poi_id}.bloom: 覆盖ID日志前缀的布隆过滤器（约1.2字节/条，误判率1%）
+
+    查询先查布隆过滤器（O(1)，内存中只常驻这一部分），绝大多数新评论在这一步即可判定；
+    只有布隆过滤器命中时才加载有序ID数组做二分确认。1亿条评论的索引约占0.9GB磁盘，
+    内存中只有正在爬取的景点
+    """
+
+    def __init__(self, index_dir: str, error_rate: float = 0.01, initial_capacity: int = 4096):
+        """
+        初始化去重索引
+
+        Args:
+            index_dir: 索引目录
+            error_rate: 布隆过滤器误判率（误判只会多一次精确查询，不会误删评论）
+            initial_capacity: 新景点布隆过滤器的初始容量，超出后按4倍扩容重建
+        """
+        self.index_dir = index_dir
+        self.error_rate = error_rate
+        self.initial_capacity = initial_capacity
+        self._pois: Dict[str, _PoiIds] = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _to_int(comment_id) -> Optional[int]:
+        try:
+            value = int(comment_id)
+        except (TypeError, ValueError):
+            return None
+        return value if 0 <= value <= _MASK64 else None
+
+    def _ids_path(self, poi_id: str) -> str:
+        return os.path.join(self.index_dir, f'{poi_id}.ids')
+
+    def _bloom_path(self, poi_id: str) -> str:
+        return os.path.join(self.index_dir, f'{poi_id}.bloom')
+
+    def _read_ids(self, poi_id: str, start: int = 0) -> array:
+        """读取ID日志中从第start条开始的ID"""
+        ids = array('Q')
+        try:
+            with open(self._ids_path(poi_id), 'rb') as f:
+                f.seek(start * 8)
+                data = f.read()
+        except FileNotFoundError:
+            return ids
+        ids.frombytes(data[:len(data) // 8 * 8])
+        return _to_native(ids)
+
+    def _build_bloom(self, poi_id: str, capacity: int) -> BloomFilter:
+        bloom = BloomFilter(capacity, self.error_rate)
+        for value in self._read_ids(poi_id):
+            bloom.add(value)
+        return bloom
+
+    def _entry(self, poi_id: str) -> _PoiIds:
+        """获取景点的去重状态，首次访问时从磁盘加载（调用方持有锁）"""
+        entry = self._pois.get(poi_id)
+        if entry is not None:
+            return entry
+
+        try:
+            count = os.path.getsize(self._ids_path(poi_id)) // 8
+        except FileNotFoundError:
+            count = 0
+        bloom = None
+        try:
+            with open(self._bloom_path(poi_id), 'rb') as f:
+                bloom = BloomFilter.from_bytes(f.read())
+        except FileNotFoundError:
+            pass
+
+        dirty = False
+        if bloom is None or bloom.covered > count or count > bloom.capacity:
+            # 没有布隆过滤器、日志被截断或容量不足时从日志重建
+            bloom = self._build_bloom(poi_id, max(self.initial_capacity, count * 4))
+            dirty = True
+        elif bloom.covered < count:
+            # 上次退出前没来得及写回，补上日志尾部的ID
+            for value in self._read_ids(poi_id, bloom.covered):
+                bloom.add(value)
+            dirty = True
+
+        entry = self._pois[poi_id] = _PoiIds(bloom, count)
+        entry.dirty = dirty
+        return entry
+
+    def contains(self, poi_id: str, comment_id) -> bool:
+        """
+        评论是否已记录
+
+        Args:
+            poi_id: 景点ID
+            comment_id: 评论ID（无法转换为整数的ID视为未记录）
+
+        Returns:
+            bool: 是否已记录
+        """
+        value = self._to_int(comment_id)
+        if value is None:
+            return False
+        with self._lock:
+            entry = self._entry(str(poi_id))
+            if not entry.bloom.might_contain(value):
+                return False
+            if entry.exact is None:
+                entry.exact = array('Q', sorted(self._read_ids(str(poi_id))))
+            exact = entry.exact
+            index = bisect_left(exact, value)
+            return (index < len(exact) and exact[index] == value) or value in entry.pending
+
+    def add_many(self, poi_id: str, comment_ids: Iterable):
+        """
+        记录一批评论ID（应在评论写入CSV之后调用，中途崩溃最多留下重复而不会丢评论）
+
+        Args:
+            poi_id: 景点ID
+            comment_ids: 评论ID列表
+        """
+        values = [v for v in (self._to_int(c) for c in comment_ids) if v is not None]
+        if not values:
+            return
+        poi_id = str(poi_id)
+        with self._lock:
+            entry = self._entry(poi_id)
+            os.makedirs(self.index_dir, exist_ok=True)
+            with open(self._ids_path(poi_id), 'ab') as f:
+                f.write(_to_native(array('Q', values)).tobytes())
+            entry.count += len(values)
+            if entry.count > entry.bloom.capacity:
+                entry.bloom = self._build_bloom(poi_id, entry.count * 4)
+            else:
+                for value in values:
+                    entry.bloom.add(value)
+            if entry.exact is not None:
+                entry.pending.update(values)
+            entry.dirty = True
+
+    def count(self, poi_id: str) -> int:
+        """景点已记录的评论数"""
+        with self._lock:
+            return self._entry(str(poi_id)).count
+
+    def truncate(self, poi_id: str, count: int):
+        """把景点的ID日志截断到前count条（与检查点回退到一致的位置）"""
+        poi_id = str(poi_id)
+        with self._lock:
+            if self._entry(poi_id).count <= count:
+                return
+            with open(self._ids_path(poi_id), 'r+b') as f:
+                f.truncate(count * 8)
+            # 布隆过滤器无法删除元素，丢弃后下次访问时从日志重建
+            self._pois.pop(poi_id, None)
+            self._remove(self._bloom_path(poi_id))
+
+    def reset(self, poi_id: str):
+        """清空景点的去重记录（重新爬取并覆盖CSV时调用）"""
+        poi_id = str(poi_id)
+        with self._lock:
+            self._pois.pop(poi_id, None)
+            self._remove(self._ids_path(poi_id))
+            self._remove(self._bloom_path(poi_id))
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def flush(self, poi_id: str = None):
+        """把布隆过滤器写回磁盘（原子替换），poi_id为None时写回所有景点"""
+        with self._lock:
+            poi_ids = [str(poi_id)] if poi_id is not None else list(self._pois)
+            for key in poi_ids:
+                entry = self._pois.get(key)
+                if entry is None or not entry.dirty:
+                    continue
+                os.makedirs(self.index_dir, exist_ok=True)
+                tmp_path = self._bloom_path(key) + '.tmp'
+                with open(tmp_path, 'wb') as f:
+                    f.write(entry.bloom.to_bytes())
+                os.replace(tmp_path, self._bloom_path(key))
+                entry.dirty = False
+
+    def release(self, poi_id: str):
+        """写回并释放景点的内存状态（景点爬取结束后调用）"""
+        with self._lock:
+            self.flush(poi_id)
+            self._pois.pop(str(poi_id), None)
+
+    def close(self):
+        """写回所有景点并释放内存"""
+        with self._lock:
+            self.flush()
+            self._pois.clear()
+
+    def get_stats(self) -> Dict:
+        """获取已加载景点的统计"""
+        with self._lock:
+            return {
+                'loaded_pois': len(self._pois),
+                'ids': sum(entry.count for entry in self._pois.values()),
+                'bloom_bytes': sum(len(entry.bloom.bits) for entry in self._pois.values()),
+                'exact_loaded': sum(1 for entry in self._pois.values() if entry.exact is not None)
+            }
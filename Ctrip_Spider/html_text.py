@@ -0,0 +1,103 @@
+"""
+HTML转纯文本模块
+用标准库的流式HTML解析器直接收集文本，不构建文档树，结果与
+' '.join(BeautifulSoup(html, 'html.parser').get_text().split()) 一致
+"""
+import re
+from html.parser import HTMLParser
+from typing import List
+
+from bs4.builder import HTMLTreeBuilder
+from bs4.dammit import EntitySubstitution, UnicodeDammit
+
+# BeautifulSoup的get_text不包含这些标签内的文本（script、style、template、rt、rp）
+HIDDEN_TEXT_TAGS = frozenset(HTMLTreeBuilder.DEFAULT_STRING_CONTAINERS)
+# 空元素标签（br、img等）打开后立即关闭，不会包含文本
+VOID_TAGS = frozenset(HTMLTreeBuilder.DEFAULT_EMPTY_ELEMENT_TAGS)
+
+_DECIMAL_REFERENCE = re.compile(r'^([0-9]+)(.*)')
+_HEX_REFERENCE = re.compile(r'^([0-9a-f]+)(.*)')
+
+
+def _numeric_reference(name: str) -> str:
+    """数字字符引用转为字符，分号缺失时引用之后的内容按普通文本保留（与BeautifulSoup一致）"""
+    base, pattern = 10, _DECIMAL_REFERENCE
+    if name[:1] in ('x', 'X'):
+        name, base, pattern = name[1:], 16, _HEX_REFERENCE
+    try:
+        return UnicodeDammit.numeric_character_reference(int(name, base))[0]
+    except ValueError:
+        match = pattern.search(name)
+        if match is None:
+            return name
+        return UnicodeDammit.numeric_character_reference(int(match.group(1), base))[0] + match.group(2)
+
+
+class _TextExtractor(HTMLParser):
+    """只收集可见文本的解析器
+
+    记录打开的标签栈，结束标签按BeautifulSoup的规则关闭到最近的同名标签；
+    位于HIDDEN_TEXT_TAGS内的文本、注释、声明和处理指令都不收集
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.parts: List[str] = []
+        self.stack: List[str] = []
+        self.hidden = 0  # 栈中HIDDEN_TEXT_TAGS标签的个数
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            return
+        self.stack.append(tag)
+        if tag in HIDDEN_TEXT_TAGS:
+            self.hidden += 1
+
+    def handle_startendtag(self, tag, attrs):
+        # <tag/> 打开后立即关闭
+        pass
+
+    def handle_endtag(self, tag):
+        stack = self.stack
+        if tag not in stack:
+            return
+        while True:
+            name = stack.pop()
+            if name in HIDDEN_TEXT_TAGS:
+                self.hidden -= 1
+            if name == tag:
+                return
+
+    def handle_data(self, data):
+        if not self.hidden:
+            self.parts.append(data)
+
+    def handle_entityref(self, name):
+        self.handle_data(EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name, '&' + name))
+
+    def handle_charref(self, name):
+        self.handle_data(_numeric_reference(name))
+
+    def unknown_decl(self, data):
+        # CDATA段总是按文本收集（BeautifulSoup中即使位于script等标签内也保持CData类型），其他声明忽略
+        if data.upper().startswith('CDATA['):
+            self.parts.append(data[len('CDATA['):])
+
+
+def html_to_text(markup: str) -> str:
+    """
+    提取HTML中的文本并把连续空白合并为一个空格
+
+    Args:
+        markup: HTML片段
+
+    Returns:
+        str: 纯文本
+    """
+    if '<' not in markup and '&' not in markup:
+        # 没有标签和字符引用时解析结果就是原文
+        return ' '.join(markup.split())
+    parser = _TextExtractor()
+    parser.feed(markup)
+    parser.close()
+    return ' '.join(''.join(parser.parts).split())
@@ -0,0 +1,113 @@
+"""
+JSON Lines流式输出模块
+每条记录一行JSON，按页追加写出并定期fsync，爬取过程中下游任务即可逐行读取
+"""
+import json
+import os
+import time
+from typing import Dict, Iterable, Iterator
+
+# 处理相对导入和绝对导入
+try:
+    from .config import JSONL_FSYNC_INTERVAL
+except ImportError:
+    # 直接运行时使用绝对导入
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from Ctrip_Spider.config import JSONL_FSYNC_INTERVAL
+
+
+class JsonlWriter:
+    """JSON Lines写入器
+
+    每批记录拼成一个字符串后一次写出并flush，文件中只会出现完整的行（崩溃时最多留下最后一行的一部分，
+    读取时跳过）；距上次fsync超过fsync_interval秒时fsync，断电最多丢失这段时间内的数据
+    """
+
+    def __init__(self, file_path: str, append: bool = False, fsync_interval: float = JSONL_FSYNC_INTERVAL):
+        """
+        初始化写入器并打开文件
+
+        Args:
+            file_path: 输出文件路径
+            append: 是否追加到已有文件（否则清空）
+            fsync_interval: fsync间隔（秒），为0时每批都fsync
+        """
+        self.file_path = file_path
+        self.fsync_interval = fsync_interval
+        directory = os.path.dirname(os.path.abspath(file_path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(file_path, 'a' if append else 'w', encoding='utf-8')
+        self._last_fsync = time.monotonic()
+        self.records_written = 0
+
+    def write_records(self, records: Iterable[Dict]) -> int:
+        """
+        写出一批记录
+
+        Returns:
+            int: 写出的记录数
+        """
+        lines = [json.dumps(record, ensure_ascii=False) + '\n' for record in records]
+        if not lines:
+            return 0
+        self._file.write(''.join(lines))
+        self._file.flush()
+        self.records_written += len(lines)
+        if time.monotonic() - self._last_fsync >= self.fsync_interval:
+            self.sync()
+        return len(lines)
+
+    def sync(self):
+        """把已写出的数据fsync到磁盘"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._last_fsync = time.monotonic()
+
+    def close(self):
+        """fsync并关闭文件"""
+        if self._file.closed:
+            return
+        try:
+            self.sync()
+        finally:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_jsonl(file_path: str, follow: bool = False, idle_timeout: float = 30.0,
+               poll_interval: float = 0.5) -> Iterator[Dict]:
+    """
+    逐行读取JSON Lines文件，只产出完整的行，可在写入过程中读取
+
+    Args:
+        file_path: 文件路径
+        follow: 读到文件末尾后是否继续等待新写入的行（类似 tail -f）
+        idle_timeout: follow模式下超过多少秒没有新数据时结束
+        poll_interval: follow模式下的轮询间隔（秒）
+
+    Yields:
+        dict: 每行解析出的记录
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        partial = ''
+        idle_since = time.monotonic()
+        while True:
+            line = f.readline()
+            if line:
+                partial += line
+                if not partial.endswith('\n'):
+                    continue
+                text, partial = partial.strip(), ''
+                idle_since = time.monotonic()
+                if text:
+                    yield json.loads(text)
+            elif follow and time.monotonic() - idle_since < idle_timeout:
+                time.sleep(poll_interval)
+            else:
+                return
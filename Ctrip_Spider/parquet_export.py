@@ -0,0 +1,317 @@
+"""
+评论数据列式导出模块
+把评论CSV（或爬取中的评论）写成带类型、压缩的Parquet文件，每个行组只包含一个景点的评论
+
+依赖pyarrow（可选）: pip install pyarrow
+"""
+import csv
+import glob
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# 处理相对导入和绝对导入
+try:
+    from .log import CtripSpiderLogger
+    from .config import PARQUET_COMPRESSION, PARQUET_ROW_GROUP_SIZE
+except ImportError:
+    # 直接运行时使用绝对导入
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from Ctrip_Spider.log import CtripSpiderLogger
+    from Ctrip_Spider.config import PARQUET_COMPRESSION, PARQUET_ROW_GROUP_SIZE
+
+
+# 列名及类型，顺序与评论CSV一致（CSV的序号列不导出）
+COMMENT_COLUMNS = (
+    ('poi_id', 'int64'),
+    ('poi_name', 'string'),
+    ('comment_id', 'int64'),
+    ('user_nick', 'string'),
+    ('score', 'float64'),
+    ('content', 'string'),
+    ('publish_time', 'timestamp'),
+    ('useful_count', 'int32'),
+    ('reply_count', 'int32'),
+    ('tourist_type', 'string'),
+    ('ip_location', 'string'),
+    ('time_duration', 'string'),
+    ('image_count', 'int32'),
+    ('image_urls', 'list'),
+    ('scenery_score', 'float64'),
+    ('fun_score', 'float64'),
+    ('value_score', 'float64'),
+    ('recommend_items', 'list'),
+)
+# 评论字典（CtripCommentSpider._get_page_comments的结果）中对应的键
+COMMENT_KEYS = (
+    'commentId', 'userNick', 'score', 'content', 'publishTime', 'usefulCount', 'replyCount',
+    'touristTypeDisplay', 'ipLocatedName', 'timeDuration', 'imageCount', 'imageUrls',
+    'sceneryScore', 'funScore', 'valueScore', 'recommendItems'
+)
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Parquet导出需要pyarrow，请先安装: pip install pyarrow")
+
+
+def comment_schema():
+    """评论表的Arrow schema"""
+    _require_pyarrow()
+    types = {
+        'int64': pa.int64(),
+        'int32': pa.int32(),
+        'float64': pa.float64(),
+        'string': pa.string(),
+        # Parquet不支持秒精度的时间戳，写入时会被转换为毫秒，这里直接声明为毫秒，保证schema与文件一致
+        'timestamp': pa.timestamp('ms'),
+        'list': pa.list_(pa.string()),
+    }
+    return pa.schema([pa.field(name, types[kind]) for name, kind in COMMENT_COLUMNS])
+
+
+def _to_int(value) -> Optional[int]:
+    if value in ('', None):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        try:
+            return int(float(value))
+        except (TypeError, ValueError):
+            return None
+
+
+def _to_float(value) -> Optional[float]:
+    if value in ('', None):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_timestamp(value) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d %H:%M:%S')
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_list(value) -> List[str]:
+    """分号分隔的字符串转为列表"""
+    if isinstance(value, list):
+        return value
+    return [item for item in value.split(';') if item] if value else []
+
+
+_CONVERTERS = {
+    'int64': _to_int,
+    'int32': _to_int,
+    'float64': _to_float,
+    'string': lambda value: '' if value is None else str(value),
+    'timestamp': _to_timestamp,
+    'list': _to_list,
+}
+
+
+def convert_comment(poi_id, poi_name: str, values: Iterable) -> tuple:
+    """
+    把一条评论的原始值（CSV中的字符串或评论字典中的值）转换为带类型的一行
+
+    Args:
+        poi_id: 景点ID
+        poi_name: 景点名称
+        values: 按COMMENT_KEYS顺序的原始值
+
+    Returns:
+        tuple: 按COMMENT_COLUMNS顺序的值
+    """
+    raw = (poi_id, poi_name) + tuple(values)
+    return tuple(_CONVERTERS[kind](value) for (_, kind), value in zip(COMMENT_COLUMNS, raw))
+
+
+def iter_csv_comments(file_path: str) -> Iterator[tuple]:
+    """逐行读取评论CSV并转换类型（不把整个文件读入内存）"""
+    with open(file_path, 'r', newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            if len(row) < 19:
+                continue
+            # 列: 序号, 景区ID, 景区名称, 评论ID, ...
+            yield convert_comment(row[1], row[2], row[3:19])
+
+
+class ParquetCommentWriter:
+    """把评论按景点写入Parquet文件
+
+    每个景点的评论写成独立的行组（超过row_group_size时拆分为多个），行组统计信息中的poi_id
+    范围互不重叠，按景点过滤时只读取对应的行组；列式存储下只读取所需的列。
+    文件在close()后写入尾部元数据才可读取。可作为CtripCommentSpider的sink使用
+    """
+
+    def __init__(self, output_path: str, compression: str = PARQUET_COMPRESSION,
+                 row_group_size: int = PARQUET_ROW_GROUP_SIZE, logger: CtripSpiderLogger = None):
+        """
+        初始化写入器
+
+        Args:
+            output_path: Parquet文件路径
+            compression: 压缩算法，如 'zstd'、'snappy'、'gzip'
+            row_group_size: 单个行组的最大行数
+            logger: 日志记录器实例
+        """
+        _require_pyarrow()
+        self.output_path = output_path
+        self.row_group_size = row_group_size
+        self.logger = logger or CtripSpiderLogger("ParquetCommentWriter", "logs")
+        self.schema = comment_schema()
+        directory = os.path.dirname(os.path.abspath(output_path))
+        os.makedirs(directory, exist_ok=True)
+        self._writer = pq.ParquetWriter(output_path, self.schema, compression=compression)
+        self._buffers: Dict[str, List[tuple]] = {}
+        self._lock = threading.Lock()
+        self.rows_written = 0
+        self.row_groups = 0
+
+    def write_rows(self, poi_id, rows: Iterable[tuple]):
+        """
+        写入一个景点的已转换行，累计满row_group_size行时写出一个行组
+
+        Args:
+            poi_id: 景点ID
+            rows: convert_comment转换后的行
+        """
+        key = str(poi_id)
+        with self._lock:
+            buffer = self._buffers.setdefault(key, [])
+            for row in rows:
+                buffer.append(row)
+                if len(buffer) >= self.row_group_size:
+                    self._write_group(buffer)
+                    buffer.clear()
+
+    def add_comments(self, poi_id: str, poi_name: str, comments: Iterable[Dict]):
+        """写入一批评论（CtripCommentSpider._get_page_comments的结果），与SQLiteSink接口一致"""
+        self.write_rows(poi_id, (
+            convert_comment(poi_id, poi_name, (comment.get(key) for key in COMMENT_KEYS)) for comment in comments
+        ))
+
+    def write_csv(self, file_path: str) -> int:
+        """
+        导出一个评论CSV文件（{poi_id}_{景点名称}.csv）
+
+        Returns:
+            int: 导出的行数
+        """
+        before = self.rows_written
+        poi_id = None
+        for row in iter_csv_comments(file_path):
+            poi_id = row[0]
+            self.write_rows(poi_id, (row,))
+        if poi_id is not None:
+            self.flush(poi_id)
+        self.logger.info(f"已导出 {file_path}，{self.rows_written - before} 条评论")
+        return self.rows_written - before
+
+    def _write_group(self, rows: List[tuple]):
+        """把一批行写成一个行组（调用方持有锁）"""
+        columns = list(zip(*rows))
+        table = pa.Table.from_arrays(
+            [pa.array(list(values), type=field.type) for values, field in zip(columns, self.schema)],
+            schema=self.schema
+        )
+        self._writer.write_table(table, row_group_size=len(rows))
+        self.rows_written += len(rows)
+        self.row_groups += 1
+
+    def flush(self, poi_id=None):
+        """把缓冲的评论写成行组，poi_id为None时写出所有景点"""
+        with self._lock:
+            keys = [str(poi_id)] if poi_id is not None else list(self._buffers)
+            for key in keys:
+                buffer = self._buffers.pop(key, None)
+                if buffer:
+                    self._write_group(buffer)
+
+    def close(self):
+        """写出缓冲并关闭文件"""
+        self.flush()
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+                self.logger.info(f"Parquet文件已写入: {self.output_path}，{self.rows_written} 条评论，"
+                                 f"{self.row_groups} 个行组")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def export_comments(dataset_dir: str, output_path: str, compression: str = PARQUET_COMPRESSION,
+                    row_group_size: int = PARQUET_ROW_GROUP_SIZE, logger: CtripSpiderLogger = None) -> int:
+    """
+    把数据目录下所有评论CSV导出为一个Parquet文件，逐个文件流式转换，内存中最多保留一个行组
+
+    Args:
+        dataset_dir: 评论CSV所在目录
+        output_path: Parquet文件路径
+        compression: 压缩算法
+        row_group_size: 单个行组的最大行数
+        logger: 日志记录器实例
+
+    Returns:
+        int: 导出的评论总数
+    """
+    csv_files = sorted(glob.glob(os.path.join(dataset_dir, '*_*.csv')))
+    with ParquetCommentWriter(output_path, compression, row_group_size, logger) as writer:
+        for file_path in csv_files:
+            writer.write_csv(file_path)
+        return writer.rows_written
+
+
+def read_comments(path: str, columns: List[str] = None, poi_ids: List = None):
+    """
+    读取导出的评论，只读取需要的列和景点
+
+    Args:
+        path: Parquet文件路径
+        columns: 需要的列，为None时读取全部
+        poi_ids: 需要的景点ID，为None时读取全部
+
+    Returns:
+        pyarrow.Table: 评论表
+    """
+    _require_pyarrow()
+    filters = [('poi_id', 'in', [int(poi_id) for poi_id in poi_ids])] if poi_ids else None
+    return pq.read_table(path, columns=columns, filters=filters)
+
+
+# 使用示例
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="把评论CSV导出为Parquet")
+    parser.add_argument('dataset_dir', nargs='?', default='./Datasets', help="评论CSV所在目录")
+    parser.add_argument('output_path', nargs='?', default='./Datasets/comments.parquet', help="Parquet文件路径")
+    parser.add_argument('--compression', default=PARQUET_COMPRESSION, help="压缩算法")
+    args = parser.parse_args()
+
+    logger = CtripSpiderLogger("ParquetExportMain", "logs")
+    total = export_comments(args.dataset_dir, args.output_path, compression=args.compression, logger=logger)
+    logger.info(f"共导出 {total} 条评论到 {args.output_path}")
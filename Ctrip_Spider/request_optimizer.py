@@ -17,14 +17,15 @@ except ImportError:
 
 # 导入新的增强版优化器
 try:
-    from .anti_spider import EnhancedRequestOptimizer, UserAgentPool, ProxyPool
+    from .anti_spider import EnhancedRequestOptimizer, UserAgentPool, ProxyPool, TokenBucket
 except ImportError:
     try:
-        from Ctrip_Spider.anti_spider import EnhancedRequestOptimizer, UserAgentPool, ProxyPool
+        from Ctrip_Spider.anti_spider import EnhancedRequestOptimizer, UserAgentPool, ProxyPool, TokenBucket
     except ImportError:
         EnhancedRequestOptimizer = None
         UserAgentPool = None
         ProxyPool = None
+        TokenBucket = None
 
 
 class RequestOptimizer:
@@ -37,13 +38,26 @@ class RequestOptimizer:
         self.proxies = proxies if proxies is not None else []
         self.logger = logger or CtripSpiderLogger("RequestOptimizer", "logs")
         self.request_count = 0
+        # 令牌桶按delay_range的平均间隔限速，并用区间宽度作为抖动，多线程共享时不会叠加延迟
+        mean_delay = sum(delay_range) / 2
+        self.bucket = TokenBucket(
+            rate=1 / mean_delay if mean_delay > 0 else 0,
+            jitter=(delay_range[1] - delay_range[0]) / (2 * mean_delay) if mean_delay > 0 else 0
+        ) if TokenBucket else None
 
-    def set_delay(self):
-        """设置随机延迟以防止被封禁"""
+    def _wait(self) -> float:
+        """等待令牌（anti_spider不可用时退回随机睡眠），返回等待时间"""
+        if self.bucket is not None:
+            return self.bucket.acquire()
         delay = random.uniform(*self.delay_range)
+        time.sleep(delay)
+        return delay
+
+    def set_delay(self):
+        """设置延迟以防止被封禁"""
         self.request_count += 1
+        delay = self._wait()
         self.logger.log_request(f"Delay request #{self.request_count}", 200, delay, "SLEEP")
-        time.sleep(delay)
 
     def get_random_proxy(self):
         """获取随机代理"""
@@ -57,10 +71,9 @@ class RequestOptimizer:
 
     def log_delay(self):
         """日志延迟信息"""
-        delay = random.uniform(*self.delay_range)
         self.request_count += 1
-        self.logger.info(f"Waiting for {delay:.2f} seconds before the next request (Request #{self.request_count})")
-        time.sleep(delay)
+        delay = self._wait()
+        self.logger.info(f"Waited {delay:.2f} seconds before the next request (Request #{self.request_count})")
 
 # 示例用法
 if __name__ == "__main__":
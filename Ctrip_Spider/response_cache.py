@@ -0,0 +1,198 @@
+"""
+接口响应缓存模块
+按 接口名 + 规范化请求体（忽略head）的SHA-256保存接口响应，按接口设置有效期，总大小超限时淘汰最久未使用的条目
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Optional, Union
+
+# 处理相对导入和绝对导入
+try:
+    from .config import RESPONSE_CACHE_TTLS, RESPONSE_CACHE_MAX_BYTES
+except ImportError:
+    # 直接运行时使用绝对导入
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from Ctrip_Spider.config import RESPONSE_CACHE_TTLS, RESPONSE_CACHE_MAX_BYTES
+
+
+class ResponseCache:
+    """磁盘上的接口响应缓存
+
+    每条响应一个JSON文件，文件名是 接口名 + 规范化请求体 的SHA-256（按前两位分子目录）。
+    请求体中的head块（客户端标识、会话等）不参与计算，同一请求在不同会话下命中同一条缓存。
+    命中时更新文件的修改时间，总大小超过max_bytes时按修改时间淘汰最久未使用的条目
+    """
+
+    # 淘汰后保留的大小占上限的比例，避免每次写入都触发淘汰
+    EVICT_TARGET = 0.8
+
+    def __init__(self, cache_dir: str, ttls: Dict[str, float] = None, max_bytes: int = RESPONSE_CACHE_MAX_BYTES):
+        """
+        初始化响应缓存
+
+        Args:
+            cache_dir: 缓存目录
+            ttls: 按接口的有效期（秒），格式: {'detail': 604800, ...}，未配置的接口不缓存
+            max_bytes: 缓存总大小上限（字节）
+        """
+        self.cache_dir = cache_dir
+        self.ttls = dict(RESPONSE_CACHE_TTLS if ttls is None else ttls)
+        self.max_bytes = max_bytes
+        self._total_bytes = None  # 首次写入时扫描目录得到
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(endpoint: str, payload: Union[Dict, str]) -> str:
+        """
+        计算缓存键
+
+        Args:
+            endpoint: 接口名称
+            payload: 请求体（字典或JSON字符串）
+
+        Returns:
+            str: 十六进制的SHA-256
+        """
+        if isinstance(payload, (str, bytes)):
+            payload = json.loads(payload)
+        if isinstance(payload, dict):
+            payload = {key: value for key, value in payload.items() if key != 'head'}
+        canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+        return hashlib.sha256(f'{endpoint}\n{canonical}'.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f'{key}.json')
+
+    def get(self, endpoint: str, payload: Union[Dict, str]) -> Optional[Dict]:
+        """
+        读取未过期的缓存响应
+
+        Args:
+            endpoint: 接口名称
+            payload: 请求体
+
+        Returns:
+            dict: 缓存的响应JSON，未命中或已过期时返回None
+        """
+        ttl = self.ttls.get(endpoint)
+        if not ttl:
+            return None
+        path = self._path(self.make_key(endpoint, payload))
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            if time.time() - entry['stored_at'] >= ttl:
+                self._remove(path)
+                entry = None
+            else:
+                os.utime(path)
+        except (OSError, ValueError, KeyError, TypeError):
+            entry = None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return entry['body']
+
+    def put(self, endpoint: str, payload: Union[Dict, str], body: Dict):
+        """
+        保存接口响应（只应保存成功的响应），未配置有效期的接口忽略
+
+        Args:
+            endpoint: 接口名称
+            payload: 请求体
+            body: 响应JSON
+        """
+        if not self.ttls.get(endpoint):
+            return
+        path = self._path(self.make_key(endpoint, payload))
+        data = json.dumps({'endpoint': endpoint, 'stored_at': time.time(), 'body': body}, ensure_ascii=False)
+        directory = os.path.dirname(path)
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+            os.makedirs(directory, exist_ok=True)
+            old_size = self._size(path)
+            fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=directory)
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                self._remove(tmp_path)
+                raise
+            self._total_bytes += self._size(path) - old_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        """缓存目录下的所有条目: (修改时间, 大小, 路径)"""
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        for subdir in os.scandir(self.cache_dir):
+            if not subdir.is_dir():
+                continue
+            for item in os.scandir(subdir.path):
+                if item.name.endswith('.json'):
+                    try:
+                        stat = item.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, item.path))
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        """按修改时间从旧到新删除条目，直到总大小降到上限的EVICT_TARGET以下（调用方持有锁）"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * self.EVICT_TARGET
+        for _, size, path in entries:
+            if total <= target:
+                break
+            self._remove(path)
+            total -= size
+        self._total_bytes = total
+
+    @staticmethod
+    def _size(path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        """删除所有缓存条目"""
+        with self._lock:
+            for _, _, path in self._entries():
+                self._remove(path)
+            self._total_bytes = 0
+
+    def get_stats(self) -> Dict:
+        """获取命中统计和缓存大小"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'bytes': self._total_bytes if self._total_bytes is not None else self._scan_size()
+            }
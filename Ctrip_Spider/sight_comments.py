@@ -1,16 +1,22 @@
-import requests
 import json
 import csv
 import time
 import os
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 # 处理相对导入和绝对导入
 try:
     from .log import CtripSpiderLogger
     from .anti_spider import EnhancedRequestOptimizer
+    from .checkpoint import CheckpointStore
+    from .dedup import CommentDedupIndex
+    from .csv_writer import BufferedCsvWriter
+    from .config import CSV_FLUSH_ROWS, CSV_FLUSH_INTERVAL
+    from .typed_json import decode_comment_page
 except ImportError:
     # 直接运行时使用绝对导入
     import sys
@@ -18,11 +24,30 @@ except ImportError:
     sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     from Ctrip_Spider.log import CtripSpiderLogger
     from Ctrip_Spider.anti_spider import EnhancedRequestOptimizer
+    from Ctrip_Spider.checkpoint import CheckpointStore
+    from Ctrip_Spider.dedup import CommentDedupIndex
+    from Ctrip_Spider.csv_writer import BufferedCsvWriter
+    from Ctrip_Spider.config import CSV_FLUSH_ROWS, CSV_FLUSH_INTERVAL
+    from Ctrip_Spider.typed_json import decode_comment_page
 
 
 class CtripCommentSpider:
     """携程景点评论爬虫类，用于爬取携程网上的景点评论数据"""
 
+    # 评论排序方式：按发布时间最新优先（增量同步依赖该顺序）
+    NEWEST_FIRST_SORT = 3
+    # 每页评论数
+    PAGE_SIZE = 10
+    # _convert_time转换成功的发布时间格式，只有这种格式的时间可以按字符串比较先后
+    PUBLISH_TIME_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$')
+    # CSV表头
+    CSV_HEADER = [
+        '序号', '景区ID', '景区名称', '评论ID', '用户昵称',
+        '总体评分', '评论内容', '发布时间', '有用数', '回复数',
+        '出行类型', '用户所在地', '游玩时长', '图片数量', '图片链接列表',
+        '景色评分', '趣味评分', '性价比评分', '推荐项目'
+    ]
+
     def __init__(
         self,
         output_dir: str = './Datasets',
@@ -30,7 +55,11 @@ class CtripCommentSpider:
         proxies: List[str] = None,
         use_proxy: bool = False,
         use_user_agent_rotation: bool = True,
-        logger: CtripSpiderLogger = None
+        logger: CtripSpiderLogger = None,
+        optimizer: EnhancedRequestOptimizer = None,
+        csv_flush_rows: int = CSV_FLUSH_ROWS,
+        csv_flush_interval: float = CSV_FLUSH_INTERVAL,
+        sink=None
     ):
         """
         初始化爬虫
@@ -42,6 +71,10 @@ class CtripCommentSpider:
             use_proxy: 是否使用代理
             use_user_agent_rotation: 是否使用User-Agent轮换
             logger: 日志记录器实例
+            optimizer: 共享的请求优化器（连接池和限速器），为None时新建
+            csv_flush_rows: CSV写缓冲累计多少行后写出到磁盘并保存检查点
+            csv_flush_interval: 距上次写出多少秒后写出到磁盘并保存检查点
+            sink: 可选的数据存储（如SQLiteSink），评论在写入CSV的同时写入
         """
         self.output_dir = output_dir
         # 创建输出目录
@@ -58,8 +91,8 @@ class CtripCommentSpider:
         # 初始化日志记录器
         self.logger = logger or CtripSpiderLogger("CtripCommentSpider", "logs")
         
-        # 初始化增强的请求优化器
-        self.optimizer = EnhancedRequestOptimizer(
+        # 初始化增强的请求优化器（传入optimizer时与其他爬虫共享连接池和限速器）
+        self.optimizer = optimizer or EnhancedRequestOptimizer(
             delay_range=delay_range,
             proxies=proxies,
             use_proxy=use_proxy,
@@ -67,6 +100,66 @@ class CtripCommentSpider:
             rotation_mode='random',
             logger=self.logger
         )
+        
+        # 爬取检查点，保存在输出目录下，中断后重新运行可从断点继续
+        self.checkpoints = CheckpointStore(os.path.join(self.output_dir, '.checkpoints'))
+        # 增量同步状态：每个景点已保存的最新评论（发布时间及该时间的评论ID）
+        self.sync_state = CheckpointStore(os.path.join(self.output_dir, '.sync_state'))
+        # 按 (景点ID, 评论ID) 的去重索引，过滤翻页偏移和多次运行产生的重复评论
+        self.dedup = CommentDedupIndex(os.path.join(self.output_dir, '.dedup'))
+        # 每个CSV文件一个长期打开的写入器，爬取结束或close()时关闭
+        self.csv_flush_rows = csv_flush_rows
+        self.csv_flush_interval = csv_flush_interval
+        self._writers = {}
+        self._writers_lock = threading.Lock()
+        self.sink = sink
+    
+    def _csv_path(self, poi_id: str, poi_name: str) -> str:
+        """景点评论CSV文件路径，移除名称中可能的不合法字符"""
+        safe_name = "".join(c for c in poi_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
+        return os.path.join(self.output_dir, f'{poi_id}_{safe_name}.csv')
+
+    def _open_writer(self, file_path: str, truncate: bool = False) -> BufferedCsvWriter:
+        """为CSV文件打开写入器（已打开的先关闭），空文件写入表头"""
+        with self._writers_lock:
+            writer = self._writers.pop(file_path, None)
+            if writer:
+                writer.close()
+            writer = self._writers[file_path] = BufferedCsvWriter(
+                file_path, header=self.CSV_HEADER, truncate=truncate,
+                flush_rows=self.csv_flush_rows, flush_interval=self.csv_flush_interval
+            )
+            return writer
+
+    def _get_writer(self, file_path: str) -> BufferedCsvWriter:
+        """获取CSV文件的写入器，没有时以追加方式打开"""
+        with self._writers_lock:
+            writer = self._writers.get(file_path)
+        return writer or self._open_writer(file_path)
+
+    def _close_writer(self, file_path: str, discard: bool = False):
+        """关闭CSV文件的写入器
+
+        Args:
+            file_path: CSV文件路径
+            discard: 是否丢弃尚未写出的缓冲
+        """
+        with self._writers_lock:
+            writer = self._writers.pop(file_path, None)
+        if writer:
+            if discard:
+                writer.discard()
+            writer.close()
+
+    def close(self):
+        """写出并关闭所有CSV写入器，写回去重索引并提交数据存储中待写入的评论（程序退出前调用）"""
+        with self._writers_lock:
+            writers, self._writers = list(self._writers.values()), {}
+        for writer in writers:
+            writer.close()
+        self.dedup.close()
+        if self.sink:
+            self.sink.flush()
     
     def _init_csv_file(self, poi_id: str, poi_name: str):
         """初始化CSV文件，写入表头
@@ -78,25 +171,150 @@ class CtripCommentSpider:
         Returns:
             str: CSV文件路径，失败时返回None
         """
-        # 创建文件名，移除可能的不合法字符
-        safe_name = "".join(c for c in poi_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        file_path = os.path.join(self.output_dir, f'{poi_id}_{safe_name}.csv')
+        file_path = self._csv_path(poi_id, poi_name)
 
         try:
-            with open(file_path, 'w', newline='', encoding='utf-8-sig') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    '序号', '景区ID', '景区名称', '评论ID', '用户昵称', 
-                    '总体评分', '评论内容', '发布时间', '有用数', '回复数',
-                    '出行类型', '用户所在地', '游玩时长', '图片数量', '图片链接列表',
-                    '景色评分', '趣味评分', '性价比评分', '推荐项目'
-                ])
+            self._open_writer(file_path, truncate=True)
+            # 新文件从头写起，清空该景点的去重记录
+            self.dedup.reset(poi_id)
             self.logger.info(f"CSV文件已初始化: {file_path}")
             return file_path
         except Exception as e:
             self.logger.error(f"初始化CSV文件失败: {e}")
             return None
 
+    def _resume_csv_file(self, poi_id: str, poi_name: str) -> Tuple[Optional[str], Optional[Dict]]:
+        """从检查点恢复CSV文件，没有可用检查点时新建
+
+        检查点之后可能还写入了半页数据，恢复时把CSV截断到检查点记录的字节偏移
+
+        Returns:
+            tuple: (CSV文件路径, 检查点)，新建文件时检查点为None，失败时文件路径为None
+        """
+        checkpoint = self.checkpoints.load(poi_id)
+        file_path = self._csv_path(poi_id, poi_name)
+        if checkpoint:
+            self._close_writer(file_path)
+            try:
+                if os.path.getsize(file_path) >= checkpoint['byte_offset']:
+                    with open(file_path, 'r+b') as f:
+                        f.truncate(checkpoint['byte_offset'])
+                    # 去重记录同样回退到检查点，被截掉的评论重新爬取时不会被当作重复
+                    if 'dedup_count' in checkpoint:
+                        self.dedup.truncate(poi_id, checkpoint['dedup_count'])
+                    if 'row_index' not in checkpoint:
+                        checkpoint['row_index'] = self._get_current_index(file_path)
+                    return file_path, checkpoint
+            except (OSError, KeyError) as e:
+                self.logger.warning(f"检查点与CSV文件不一致，重新爬取: {e}")
+            self.checkpoints.clear(poi_id)
+        return self._init_csv_file(poi_id, poi_name), None
+
+    def _checkpoint_interrupted(self, poi_id: str, poi_name: str, file_path: str, last_page: int,
+                                checkpoint_page: int, row_index: int, base_index: int, total_pages: int,
+                                newest: Dict = None):
+        """爬取被中断时处理写缓冲
+
+        缓冲中只有完整的页面时写出，并把检查点推进到最后完成的页；
+        中断发生在某一页写入途中时丢弃缓冲，从上一个检查点重新爬取
+
+        Args:
+            last_page: 最后完成的页码
+            checkpoint_page: 上一个检查点的页码
+            row_index: 最后完成的页之后的序号
+            base_index: 本次爬取开始时的序号（写入器打开以来的行数应为两者之差）
+        """
+        writer = self._get_writer(file_path)
+        if writer.rows != row_index - base_index:
+            writer.discard()
+        elif last_page > checkpoint_page:
+            self._save_checkpoint(poi_id, poi_name, file_path, last_page, row_index, total_pages, newest)
+
+    def _save_checkpoint(self, poi_id: str, poi_name: str, file_path: str, page: int,
+                         row_index: int, total_pages: int, newest: Dict = None):
+        """把CSV写缓冲写出到磁盘后记录检查点"""
+        try:
+            self._get_writer(file_path).flush()
+            self.checkpoints.save(
+                poi_id,
+                poi_name=poi_name,
+                file_path=file_path,
+                last_page=page,
+                row_index=row_index,
+                byte_offset=os.path.getsize(file_path),
+                total_pages=total_pages,
+                newest=newest,
+                dedup_count=self.dedup.count(poi_id)
+            )
+        except OSError as e:
+            self.logger.warning(f"保存检查点失败: {e}")
+
+    @classmethod
+    def _newest_marker(cls, comments: list, marker: Dict = None) -> Optional[Dict]:
+        """用一批评论更新最新评论标记
+
+        标记为 {'publish_time': 最新发布时间, 'comment_ids': [该时间的评论ID]}，
+        发布时间精确到秒，同一秒的多条评论靠评论ID区分；发布时间缺失或无法解析的评论不参与
+
+        Returns:
+            dict: 更新后的标记（不修改传入的标记），没有评论时为None
+        """
+        marker = {'publish_time': marker['publish_time'], 'comment_ids': list(marker['comment_ids'])} if marker else None
+        for comment in comments:
+            publish_time = comment['publishTime']
+            if not cls._has_publish_time(publish_time):
+                continue
+            comment_id = str(comment['commentId'])
+            if marker is None or publish_time > marker['publish_time']:
+                marker = {'publish_time': publish_time, 'comment_ids': [comment_id]}
+            elif publish_time == marker['publish_time'] and comment_id not in marker['comment_ids']:
+                marker['comment_ids'].append(comment_id)
+        return marker
+
+    @classmethod
+    def _has_publish_time(cls, publish_time) -> bool:
+        """发布时间是否为可比较的格式（缺失或无法解析时_convert_time返回空串或原始字符串）"""
+        return isinstance(publish_time, str) and cls.PUBLISH_TIME_PATTERN.match(publish_time) is not None
+
+    @classmethod
+    def _is_known(cls, comment: Dict, marker: Dict) -> bool:
+        """评论是否不晚于已保存的最新评论
+
+        发布时间缺失或无法解析的评论无法判断先后，按新评论处理（写入时由去重索引过滤已保存的评论），
+        不会因此提前结束同步
+        """
+        publish_time = comment['publishTime']
+        if not cls._has_publish_time(publish_time):
+            return False
+        return publish_time < marker['publish_time'] or (
+            publish_time == marker['publish_time'] and str(comment['commentId']) in marker['comment_ids'])
+
+    def _load_newest_marker(self, poi_id: str, file_path: str) -> Optional[Dict]:
+        """读取景点已保存的最新评论标记，没有同步状态时从已有CSV中扫描"""
+        state = self.sync_state.load(poi_id)
+        if state:
+            return {'publish_time': state['publish_time'], 'comment_ids': state['comment_ids']}
+        if not os.path.exists(file_path):
+            return None
+        try:
+            with open(file_path, 'r', newline='', encoding='utf-8-sig') as f:
+                reader = csv.reader(f)
+                next(reader, None)
+                rows = ({'commentId': row[3], 'publishTime': row[7]} for row in reader if len(row) > 7)
+                return self._newest_marker(rows)
+        except (OSError, csv.Error) as e:
+            self.logger.warning(f"读取已有评论失败: {e}")
+            return None
+
+    def _save_newest_marker(self, poi_id: str, marker: Optional[Dict]):
+        """保存景点的最新评论标记"""
+        if not marker:
+            return
+        try:
+            self.sync_state.save(poi_id, **marker)
+        except OSError as e:
+            self.logger.warning(f"保存同步状态失败: {e}")
+
     def _clean_content(self, content):
         """清理评论内容，去除换行符和多余空格
 
@@ -177,73 +395,234 @@ class CtripCommentSpider:
         
         return image_urls
     
-    def crawl_comments(self, poi_id: str, poi_name: str, max_pages: int = 100) -> bool:
+    def crawl_comments(self, poi_id: str, poi_name: str, max_pages: int = 100, resume: bool = True,
+                       incremental: bool = False) -> bool:
         """爬取指定景点的评论，返回是否成功
 
         Args:
             poi_id: 景点ID
             poi_name: 景点名称
             max_pages: 最大爬取页数
+            resume: 存在检查点时是否从断点继续（否则重新爬取并覆盖CSV）
+            incremental: 是否只同步新评论（从最新一页开始，遇到已保存的评论即停止，追加到已有CSV）；
+                有未完成的检查点时优先从断点完成上一次爬取
 
         Returns:
             bool: 爬取是否成功
         """
+        if incremental and not (resume and self.checkpoints.load(poi_id)):
+            return self.sync_new_comments(poi_id, poi_name, max_pages)
+
         self.logger.info(f"开始爬取景点: {poi_name} (ID: {poi_id})")
         start_time = time.time()
 
-        # 为每个景点创建独立的CSV文件
-        file_path = self._init_csv_file(poi_id, poi_name)
+        # 为每个景点创建独立的CSV文件，有检查点时接着写
+        if resume:
+            file_path, checkpoint = self._resume_csv_file(poi_id, poi_name)
+        else:
+            self.checkpoints.clear(poi_id)
+            file_path, checkpoint = self._init_csv_file(poi_id, poi_name), None
         if not file_path:
             self.logger.error(f"无法为景点 {poi_name} 创建文件")
             return False
 
-        # 获取总页数
-        total_pages = self._get_total_pages(poi_id)
-        if total_pages == 0:
-            self.logger.warning(f"无法获取 {poi_name} 的评论页数")
-            return False
-
-        total_pages = min(total_pages, max_pages)
+        if checkpoint:
+            # 从断点继续，已完成的页面和总页数都不再请求
+            all_pages = checkpoint['total_pages']
+            start_page = checkpoint['last_page'] + 1
+            current_index = checkpoint['row_index']
+            newest = checkpoint.get('newest')
+            self.logger.info(f"从检查点继续: 已完成 {checkpoint['last_page']} 页，{current_index} 条评论")
+        else:
+            # 获取总页数
+            all_pages = self._get_total_pages(poi_id)
+            if all_pages == 0:
+                self.logger.warning(f"无法获取 {poi_name} 的评论页数")
+                self._close_writer(file_path)
+                return False
+            start_page = 1
+            current_index = 0
+            newest = None
+
+        total_pages = min(all_pages, max_pages)
         self.logger.info(f"计划爬取 {total_pages} 页评论")
 
         # 爬取所有页面的评论
-        current_index = 0
         success_count = 0  # 记录成功爬取的页面数
+        writer = self._get_writer(file_path)
+        base_index = current_index
+        last_page = checkpoint_page = start_page - 1
+        completed = False
+
+        try:
+            for page, comments_data in self._iter_comment_pages(poi_id, start_page, total_pages):
+                if not comments_data:
+                    self.logger.warning(f"第 {page} 页数据获取失败，跳过")
+                    continue
+
+                # 保存评论到该景点对应的文件（写缓冲），缓冲写出到磁盘时记录检查点
+                current_index = self._save_comments(comments_data, poi_id, poi_name, current_index, file_path)
+                newest = self._newest_marker(comments_data, newest)
+                last_page = page
+                if writer.flush_due():
+                    self._save_checkpoint(poi_id, poi_name, file_path, page, current_index, all_pages, newest)
+                    checkpoint_page = page
+                self.logger.info(f"第 {page} 页爬取完成，获取 {len(comments_data)} 条评论")
+                success_count += 1  # 成功爬取一页
+
+                # 记录进度
+                self.logger.log_progress(page, total_pages, "comment crawling")
+            completed = True
+        finally:
+            if not completed:
+                self._checkpoint_interrupted(poi_id, poi_name, file_path, last_page, checkpoint_page,
+                                             current_index, base_index, all_pages, newest)
+            self._close_writer(file_path)
+
+        # 正常结束后记录最新评论供增量同步使用，并删除检查点，下次重新爬取
+        self._save_newest_marker(poi_id, newest)
+        self.checkpoints.clear(poi_id)
+        self.dedup.release(poi_id)
+        if self.sink:
+            self.sink.flush()
+
+        end_time = time.time()
+        self.logger.info(f"景点 {poi_name} 爬取完成，总耗时: {end_time-start_time:.2f}秒，共获取 {current_index} 条评论，保存至: {file_path}")
+        self.logger.log_data_extraction(current_index, "comments")
+
+        # 如果有成功爬取的页面（包括断点之前的页面），则认为整体成功
+        return success_count > 0 or start_page > 1
+
+    def _iter_comment_pages(self, poi_id: str, start_page: int, total_pages: int):
+        """逐页获取评论，调用方处理完一页后才请求下一页
+
+        Args:
+            poi_id: 景点ID
+            start_page: 起始页码
+            total_pages: 最后一页的页码
 
-        for page in range(1, total_pages + 1):
+        Yields:
+            tuple: (页码, 评论数据列表)，获取失败的页面评论列表为空
+        """
+        for page in range(start_page, total_pages + 1):
             self.logger.info(f"正在爬取第 {page}/{total_pages} 页...")
+            yield page, self._get_page_comments(poi_id, page)
+
+            # 延迟（由optimizer统一管理）
+            if page < total_pages:
+                self.optimizer.set_delay('comments')
+
+    def iter_comments(self, poi_id: str, max_pages: int = 100):
+        """逐条产出景点的评论，不写入文件
+
+        按页请求，生成器被消费到下一页时才发出下一页的请求，内存中最多只有一页评论；
+        提前停止迭代时不再发出请求
+
+        Args:
+            poi_id: 景点ID
+            max_pages: 最大爬取页数
 
-            # 获取当前页数据
-            comments_data = self._get_page_comments(poi_id, page)
-            if not comments_data:
+        Yields:
+            dict: 评论数据（与CSV各列对应的字段）
+        """
+        total_pages = min(self._get_total_pages(poi_id), max_pages)
+        for page, comments in self._iter_comment_pages(poi_id, 1, total_pages):
+            if not comments:
                 self.logger.warning(f"第 {page} 页数据获取失败，跳过")
                 continue
+            yield from comments
 
-            # 保存评论到该景点对应的文件
-            current_index = self._save_comments(comments_data, poi_id, poi_name, current_index, file_path)
-            self.logger.info(f"第 {page} 页爬取完成，获取 {len(comments_data)} 条评论")
-            success_count += 1  # 成功爬取一页
+    def sync_new_comments(self, poi_id: str, poi_name: str, max_pages: int = 100) -> bool:
+        """增量同步：按最新优先逐页请求，遇到已保存的评论即停止，只把新评论追加到CSV
 
-            # 记录进度
-            self.logger.log_progress(page, total_pages, "comment crawling")
+        新评论先缓存在内存中，确认到达已保存评论的边界（或评论已到末尾、达到max_pages）后才一次性写入
+        并更新同步状态；中途请求失败时不写入任何数据，下次同步重新获取，不会留下缺口或重复
 
-            # 延迟（由optimizer统一管理，这里可以额外添加页面间的延迟）
-            if page < total_pages:
-                self.optimizer.set_delay()
+        Args:
+            poi_id: 景点ID
+            poi_name: 景点名称
+            max_pages: 最多请求的页数
 
-        end_time = time.time()
-        self.logger.info(f"景点 {poi_name} 爬取完成，总耗时: {end_time-start_time:.2f}秒，共获取 {current_index} 条评论，保存至: {file_path}")
-        self.logger.log_data_extraction(current_index, "comments")
+        Returns:
+            bool: 同步是否完成
+        """
+        self.logger.info(f"开始增量同步景点评论: {poi_name} (ID: {poi_id})")
+        start_time = time.time()
+        file_path = self._csv_path(poi_id, poi_name)
+        marker = self._load_newest_marker(poi_id, file_path)
+        if marker is None:
+            self.logger.info(f"景点 {poi_name} 没有已保存的评论，将同步全部评论")
+
+        new_comments = []
+        completed = False
+        page = 0
+        for page in range(1, max_pages + 1):
+            if page > 1:
+                self.optimizer.set_delay('comments')
+            data = self._make_request(poi_id, page)
+            if not data or not isinstance(data.get('result'), dict):
+                self.logger.warning(f"第 {page} 页数据获取失败，增量同步中止，本次不写入数据")
+                break
+            items = data['result'].get('items') or []
+            comments = self._parse_comment_items(items, poi_id, page)
+            reached = False
+            for comment in comments:
+                if marker and self._is_known(comment, marker):
+                    reached = True
+                    break
+                new_comments.append(comment)
+            if reached or len(items) < self.PAGE_SIZE:
+                completed = True
+                break
+        else:
+            completed = True
+            self.logger.warning(f"已达到最大页数 {max_pages}，更早的新评论未同步")
+
+        if not completed:
+            return False
+
+        if new_comments and os.path.exists(file_path):
+            if self.dedup.count(poi_id) == 0:
+                self._seed_dedup_from_csv(poi_id, file_path)
+            # 发布时间缺失的评论无法按时间判断是否已保存，按去重索引排除
+            new_comments = [comment for comment in new_comments
+                            if not self.dedup.contains(poi_id, comment['commentId'])]
 
-        # 如果有成功爬取的页面，则认为整体成功
-        return success_count > 0
+        if new_comments:
+            if os.path.exists(file_path):
+                current_index = self._get_current_index(file_path)
+            else:
+                file_path = self._init_csv_file(poi_id, poi_name)
+                current_index = 0
+            if not file_path:
+                self.logger.error(f"无法为景点 {poi_name} 创建文件")
+                return False
+            try:
+                saved_index = self._save_comments(new_comments, poi_id, poi_name, current_index, file_path)
+            finally:
+                self._close_writer(file_path)
+            if saved_index == current_index:
+                return False
+            self._save_newest_marker(poi_id, self._newest_marker(new_comments, marker))
+            self.dedup.release(poi_id)
+            if self.sink:
+                self.sink.flush()
+
+        self.logger.info(
+            f"景点 {poi_name} 增量同步完成，请求 {page} 页，新增 {len(new_comments)} 条评论，"
+            f"耗时: {time.time() - start_time:.2f}秒"
+        )
+        return True
 
-    def crawl_multiple_pois(self, poi_list: list, max_pages: int = 100):
+    def crawl_multiple_pois(self, poi_list: list, max_pages: int = 100, workers: int = 1,
+                            incremental: bool = False):
         """批量爬取多个景点的评论
 
         Args:
             poi_list: 景点ID和名称的列表
             max_pages: 每个景点最大爬取页数
+            workers: 并行工作线程数，为1时逐个爬取
+            incremental: 是否只同步各景点的新评论
 
         Returns:
             dict: 爬取结果字典
@@ -253,16 +632,22 @@ class CtripCommentSpider:
         start_time = time.time()
 
         results = {}
-        for i, (poi_id, poi_name) in enumerate(poi_list, 1):
-            self.logger.info(f"正在处理第 {i}/{total_pois} 个景点: {poi_name} (ID: {poi_id})")
-            success = self.crawl_comments(poi_id, poi_name, max_pages)
-            results[f"{poi_name}({poi_id})"] = success
-
-            # 记录当前进度
-            self.logger.log_progress(i, total_pois, "POI crawling")
-
-            # 景点间的延迟
-            time.sleep(2)
+        if workers > 1:
+            crawled = self.iter_crawl_multiple_pois(poi_list, max_pages, workers, incremental)
+            for i, (poi_id, poi_name, success) in enumerate(crawled, 1):
+                results[f"{poi_name}({poi_id})"] = success
+                self.logger.log_progress(i, total_pois, "POI crawling")
+        else:
+            for i, (poi_id, poi_name) in enumerate(poi_list, 1):
+                self.logger.info(f"正在处理第 {i}/{total_pois} 个景点: {poi_name} (ID: {poi_id})")
+                success = self.crawl_comments(poi_id, poi_name, max_pages, incremental=incremental)
+                results[f"{poi_name}({poi_id})"] = success
+
+                # 记录当前进度
+                self.logger.log_progress(i, total_pois, "POI crawling")
+
+                # 景点间的延迟
+                time.sleep(2)
 
         end_time = time.time()
         # 打印汇总结果
@@ -278,6 +663,58 @@ class CtripCommentSpider:
 
         return results
     
+    def iter_crawl_multiple_pois(self, poi_list: list, max_pages: int = 100, workers: int = 4,
+                                 incremental: bool = False):
+        """以工作池方式并行爬取多个景点的评论，每个景点完成后立即产出结果
+
+        每个工作线程独占一个景点并写入该景点自己的CSV文件，所有线程共享
+        self.optimizer，因此共用同一份连接池和请求频率预算
+
+        Args:
+            poi_list: 景点ID和名称的列表
+            max_pages: 每个景点最大爬取页数
+            workers: 并行工作线程数
+            incremental: 是否只同步各景点的新评论
+
+        Yields:
+            tuple: (景点ID, 景点名称, 是否成功)，按完成先后顺序
+        """
+        self.logger.info(f"启动 {workers} 个工作线程爬取 {len(poi_list)} 个景点")
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="poi-worker")
+        futures = {
+            executor.submit(self._crawl_poi_worker, poi_id, poi_name, max_pages, incremental): (poi_id, poi_name)
+            for poi_id, poi_name in poi_list
+        }
+        try:
+            for future in as_completed(futures):
+                poi_id, poi_name = futures[future]
+                yield poi_id, poi_name, future.result()
+        finally:
+            # 调用方提前停止迭代时取消尚未开始的景点
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def _crawl_poi_worker(self, poi_id: str, poi_name: str, max_pages: int, incremental: bool = False) -> bool:
+        """工作线程入口：在共享频率预算内爬取单个景点，异常不影响其他景点
+
+        Args:
+            poi_id: 景点ID
+            poi_name: 景点名称
+            max_pages: 最大爬取页数
+            incremental: 是否只同步新评论
+
+        Returns:
+            bool: 爬取是否成功
+        """
+        try:
+            # 代替顺序模式下景点间的固定等待，由共享预算统一排队
+            self.optimizer.set_delay('comments')
+            return self.crawl_comments(poi_id, poi_name, max_pages, incremental=incremental)
+        except Exception as e:
+            self.logger.log_error(f"爬取景点 {poi_name} 时发生异常: {e}", f"POI_ID: {poi_id}", "WORKER")
+            return False
+
     def _get_total_pages(self, poi_id: str) -> int:
         """获取评论总页数
 
@@ -301,18 +738,19 @@ class CtripCommentSpider:
             self.logger.error(f"解析总页数时出错: {e}")
             return 0
 
-    def _get_current_index(self) -> int:
-        """获取当前CSV文件中的序号
+    def _get_current_index(self, file_path: str) -> int:
+        """获取CSV文件中下一条评论的序号（即已有的数据行数）
+
+        Args:
+            file_path: CSV文件路径
 
         Returns:
             int: 当前序号
         """
         try:
-            with open(self.output_file, 'r', encoding='utf-8-sig') as f:
-                reader = csv.reader(f)
-                rows = list(reader)
-                return len(rows) - 1
-        except:
+            with open(file_path, 'r', newline='', encoding='utf-8-sig') as f:
+                return max(0, sum(1 for _ in csv.reader(f)) - 1)
+        except (OSError, csv.Error):
             return 0
 
     def _make_request(self, poi_id: str, page_index: int = 1):
@@ -332,10 +770,10 @@ class CtripCommentSpider:
                     "collapseType": 0,
                     "commentTagId": 0,
                     "pageIndex": page_index,
-                    "pageSize": 10,
+                    "pageSize": self.PAGE_SIZE,
                     "poiId": poi_id,
                     "sourceType": 1,
-                    "sortType": 3,
+                    "sortType": self.NEWEST_FIRST_SORT,
                     "starType": 0
                 },
                 "head": {
@@ -351,37 +789,35 @@ class CtripCommentSpider:
                 }
             }
 
+            # 接口熔断时直接跳过，不再选取代理和等待代理令牌
+            self.optimizer.check_circuit(self.post_url)
+            
             # 获取请求头和代理
             headers = self.optimizer.get_headers(self.base_headers)
             proxies = self.optimizer.get_proxy_dict()
             
             start_time = time.time()
-            response = requests.post(
+            response = self.optimizer.send(
+                'POST',
                 self.post_url,
                 data=json.dumps(request_data),
                 headers=headers,
                 proxies=proxies,
-                timeout=10
+                timeout=10,
+                endpoint='comments'
             )
             end_time = time.time()
             response_time = end_time - start_time
 
+            # 代理状态和限速反馈由optimizer.send统一记录
             if response.status_code != 200:
                 self.logger.log_error(f"请求失败，状态码：{response.status_code}", self.post_url, "POST")
-                # 如果使用代理，标记失败
-                if proxies and self.optimizer.use_proxy:
-                    proxy_url = proxies.get('http') or proxies.get('https')
-                    self.optimizer.proxy_pool.mark_fail(proxy_url)
                 return None
 
             self.logger.log_request(self.post_url, response.status_code, response_time, "POST")
             
-            # 如果使用代理，更新代理状态
-            if proxies and self.optimizer.use_proxy:
-                proxy_url = proxies.get('http') or proxies.get('https')
-                self.optimizer.proxy_pool.mark_success(proxy_url)
-            
-            return response.json()
+            # 安装了msgspec时只解码用到的字段
+            return decode_comment_page(response.content)
 
         except Exception as e:
             self.logger.log_error(f"请求错误: {e}", self.post_url, "POST")
@@ -400,10 +836,21 @@ class CtripCommentSpider:
         data = self._make_request(poi_id, page)
         if not data or 'result' not in data or 'items' not in data['result']:
             return []
+        return self._parse_comment_items(data['result']['items'], poi_id, page)
+
+    def _parse_comment_items(self, items: list, poi_id: str, page: int) -> list:
+        """解析一页响应中的评论条目
+
+        Args:
+            items: 响应中的评论条目列表
+            poi_id: 景点ID
+            page: 页码
 
+        Returns:
+            list: 评论数据列表，解析失败时返回空列表
+        """
         try:
             comments = []
-            items = data['result']['items']
             for item in items:
                 if not item or not isinstance(item, dict):
                     continue
@@ -461,8 +908,18 @@ class CtripCommentSpider:
             self.logger.error(traceback.format_exc())  # 记录详细错误信息
             return []
 
+    def _seed_dedup_from_csv(self, poi_id: str, file_path: str):
+        """用已有CSV中的评论ID初始化去重记录（去重功能之前爬取的文件）"""
+        try:
+            with open(file_path, 'r', newline='', encoding='utf-8-sig') as f:
+                reader = csv.reader(f)
+                next(reader, None)
+                self.dedup.add_many(poi_id, (row[3] for row in reader if len(row) > 3))
+        except (OSError, csv.Error) as e:
+            self.logger.warning(f"读取已有评论ID失败: {e}")
+
     def _save_comments(self, comments: list, poi_id: str, poi_name: str, start_index: int, file_path: str) -> int:
-        """将评论保存到指定CSV文件
+        """将评论保存到指定CSV文件，已保存过的评论（按去重索引）跳过
 
         Args:
             comments: 评论数据列表
@@ -474,33 +931,47 @@ class CtripCommentSpider:
         Returns:
             int: 保存后的新序号
         """
+        unique = []
+        seen = set()
+        for comment in comments:
+            comment_id = comment['commentId']
+            if comment_id not in ('', None):
+                if comment_id in seen or self.dedup.contains(poi_id, comment_id):
+                    continue
+                seen.add(comment_id)
+            unique.append(comment)
+        if len(unique) < len(comments):
+            self.logger.info(f"跳过 {len(comments) - len(unique)} 条重复评论")
+        comments = unique
+
         try:
-            with open(file_path, 'a', newline='', encoding='utf-8-sig') as f:
-                writer = csv.writer(f)
-                current_index = start_index
-                for comment in comments:
-                    writer.writerow([
-                        current_index,
-                        poi_id,
-                        poi_name,
-                        comment['commentId'],
-                        comment['userNick'],
-                        comment['score'],
-                        comment['content'],
-                        comment['publishTime'],
-                        comment['usefulCount'],
-                        comment['replyCount'],
-                        comment['touristTypeDisplay'],
-                        comment['ipLocatedName'],
-                        comment['timeDuration'],
-                        comment['imageCount'],
-                        comment['imageUrls'],
-                        comment['sceneryScore'],
-                        comment['funScore'],
-                        comment['valueScore'],
-                        comment['recommendItems']
-                    ])
-                    current_index += 1
+            # 写入该文件的写缓冲，由调用方决定何时写出到磁盘
+            self._get_writer(file_path).writerows([
+                index,
+                poi_id,
+                poi_name,
+                comment['commentId'],
+                comment['userNick'],
+                comment['score'],
+                comment['content'],
+                comment['publishTime'],
+                comment['usefulCount'],
+                comment['replyCount'],
+                comment['touristTypeDisplay'],
+                comment['ipLocatedName'],
+                comment['timeDuration'],
+                comment['imageCount'],
+                comment['imageUrls'],
+                comment['sceneryScore'],
+                comment['funScore'],
+                comment['valueScore'],
+                comment['recommendItems']
+            ] for index, comment in enumerate(comments, start_index))
+            current_index = start_index + len(comments)
+            # 先写CSV再记录ID，中途中断最多留下重复而不会漏掉评论
+            self.dedup.add_many(poi_id, seen)
+            if self.sink:
+                self.sink.add_comments(poi_id, poi_name, comments)
             self.logger.log_data_extraction(len(comments), "comments")
             return current_index
         except Exception as e:
@@ -0,0 +1,266 @@
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+# 处理相对导入和绝对导入
+try:
+    from .log import CtripSpiderLogger
+    from .anti_spider import EnhancedRequestOptimizer
+    from .sight_comments import CtripCommentSpider
+except ImportError:
+    # 直接运行时使用绝对导入
+    import sys
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from Ctrip_Spider.log import CtripSpiderLogger
+    from Ctrip_Spider.anti_spider import EnhancedRequestOptimizer
+    from Ctrip_Spider.sight_comments import CtripCommentSpider
+
+
+class AsyncCtripCommentSpider(CtripCommentSpider):
+    """携程景点评论异步爬虫，多页并发请求，按页序写入与同步版相同格式的CSV"""
+
+    def __init__(
+        self,
+        output_dir: str = './Datasets',
+        delay_range: Tuple[float, float] = (1, 3),
+        proxies: List[str] = None,
+        use_proxy: bool = False,
+        use_user_agent_rotation: bool = True,
+        logger: CtripSpiderLogger = None,
+        optimizer: EnhancedRequestOptimizer = None,
+        concurrency: int = 5,
+        sink=None
+    ):
+        """
+        初始化异步爬虫
+
+        Args:
+            output_dir: 输出目录路径
+            delay_range: 延迟范围
+            proxies: 代理列表
+            use_proxy: 是否使用代理
+            use_user_agent_rotation: 是否使用User-Agent轮换
+            logger: 日志记录器实例
+            optimizer: 共享的请求优化器（连接池和限速器），为None时新建
+            concurrency: 全局并发上限（同时在途的页面请求数）
+            sink: 可选的数据存储（如SQLiteSink），评论在写入CSV的同时写入
+        """
+        logger = logger or CtripSpiderLogger("AsyncCtripCommentSpider", "logs")
+        # 只关闭自己创建的优化器，传入的优化器由调用方和其他爬虫共享
+        self._owns_optimizer = optimizer is None
+        # 连接池大小至少覆盖并发数，否则多出的连接用完即丢弃
+        optimizer = optimizer or EnhancedRequestOptimizer(
+            delay_range=delay_range,
+            proxies=proxies,
+            use_proxy=use_proxy,
+            use_user_agent_rotation=use_user_agent_rotation,
+            rotation_mode='random',
+            logger=logger,
+            pool_maxsize=max(10, concurrency)
+        )
+        super().__init__(
+            output_dir=output_dir,
+            delay_range=delay_range,
+            proxies=proxies,
+            use_proxy=use_proxy,
+            use_user_agent_rotation=use_user_agent_rotation,
+            logger=logger,
+            optimizer=optimizer,
+            sink=sink
+        )
+        self.concurrency = concurrency
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="comment-fetch")
+        self._semaphore = None
+        self._semaphore_loop = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """获取当前事件循环下的全局并发信号量"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def _fetch_page_async(self, poi_id: str, page: int) -> Tuple[int, list]:
+        """在并发上限内获取一页评论
+
+        Returns:
+            tuple: (页码, 评论数据列表)
+        """
+        loop = asyncio.get_running_loop()
+        async with self._get_semaphore():
+            # 在信号量内等待令牌，在途预约数不超过并发上限
+            await self.optimizer.set_delay_async('comments')
+            comments = await loop.run_in_executor(self._executor, self._get_page_comments, poi_id, page)
+        return page, comments
+
+    async def _aiter_comment_pages(self, poi_id: str, start_page: int, total_pages: int, prefetch: int = None):
+        """并发获取评论页，按页序产出
+
+        最多提前调度prefetch页（在途请求另受全局并发上限约束），调用方消费变慢时不再发出新请求，
+        内存中缓存的页面数不超过prefetch
+
+        Args:
+            poi_id: 景点ID
+            start_page: 起始页码
+            total_pages: 最后一页的页码
+            prefetch: 提前调度的页数，默认为并发数的2倍
+
+        Yields:
+            tuple: (页码, 评论数据列表)，获取失败的页面评论列表为空
+        """
+        prefetch = max(1, prefetch or self.concurrency * 2)
+        pending = deque()
+        next_page = start_page
+        try:
+            while next_page <= total_pages or pending:
+                while next_page <= total_pages and len(pending) < prefetch:
+                    pending.append(asyncio.ensure_future(self._fetch_page_async(poi_id, next_page)))
+                    next_page += 1
+                result = await pending.popleft()
+                # 等待已完成的任务不会让出事件循环，先让出一次，使刚释放的并发名额立即被后续页面使用
+                await asyncio.sleep(0)
+                yield result
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def aiter_comments(self, poi_id: str, max_pages: int = 100, prefetch: int = None):
+        """异步逐条产出景点的评论，不写入文件
+
+        多页并发请求、按页序产出，最多提前prefetch页，消费者处理慢时自动停止发出新请求
+
+        Args:
+            poi_id: 景点ID
+            max_pages: 最大爬取页数
+            prefetch: 提前调度的页数，默认为并发数的2倍
+
+        Yields:
+            dict: 评论数据
+        """
+        loop = asyncio.get_running_loop()
+        all_pages = await loop.run_in_executor(self._executor, self._get_total_pages, poi_id)
+        pages = self._aiter_comment_pages(poi_id, 1, min(all_pages, max_pages), prefetch)
+        try:
+            async for page, comments in pages:
+                if not comments:
+                    self.logger.warning(f"第 {page} 页数据获取失败，跳过")
+                    continue
+                for comment in comments:
+                    yield comment
+        finally:
+            await pages.aclose()
+
+    async def crawl_comments_async(self, poi_id: str, poi_name: str, max_pages: int = 100,
+                                   resume: bool = True) -> bool:
+        """并发爬取指定景点的评论，返回是否成功
+
+        Args:
+            poi_id: 景点ID
+            poi_name: 景点名称
+            max_pages: 最大爬取页数
+            resume: 存在检查点时是否从断点继续（否则重新爬取并覆盖CSV）
+
+        Returns:
+            bool: 爬取是否成功
+        """
+        self.logger.info(f"开始异步爬取景点: {poi_name} (ID: {poi_id})，并发数: {self.concurrency}")
+        start_time = time.time()
+
+        if resume:
+            file_path, checkpoint = self._resume_csv_file(poi_id, poi_name)
+        else:
+            self.checkpoints.clear(poi_id)
+            file_path, checkpoint = self._init_csv_file(poi_id, poi_name), None
+        if not file_path:
+            self.logger.error(f"无法为景点 {poi_name} 创建文件")
+            return False
+
+        if checkpoint:
+            all_pages = checkpoint['total_pages']
+            start_page = checkpoint['last_page'] + 1
+            current_index = checkpoint['row_index']
+            newest = checkpoint.get('newest')
+            self.logger.info(f"从检查点继续: 已完成 {checkpoint['last_page']} 页，{current_index} 条评论")
+        else:
+            loop = asyncio.get_running_loop()
+            all_pages = await loop.run_in_executor(self._executor, self._get_total_pages, poi_id)
+            if all_pages == 0:
+                self.logger.warning(f"无法获取 {poi_name} 的评论页数")
+                self._close_writer(file_path)
+                return False
+            start_page = 1
+            current_index = 0
+            newest = None
+
+        total_pages = min(all_pages, max_pages)
+        self.logger.info(f"计划爬取 {total_pages} 页评论")
+
+        # 并发获取、按页序写出，检查点只随连续写出的页面推进
+        pages = self._aiter_comment_pages(poi_id, start_page, total_pages)
+        success_count = 0
+        writer = self._get_writer(file_path)
+        base_index = current_index
+        last_page = checkpoint_page = start_page - 1
+        completed = False
+
+        try:
+            async for page, comments_data in pages:
+                if comments_data:
+                    current_index = self._save_comments(comments_data, poi_id, poi_name, current_index, file_path)
+                    newest = self._newest_marker(comments_data, newest)
+                    last_page = page
+                    if writer.flush_due():
+                        # 检查点需要fsync，放到默认线程池执行，等待期间在途请求的后续页面可以继续发出
+                        await asyncio.get_running_loop().run_in_executor(
+                            None, self._save_checkpoint, poi_id, poi_name, file_path, page, current_index,
+                            all_pages, newest
+                        )
+                        checkpoint_page = page
+                    self.logger.info(f"第 {page} 页爬取完成，获取 {len(comments_data)} 条评论")
+                    success_count += 1
+                else:
+                    self.logger.warning(f"第 {page} 页数据获取失败，跳过")
+                self.logger.log_progress(page, total_pages, "comment crawling")
+            completed = True
+        finally:
+            await pages.aclose()
+            if not completed:
+                self._checkpoint_interrupted(poi_id, poi_name, file_path, last_page, checkpoint_page,
+                                             current_index, base_index, all_pages, newest)
+            self._close_writer(file_path)
+
+        self._save_newest_marker(poi_id, newest)
+        self.checkpoints.clear(poi_id)
+        self.dedup.release(poi_id)
+        if self.sink:
+            self.sink.flush()
+
+        end_time = time.time()
+        elapsed = end_time - start_time
+        self.logger.info(
+            f"景点 {poi_name} 异步爬取完成，总耗时: {elapsed:.2f}秒，"
+            f"速度: {(total_pages - start_page + 1) / elapsed if elapsed else 0:.2f}页/秒，共获取 {current_index} 条评论，保存至: {file_path}"
+        )
+        self.logger.log_data_extraction(current_index, "comments")
+
+        return success_count > 0 or start_page > 1
+
+    def close(self):
+        """关闭线程池和CSV写入器，优化器由本爬虫创建时同时关闭其连接池"""
+        self._executor.shutdown(wait=True)
+        super().close()
+        if self._owns_optimizer:
+            self.optimizer.close()
+
+
+# 使用示例
+if __name__ == "__main__":
+    logger = CtripSpiderLogger("AsyncCtripCommentSpiderMain", "logs")
+    spider = AsyncCtripCommentSpider('./Datasets', concurrency=5, logger=logger)
+
+    asyncio.run(spider.crawl_comments_async('76865', '星海广场', max_pages=5))
+    spider.close()
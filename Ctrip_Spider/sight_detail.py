@@ -1,13 +1,18 @@
 import json
 import os
-from requests import post
-from bs4 import BeautifulSoup
-from typing import List, Tuple
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 # 处理相对导入和绝对导入
 try:
     from .log import CtripSpiderLogger
     from .anti_spider import EnhancedRequestOptimizer
+    from .response_cache import ResponseCache
+    from .config import RESPONSE_CACHE_DIR, DETAIL_CONCURRENCY
+    from .html_text import html_to_text
+    from .typed_json import decode_detail_response
 except ImportError:
     # 直接运行时使用绝对导入
     import sys
@@ -15,6 +20,10 @@ except ImportError:
     sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     from Ctrip_Spider.log import CtripSpiderLogger
     from Ctrip_Spider.anti_spider import EnhancedRequestOptimizer
+    from Ctrip_Spider.response_cache import ResponseCache
+    from Ctrip_Spider.config import RESPONSE_CACHE_DIR, DETAIL_CONCURRENCY
+    from Ctrip_Spider.html_text import html_to_text
+    from Ctrip_Spider.typed_json import decode_detail_response
 
 class AttractionDetailFetcher:
     """景点详情获取器，用于获取指定景点的核心信息"""
@@ -25,7 +34,10 @@ class AttractionDetailFetcher:
         proxies: List[str] = None,
         use_proxy: bool = False,
         use_user_agent_rotation: bool = True,
-        logger: CtripSpiderLogger = None
+        logger: CtripSpiderLogger = None,
+        optimizer: EnhancedRequestOptimizer = None,
+        sink=None,
+        response_cache: ResponseCache = None
     ):
         """初始化景点详情获取器
 
@@ -35,14 +47,17 @@ class AttractionDetailFetcher:
             use_proxy: 是否使用代理
             use_user_agent_rotation: 是否使用User-Agent轮换
             logger: 日志记录器实例
+            optimizer: 共享的请求优化器（连接池和限速器），为None时新建
+            sink: 可选的数据存储（如SQLiteSink），获取成功的详情同时写入
+            response_cache: 接口响应缓存，为None时使用RESPONSE_CACHE_DIR下的缓存
         """
         self.detail_url = 'https://m.ctrip.com/restapi/soa2/18254/json/getPoiMoreDetail'
 
         # 初始化日志记录器
         self.logger = logger or CtripSpiderLogger("AttractionDetailFetcher", "logs")
         
-        # 初始化增强的请求优化器
-        self.optimizer = EnhancedRequestOptimizer(
+        # 初始化增强的请求优化器（传入optimizer时与其他爬虫共享连接池和限速器）
+        self.optimizer = optimizer or EnhancedRequestOptimizer(
             delay_range=delay_range,
             proxies=proxies,
             use_proxy=use_proxy,
@@ -50,12 +65,17 @@ class AttractionDetailFetcher:
             rotation_mode='random',
             logger=self.logger
         )
+        self.sink = sink
+        self.response_cache = response_cache or ResponseCache(RESPONSE_CACHE_DIR)
 
-    def get_detail(self, poi_id):
+    def get_detail(self, poi_id, use_cache: bool = True):
         """获取景点核心信息
 
+        有效期内的详情直接从响应缓存读取，不发出请求
+
         Args:
             poi_id: 景点ID
+            use_cache: 是否读取缓存，为False时总是请求接口（成功后仍会更新缓存）
 
         Returns:
             dict: 包含景点核心信息的字典，结构如下：
@@ -78,61 +98,21 @@ class AttractionDetailFetcher:
         self.logger.info(f"开始获取景点详情, poi_id: {poi_id}")
 
         try:
-            # 应用延迟
-            self.optimizer.set_delay()
-            
-            # 获取请求头和代理
-            headers = self.optimizer.get_headers()
-            proxies = self.optimizer.get_proxy_dict()
-            
-            # 发送请求
-            import time
-            start_time = time.time()
-            response = post(
-                self.detail_url,
-                json=request_data,
-                headers=headers,
-                proxies=proxies,
-                timeout=10
-            )
-            end_time = time.time()
-            response_time = end_time - start_time
-
-            # 检查响应状态码
-            if response.status_code != 200:
-                error_msg = f"请求失败，状态码: {response.status_code}"
-                self.logger.log_error(error_msg, self.detail_url, "POST")
-                # 如果使用代理，标记失败
-                if proxies and self.optimizer.use_proxy:
-                    proxy_url = proxies.get('http') or proxies.get('https')
-                    self.optimizer.proxy_pool.mark_fail(proxy_url)
-                return self._create_error_result(error_msg)
-
-            self.logger.log_request(self.detail_url, response.status_code, response_time, "POST")
-            
-            # 如果使用代理，更新代理状态
-            if proxies and self.optimizer.use_proxy:
-                proxy_url = proxies.get('http') or proxies.get('https')
-                self.optimizer.proxy_pool.mark_success(proxy_url)
-
-            # 解析响应数据
-            try:
-                response_json = response.json()
-            except json.JSONDecodeError:
-                error_msg = "响应数据不是有效的JSON格式"
-                self.logger.log_error(error_msg, self.detail_url, "JSON_PARSE")
-                return self._create_error_result(error_msg)
-
-            # 检查API错误
-            if 'error' in response_json or 'templateList' not in response_json:
-                error_msg = "API返回错误或缺少必要字段"
-                self.logger.log_error(error_msg, self.detail_url, "API_ERROR")
-                return self._create_error_result(error_msg)
+            response_json = self.response_cache.get('detail', request_data) if use_cache else None
+            if response_json is not None:
+                self.logger.info(f"景点详情命中缓存, poi_id: {poi_id}")
+            else:
+                response_json, error_msg = self._request_detail(request_data)
+                if response_json is None:
+                    return self._create_error_result(error_msg)
+                self.response_cache.put('detail', request_data, response_json)
 
             # 解析景点详情数据
             result = self._parse_core_data(response_json)
             result['success'] = True
             result['error_message'] = ''
+            if self.sink:
+                self.sink.add_detail(result)
 
             self.logger.info(f"成功获取景点详情, poi_id: {poi_id}")
             self.logger.log_data_extraction(1, "sight_detail")
@@ -143,6 +123,135 @@ class AttractionDetailFetcher:
             self.logger.log_error(error_msg, self.detail_url, "EXCEPTION")
             return self._create_error_result(error_msg)
 
+    def iter_details(self, poi_ids: Iterable, concurrency: int = DETAIL_CONCURRENCY, use_cache: bool = True):
+        """并发获取多个景点的详情，每个景点完成后立即产出
+
+        所有线程共享self.optimizer，每个请求仍经过详情接口的限速器；最多提前调度2倍并发数的景点，
+        调用方停止迭代时取消尚未开始的景点。单个景点失败（包括意外异常）只体现在它自己的结果中
+
+        Args:
+            poi_ids: 景点ID列表（重复的ID只获取一次）
+            concurrency: 同时在途的详情请求数
+            use_cache: 是否读取响应缓存
+
+        Yields:
+            tuple: (景点ID, get_detail的结果)，按完成先后顺序
+        """
+        remaining = iter(dict.fromkeys(poi_ids))
+        concurrency = max(1, concurrency)
+        executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="detail-fetch")
+        pending = {}
+
+        def submit(count):
+            for poi_id in islice(remaining, count):
+                pending[executor.submit(self._fetch_detail_worker, poi_id, use_cache)] = poi_id
+
+        try:
+            submit(concurrency * 2)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    poi_id = pending.pop(future)
+                    submit(1)
+                    yield poi_id, future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def get_details(self, poi_ids: Iterable, concurrency: int = DETAIL_CONCURRENCY,
+                    callback: Callable[[object, Dict], None] = None, use_cache: bool = True) -> Dict:
+        """并发获取多个景点的详情
+
+        Args:
+            poi_ids: 景点ID列表
+            concurrency: 同时在途的详情请求数
+            callback: 每个景点完成后调用 callback(poi_id, result)，可用于边获取边保存
+            use_cache: 是否读取响应缓存
+
+        Returns:
+            dict: {景点ID: get_detail的结果}，失败的景点success为False
+        """
+        poi_ids = list(dict.fromkeys(poi_ids))
+        self.logger.info(f"开始批量获取 {len(poi_ids)} 个景点的详情，并发数: {concurrency}")
+        start_time = time.time()
+        results = {}
+        for poi_id, result in self.iter_details(poi_ids, concurrency, use_cache):
+            results[poi_id] = result
+            if callback:
+                callback(poi_id, result)
+            if len(results) % 100 == 0 or len(results) == len(poi_ids):
+                self.logger.log_progress(len(results), len(poi_ids), "detail fetching")
+
+        success_count = sum(1 for result in results.values() if result['success'])
+        self.logger.info(f"批量获取详情完成，成功 {success_count}/{len(results)} 个，"
+                         f"耗时: {time.time() - start_time:.2f}秒")
+        return results
+
+    def _fetch_detail_worker(self, poi_id, use_cache: bool) -> Dict:
+        """工作线程入口：获取单个景点的详情，异常不影响其他景点"""
+        try:
+            return self.get_detail(poi_id, use_cache=use_cache)
+        except Exception as e:
+            error_msg = f"获取景点详情时发生异常: {e}"
+            self.logger.log_error(error_msg, f"POI_ID: {poi_id}", "WORKER")
+            return self._create_error_result(error_msg)
+
+    def _request_detail(self, request_data: Dict) -> Tuple[Optional[Dict], str]:
+        """请求详情接口并校验响应
+
+        Args:
+            request_data: 请求数据
+
+        Returns:
+            tuple: (响应JSON, 错误信息)，失败时响应JSON为None
+        """
+        # 接口熔断时直接跳过，然后应用延迟（按详情接口限速）
+        self.optimizer.check_circuit(self.detail_url)
+        self.optimizer.set_delay('detail')
+
+        # 获取请求头和代理
+        headers = self.optimizer.get_headers()
+        proxies = self.optimizer.get_proxy_dict()
+
+        # 发送请求
+        start_time = time.time()
+        response = self.optimizer.send(
+            'POST',
+            self.detail_url,
+            json=request_data,
+            headers=headers,
+            proxies=proxies,
+            timeout=10,
+            endpoint='detail'
+        )
+        end_time = time.time()
+        response_time = end_time - start_time
+
+        # 检查响应状态码（代理状态和限速反馈由optimizer.send统一记录）
+        if response.status_code != 200:
+            error_msg = f"请求失败，状态码: {response.status_code}"
+            self.logger.log_error(error_msg, self.detail_url, "POST")
+            return None, error_msg
+
+        self.logger.log_request(self.detail_url, response.status_code, response_time, "POST")
+
+        # 解析响应数据（安装了msgspec时只解码用到的字段）
+        try:
+            response_json = decode_detail_response(response.content)
+        except json.JSONDecodeError:
+            error_msg = "响应数据不是有效的JSON格式"
+            self.logger.log_error(error_msg, self.detail_url, "JSON_PARSE")
+            return None, error_msg
+
+        # 检查API错误
+        if 'error' in response_json or 'templateList' not in response_json:
+            error_msg = "API返回错误或缺少必要字段"
+            self.logger.log_error(error_msg, self.detail_url, "API_ERROR")
+            return None, error_msg
+
+        return response_json, ''
+
     def _create_error_result(self, error_message):
         """创建错误结果
 
@@ -305,19 +414,11 @@ class AttractionDetailFetcher:
                 # 清理HTML标签
                 if description:
                     try:
-                        # 使用更安全的方式解析HTML
-                        soup = BeautifulSoup(description, 'html.parser')
-
-                        # 获取纯文本并去除多余空白
-                        clean_text = soup.get_text()
-
-                        # 进一步处理：去除多余的空格和换行
-                        clean_text = ' '.join(clean_text.split())
-
-                        result['description'] = clean_text.strip()
+                        # 流式提取文本并合并多余的空格和换行，不构建文档树（结果与BeautifulSoup的get_text一致）
+                        result['description'] = html_to_text(description)
 
                     except Exception as e:
-                        # 如果BeautifulSoup处理失败，尝试简单的字符串替换
+                        # 如果HTML解析失败，尝试简单的字符串替换
                         self.logger.warning(f"HTML解析失败，使用备用方法: {e}")
                         # 使用正则表达式移除HTML标签
                         import re
@@ -1,13 +1,19 @@
-import requests
 import json
 import time
 import os
-from typing import Tuple, Optional, List
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, Tuple, Optional, List
 
 # 处理相对导入和绝对导入
 try:
     from .log import CtripSpiderLogger
     from .anti_spider import EnhancedRequestOptimizer
+    from .response_cache import ResponseCache
+    from .sight_id_map import SightIdMap
+    from .config import (RESPONSE_CACHE_DIR, RESPONSE_CACHE_TTLS, SIGHT_ID_MAP_PATH, SIGHT_ID_LRU_SIZE,
+                         SIGHT_ID_CONCURRENCY)
 except ImportError:
     # 直接运行时使用绝对导入
     import sys
@@ -15,6 +21,10 @@ except ImportError:
     sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     from Ctrip_Spider.log import CtripSpiderLogger
     from Ctrip_Spider.anti_spider import EnhancedRequestOptimizer
+    from Ctrip_Spider.response_cache import ResponseCache
+    from Ctrip_Spider.sight_id_map import SightIdMap
+    from Ctrip_Spider.config import (RESPONSE_CACHE_DIR, RESPONSE_CACHE_TTLS, SIGHT_ID_MAP_PATH, SIGHT_ID_LRU_SIZE,
+                                     SIGHT_ID_CONCURRENCY)
 
 
 class SightId:
@@ -26,7 +36,10 @@ class SightId:
         proxies: List[str] = None,
         use_proxy: bool = False,
         use_user_agent_rotation: bool = True,
-        logger: CtripSpiderLogger = None
+        logger: CtripSpiderLogger = None,
+        optimizer: EnhancedRequestOptimizer = None,
+        response_cache: ResponseCache = None,
+        id_map: SightIdMap = None
     ):
         """初始化景点ID搜索器
 
@@ -36,6 +49,9 @@ class SightId:
             use_proxy: 是否使用代理
             use_user_agent_rotation: 是否使用User-Agent轮换
             logger: 日志记录器实例
+            optimizer: 共享的请求优化器（连接池和限速器），为None时新建
+            response_cache: 接口响应缓存，为None时使用RESPONSE_CACHE_DIR下的缓存
+            id_map: 批量搜索使用的关键词映射，为None时首次批量搜索时打开SIGHT_ID_MAP_PATH
         """
         self.delay_range = delay_range
         self.search_url = "https://m.ctrip.com/restapi/soa2/26872/search"
@@ -46,8 +62,8 @@ class SightId:
         }
         self.logger = logger or CtripSpiderLogger("SightId", "logs")
         
-        # 初始化增强的请求优化器
-        self.optimizer = EnhancedRequestOptimizer(
+        # 初始化增强的请求优化器（传入optimizer时与其他爬虫共享连接池和限速器）
+        self.optimizer = optimizer or EnhancedRequestOptimizer(
             delay_range=delay_range,
             proxies=proxies,
             use_proxy=use_proxy,
@@ -55,16 +71,30 @@ class SightId:
             rotation_mode='random',
             logger=self.logger
         )
+        self.response_cache = response_cache or ResponseCache(RESPONSE_CACHE_DIR)
+        self.id_map = id_map
+        # 最近解析的 关键词 -> 景点ID，按使用先后排序
+        self._memo = OrderedDict()
+        self._memo_lock = threading.Lock()
+        self.memo_size = SIGHT_ID_LRU_SIZE
 
-    def search_sight_id(self, keyword: str) -> Optional[str]:
+    def search_sight_id(self, keyword: str, use_cache: bool = True) -> Optional[str]:
         """根据关键词搜索景点ID
 
+        关键词与批量搜索一样去除首尾空白；有效期内搜索过的关键词直接从响应缓存读取，
+        不发出请求（未找到景点的结果不缓存）
+
         Args:
             keyword: 景点关键词
+            use_cache: 是否读取缓存，为False时总是请求接口（成功后仍会更新缓存）
 
         Returns:
             str: 景点ID，未找到时返回None
         """
+        keyword = self._normalize_keyword(keyword)
+        if not keyword:
+            self.logger.warning("关键词为空，跳过搜索")
+            return None
         self.logger.info(f"开始搜索景点ID，关键词: {keyword}")
         try:
             codedata = {
@@ -75,42 +105,41 @@ class SightId:
                 "pagesize": 10
             }
 
+            data_dict = self.response_cache.get('search', codedata) if use_cache else None
+            if data_dict is not None:
+                self.logger.info(f"景点ID搜索命中缓存，关键词: {keyword}")
+                return self._first_sight_id(data_dict, keyword)
+
+            # 接口熔断时直接跳过，然后应用延迟（按搜索接口限速）
+            self.optimizer.check_circuit(self.search_url)
+            self.optimizer.set_delay('search')
+
             start_time = time.time()
             # 使用增强的请求优化器发送请求
             headers = self.optimizer.get_headers(self.base_headers)
             proxies = self.optimizer.get_proxy_dict()
             
-            response = requests.post(
+            response = self.optimizer.send(
+                'POST',
                 self.search_url,
                 data=json.dumps(codedata),
                 headers=headers,
                 proxies=proxies,
-                timeout=10
+                timeout=10,
+                endpoint='search'
             )
             response.raise_for_status()
             data_dict = response.json()
             end_time = time.time()
             response_time = end_time - start_time
 
-            # 记录请求信息
+            # 记录请求信息（代理状态和限速反馈由optimizer.send统一记录）
             self.logger.log_request(self.search_url, response.status_code, response_time, "POST")
-            
-            # 如果使用代理，更新代理状态
-            if proxies and self.optimizer.use_proxy:
-                proxy_url = proxies.get('http') or proxies.get('https')
-                if response.status_code == 200:
-                    self.optimizer.proxy_pool.mark_success(proxy_url)
-                else:
-                    self.optimizer.proxy_pool.mark_fail(proxy_url)
-
-            if data_dict.get('data') and isinstance(data_dict['data'], list) and len(data_dict['data']) > 0:
-                sight_id = data_dict['data'][0].get('id')
-                self.logger.info(f"成功获取景点ID: {sight_id}，关键词: {keyword}")
-                self.logger.log_data_extraction(1, "sight_id")
-                return sight_id
-            else:
-                self.logger.warning(f"未找到与关键词 '{keyword}' 匹配的景点ID")
-                return None
+
+            sight_id = self._first_sight_id(data_dict, keyword)
+            if sight_id is not None:
+                self.response_cache.put('search', codedata, data_dict)
+            return sight_id
 
         except Exception as e:
             self.logger.log_error(f"搜索景点ID时发生错误: {e}", self.search_url, "POST")
@@ -118,6 +147,124 @@ class SightId:
             self.logger.error(traceback.format_exc())
             return None
 
+    def search_sight_ids(self, keywords: Iterable[str], concurrency: int = SIGHT_ID_CONCURRENCY,
+                         use_cache: bool = True) -> List[Optional[str]]:
+        """批量搜索景点ID
+
+        关键词去除首尾空白后去重；依次查内存LRU和持久化的关键词映射，其余关键词在线程池中并发搜索
+        （每个请求仍经过搜索接口的限速器），找到的结果每满一批写入映射，中途中断也保留已解析的关键词
+
+        Args:
+            keywords: 关键词列表
+            concurrency: 同时在途的搜索请求数
+            use_cache: 是否读取LRU、映射和响应缓存，为False时所有关键词都请求接口（结果仍会写回）
+
+        Returns:
+            list: 与输入顺序一一对应的景点ID，未找到的关键词为None
+        """
+        keywords = [self._normalize_keyword(keyword) for keyword in keywords]
+        unique = [keyword for keyword in dict.fromkeys(keywords) if keyword]
+        resolved = {}
+        if use_cache:
+            with self._memo_lock:
+                for keyword in unique:
+                    if keyword in self._memo:
+                        self._memo.move_to_end(keyword)
+                        resolved[keyword] = self._memo[keyword]
+            stored = self._get_id_map().get_many([keyword for keyword in unique if keyword not in resolved])
+            self._remember(stored.items())
+            resolved.update(stored)
+
+        misses = [keyword for keyword in unique if keyword not in resolved]
+        self.logger.info(f"批量搜索景点ID: {len(keywords)} 个关键词，去重后 {len(unique)} 个，"
+                         f"命中缓存 {len(resolved)} 个，需要请求 {len(misses)} 个")
+        if misses:
+            resolved.update(self._search_concurrent(misses, concurrency, use_cache))
+
+        found = sum(1 for keyword in unique if resolved.get(keyword))
+        self.logger.info(f"批量搜索完成，{found}/{len(unique)} 个关键词找到景点ID")
+        self.logger.log_data_extraction(found, "sight_ids")
+        return [resolved.get(keyword) if keyword else None for keyword in keywords]
+
+    def _search_concurrent(self, keywords: List[str], concurrency: int, use_cache: bool) -> Dict[str, str]:
+        """并发搜索一批关键词，找到的结果写入LRU和关键词映射
+
+        Returns:
+            dict: {关键词: 景点ID}，只包含找到的关键词
+        """
+        id_map = self._get_id_map()
+        resolved = {}
+        batch = []
+        executor = ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(keywords))),
+                                      thread_name_prefix="sight-search")
+        futures = {executor.submit(self.search_sight_id, keyword, use_cache): keyword for keyword in keywords}
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                sight_id = future.result()
+                if sight_id is not None:
+                    keyword = futures[future]
+                    resolved[keyword] = sight_id
+                    batch.append((keyword, sight_id))
+                if len(batch) >= SightIdMap.QUERY_CHUNK:
+                    id_map.put_many(batch)
+                    batch = []
+                if done % 100 == 0 or done == len(keywords):
+                    self.logger.log_progress(done, len(keywords), "sight id search")
+        finally:
+            # 调用方中断时取消尚未开始的搜索，已解析的结果仍写入映射
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+            id_map.put_many(batch)
+            self._remember(resolved.items())
+        return resolved
+
+    @staticmethod
+    def _normalize_keyword(keyword) -> str:
+        """单个和批量搜索共用的关键词规范化：去除首尾空白，非字符串视为空关键词"""
+        return keyword.strip() if isinstance(keyword, str) else ''
+
+    def _get_id_map(self) -> SightIdMap:
+        if self.id_map is None:
+            self.id_map = SightIdMap(SIGHT_ID_MAP_PATH, ttl=RESPONSE_CACHE_TTLS.get('search'))
+        return self.id_map
+
+    def _remember(self, items: Iterable[Tuple[str, str]]):
+        """把解析结果放入LRU，超出容量时丢弃最久未使用的关键词"""
+        with self._memo_lock:
+            for keyword, sight_id in items:
+                self._memo[keyword] = sight_id
+                self._memo.move_to_end(keyword)
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+
+    def close(self):
+        """关闭关键词映射"""
+        if self.id_map is not None:
+            self.id_map.close()
+
+    def _first_sight_id(self, data_dict: dict, keyword: str) -> Optional[str]:
+        """从搜索响应中取第一个结果的景点ID
+
+        Args:
+            data_dict: 搜索接口的响应JSON
+            keyword: 景点关键词
+
+        Returns:
+            str: 景点ID（接口返回整数，统一转换为字符串，与关键词映射中保存的类型一致），未找到时返回None
+        """
+        if data_dict.get('data') and isinstance(data_dict['data'], list) and len(data_dict['data']) > 0:
+            sight_id = data_dict['data'][0].get('id')
+        else:
+            sight_id = None
+        if sight_id not in ('', None):
+            self.logger.info(f"成功获取景点ID: {sight_id}，关键词: {keyword}")
+            self.logger.log_data_extraction(1, "sight_id")
+            return str(sight_id)
+        else:
+            self.logger.warning(f"未找到与关键词 '{keyword}' 匹配的景点ID")
+            return None
+
 
 if __name__ == "__main__":
     # 创建日志记录器
@@ -0,0 +1,93 @@
+"""
+关键词到景点ID的持久化映射模块
+批量搜索景点ID时保存已解析的关键词，跨次运行直接复用
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sight_ids (
+    keyword TEXT PRIMARY KEY,
+    sight_id TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+class SightIdMap:
+    """关键词 -> 景点ID 的SQLite映射
+
+    按主键逐批查询，不需要把整个映射读入内存，几万个关键词的映射也只占用少量内存。
+    只保存找到景点的关键词；超过ttl秒的记录视为过期，不再返回
+    """
+
+    # 单条SQL中的参数个数上限（低于SQLite默认的999）
+    QUERY_CHUNK = 500
+
+    def __init__(self, db_path: str, ttl: float = None):
+        """
+        初始化映射并创建表
+
+        Args:
+            db_path: 数据库文件路径
+            ttl: 记录有效期（秒），为None时永不过期
+        """
+        self.db_path = db_path
+        self.ttl = ttl
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def get_many(self, keywords: Iterable[str]) -> Dict[str, str]:
+        """
+        查询一批关键词
+
+        Args:
+            keywords: 关键词列表
+
+        Returns:
+            dict: {关键词: 景点ID}，只包含找到且未过期的关键词
+        """
+        keywords = list(keywords)
+        min_time = time.time() - self.ttl if self.ttl else 0
+        found = {}
+        with self._lock:
+            for start in range(0, len(keywords), self.QUERY_CHUNK):
+                chunk = keywords[start:start + self.QUERY_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT keyword, sight_id FROM sight_ids WHERE keyword IN ({placeholders}) AND updated_at >= ?",
+                    chunk + [min_time]
+                )
+                found.update(rows)
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, str]]):
+        """
+        在一个事务中保存一批关键词的景点ID
+
+        Args:
+            items: (关键词, 景点ID) 列表
+        """
+        now = time.time()
+        rows = [(keyword, str(sight_id), now) for keyword, sight_id in items]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO sight_ids VALUES (?, ?, ?)", rows)
+
+    def count(self) -> int:
+        """映射中的关键词数"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sight_ids").fetchone()[0]
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
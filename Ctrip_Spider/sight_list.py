@@ -1,13 +1,21 @@
+import asyncio
 import requests
 import json
+import math
 import time
 import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional, Tuple
 
 # 处理相对导入和绝对导入
 try:
     from .log import CtripSpiderLogger
     from .anti_spider import EnhancedRequestOptimizer
+    from .jsonl_sink import JsonlWriter
+    from .attraction_index import AttractionIndex
+    from .config import ATTRACTION_INDEX_DIR, ATTRACTION_INDEX_CONCURRENCY
+    from .typed_json import decode_attraction_page
 except ImportError:
     # 直接运行时使用绝对导入
     import sys
@@ -15,6 +23,10 @@ except ImportError:
     sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     from Ctrip_Spider.log import CtripSpiderLogger
     from Ctrip_Spider.anti_spider import EnhancedRequestOptimizer
+    from Ctrip_Spider.jsonl_sink import JsonlWriter
+    from Ctrip_Spider.attraction_index import AttractionIndex
+    from Ctrip_Spider.config import ATTRACTION_INDEX_DIR, ATTRACTION_INDEX_CONCURRENCY
+    from Ctrip_Spider.typed_json import decode_attraction_page
 
 class CtripAttractionScraper:
     """携程景点数据爬取器，用于获取指定地区的景点信息"""
@@ -26,7 +38,10 @@ class CtripAttractionScraper:
         proxies: List[str] = None,
         use_proxy: bool = False,
         use_user_agent_rotation: bool = True,
-        logger: CtripSpiderLogger = None
+        logger: CtripSpiderLogger = None,
+        optimizer: EnhancedRequestOptimizer = None,
+        sink=None,
+        attraction_index: AttractionIndex = None
     ):
         """初始化爬虫
 
@@ -37,13 +52,16 @@ class CtripAttractionScraper:
             use_proxy: 是否使用代理
             use_user_agent_rotation: 是否使用User-Agent轮换
             logger: 日志记录器实例
+            optimizer: 共享的请求优化器（连接池和限速器），为None时新建
+            sink: 可选的数据存储（如SQLiteSink），获取的景点同时写入
+            attraction_index: get_attraction_by_id使用的地区景点索引，为None时使用ATTRACTION_INDEX_DIR下的索引
         """
         self.url = 'https://m.ctrip.com/restapi/soa2/13342/json/getSightRecreationList'
         self.timeout = timeout
         self.logger = logger or CtripSpiderLogger("CtripAttractionScraper", "logs")
         
-        # 初始化增强的请求优化器
-        self.optimizer = EnhancedRequestOptimizer(
+        # 初始化增强的请求优化器（传入optimizer时与其他爬虫共享连接池和限速器）
+        self.optimizer = optimizer or EnhancedRequestOptimizer(
             delay_range=delay_range,
             proxies=proxies,
             use_proxy=use_proxy,
@@ -51,6 +69,8 @@ class CtripAttractionScraper:
             rotation_mode='random',
             logger=self.logger
         )
+        self.sink = sink
+        self.attraction_index = attraction_index or AttractionIndex(ATTRACTION_INDEX_DIR)
     
     def get_attractions_list(self, district_id: int, page: int = 1, count: int = 20) -> List[Dict]:
         """获取某个地区的景点列表
@@ -63,53 +83,66 @@ class CtripAttractionScraper:
         Returns:
             list: 景点信息列表，每个景点包含基本信息
         """
+        return self._fetch_attractions_page(district_id, page, count)[0] or []
+
+    def _fetch_attractions_page(self, district_id: int, page: int,
+                                count: int) -> Tuple[Optional[List[Dict]], Optional[int]]:
+        """获取一页景点及地区景点总数
+
+        Args:
+            district_id: 地区ID
+            page: 页码
+            count: 每页数量
+
+        Returns:
+            tuple: (景点信息列表, 响应中的景点总数)，请求失败时景点列表为None（空页为空列表），
+                总数缺失或请求失败时为None
+        """
         self.logger.info(f"开始获取地区 {district_id} 的景点列表，第 {page} 页")
         data = self._build_request_data(district_id, page, count)
 
         try:
-            # 应用延迟
-            self.optimizer.set_delay()
+            # 接口熔断时直接跳过，然后应用延迟（按列表接口限速）
+            self.optimizer.check_circuit(self.url)
+            self.optimizer.set_delay('list')
             
             # 获取请求头和代理
             headers = self.optimizer.get_headers()
             proxies = self.optimizer.get_proxy_dict()
             
             start_time = time.time()
-            response = requests.post(
+            response = self.optimizer.send(
+                'POST',
                 self.url,
                 json=data,
                 headers=headers,
                 proxies=proxies,
-                timeout=self.timeout
+                timeout=self.timeout,
+                endpoint='list'
             )
             end_time = time.time()
             response_time = end_time - start_time
 
+            # 代理状态和限速反馈由optimizer.send统一记录
             if response.status_code != 200:
                 self.logger.log_error(f"请求失败，状态码: {response.status_code}", self.url, "POST")
-                # 如果使用代理，标记失败
-                if proxies and self.optimizer.use_proxy:
-                    proxy_url = proxies.get('http') or proxies.get('https')
-                    self.optimizer.proxy_pool.mark_fail(proxy_url)
-                return []
+                return None, None
 
             self.logger.log_request(self.url, response.status_code, response_time, "POST")
             
-            # 如果使用代理，更新代理状态
-            if proxies and self.optimizer.use_proxy:
-                proxy_url = proxies.get('http') or proxies.get('https')
-                self.optimizer.proxy_pool.mark_success(proxy_url)
-            response_json = response.json()
+            # 安装了msgspec时只解码用到的字段
+            response_json = decode_attraction_page(response.content)
 
             if not response_json.get('result'):
                 self.logger.warning(f"第{page}页响应中未找到result字段")
-                return []
+                return None, None
 
             poi_list = response_json['result'].get('sightRecreationList', [])
+            total_count = response_json['result'].get('totalCount')
 
             if len(poi_list) == 0:
                 self.logger.info(f"第{page}页没有数据")
-                return []
+                return [], total_count
 
             attractions = []
             for poi in poi_list:
@@ -117,20 +150,23 @@ class CtripAttractionScraper:
                 if basic_info:
                     attractions.append(basic_info)
 
+            if self.sink:
+                self.sink.add_attractions(attractions, district_id)
+
             self.logger.info(f"第{page}页成功获取{len(attractions)}个景点")
             self.logger.log_data_extraction(len(attractions), "attractions")
-            return attractions
+            return attractions, total_count
 
         except requests.RequestException as e:
             self.logger.log_error(f"网络请求异常: {e}", self.url, "REQUEST_EXCEPTION")
-            return []
+            return None, None
         except json.JSONDecodeError as e:
             self.logger.log_error(f"JSON解析异常: {e}", self.url, "JSON_PARSE_ERROR")
-            return []
+            return None, None
         except Exception as e:
             self.logger.log_error(f"获取景点列表异常: {e}", self.url, "EXCEPTION")
-            return []
-    
+            return None, None
+
     def _build_request_data(self, district_id: int, page: int, count: int) -> Dict:
         """构建请求数据
 
@@ -225,60 +261,284 @@ class CtripAttractionScraper:
             self.logger.log_error(f"解析景点基本信息异常: {e}", "parse_poi_basic_info", "PARSING")
             return None
     
-    def get_attractions_with_pagination(self, district_id: int, pages: int = 1, 
-                                      count_per_page: int = 20) -> List[Dict]:
+    def get_attractions_with_pagination(self, district_id: int, pages: Optional[int] = 1,
+                                      count_per_page: int = 20, output_path: str = None,
+                                      collect: bool = True, concurrency: int = 1,
+                                      failed_pages: List[int] = None) -> List[Dict]:
         """获取多页景点数据
 
         Args:
             district_id: 地区ID
-            pages: 要获取的页数，默认为1
+            pages: 要获取的页数，默认为1，为None时获取全部页
             count_per_page: 每页数量，默认为20
+            output_path: JSON Lines输出文件路径，指定时每获取一页立即追加写出（每行一个景点），
+                中途中断也保留已获取的页面，下游可在爬取过程中逐行读取
+            collect: 是否在内存中收集并返回所有景点，流式写出大地区时可设为False以免内存随景点数增长
+            concurrency: 同时在途的页面请求数，大于1时按第一页返回的总数并发获取其余页面
+                （仍受列表接口限速约束），按页序合并
+            failed_pages: 传入列表时，把获取失败的页码（请求已按优化器的重试策略重试）追加到其中，用于判断结果是否完整
 
         Returns:
-            list: 所有页的景点信息列表
+            list: 所有页的景点信息列表（collect为False时为空列表），跨页重复的景点只保留第一次出现
         """
-        self.logger.info(f"开始获取地区 {district_id} 的多页景点数据，共 {pages} 页")
+        self.logger.info(f"开始获取地区 {district_id} 的多页景点数据，"
+                         f"共 {pages if pages is not None else '全部'} 页，并发数: {concurrency}")
         start_time = time.time()
         all_attractions = []
+        total = 0
+        seen = set()
+        writer = JsonlWriter(output_path) if output_path else None
+        if concurrency > 1:
+            page_iter = self._iter_attraction_pages_concurrent(district_id, pages, count_per_page, concurrency,
+                                                               failed_pages)
+        else:
+            page_iter = self._iter_attraction_pages(district_id, pages, count_per_page, failed_pages=failed_pages)
 
-        for page in range(1, pages + 1):
-            self.logger.info(f"正在获取第{page}页数据...")
-            attractions = self.get_attractions_list(district_id, page, count_per_page)
+        try:
+            for page, attractions in page_iter:
+                # 翻页期间列表变动会使景点跨页重复出现
+                attractions = self._drop_seen(attractions, seen)
+                if writer:
+                    writer.write_records(attractions)
+                if collect:
+                    all_attractions.extend(attractions)
+                total += len(attractions)
+                # 记录进度
+                self.logger.log_progress(page, pages or page, "attraction list crawling")
+        finally:
+            page_iter.close()
+            if writer:
+                writer.close()
+
+        if self.sink:
+            self.sink.flush()
+
+        end_time = time.time()
+        self.logger.info(f"总共获取到{total}个景点，耗时: {end_time-start_time:.2f}秒")
+        if writer:
+            self.logger.info(f"景点数据已流式写入 {output_path}")
+        self.logger.log_data_extraction(total, "paginated_attractions")
+        return all_attractions
+
+    def _iter_attraction_pages(self, district_id: int, pages: int = None, count_per_page: int = 20,
+                               start_page: int = 1, failed_pages: List[int] = None):
+        """逐页获取景点，调用方处理完一页后才请求下一页，遇到空页或获取失败的页面停止
+
+        Args:
+            district_id: 地区ID
+            pages: 最多获取的页数，为None时一直获取到空页
+            count_per_page: 每页数量
+            start_page: 起始页码
+            failed_pages: 传入列表时追加获取失败的页码
 
+        Yields:
+            tuple: (页码, 景点信息列表)
+        """
+        page = start_page
+        while pages is None or page < start_page + pages:
+            self.logger.info(f"正在获取第{page}页数据...")
+            attractions, _ = self._fetch_attractions_page(district_id, page, count_per_page)
+            if attractions is None:
+                self.logger.warning(f"第{page}页数据获取失败，停止获取")
+                if failed_pages is not None:
+                    failed_pages.append(page)
+                return
             if not attractions:
                 self.logger.info(f"第{page}页没有数据，停止获取")
-                break
+                return
+            yield page, attractions
+            page += 1
 
-            all_attractions.extend(attractions)
-            # 记录进度
-            self.logger.log_progress(page, pages, "attraction list crawling")
+    def _iter_attraction_pages_concurrent(self, district_id: int, pages: Optional[int], count_per_page: int,
+                                          concurrency: int, failed_pages: List[int] = None):
+        """先获取第一页得到总页数，再并发获取其余页面，按页序产出
 
-        end_time = time.time()
-        self.logger.info(f"总共获取到{len(all_attractions)}个景点，耗时: {end_time-start_time:.2f}秒")
-        self.logger.log_data_extraction(len(all_attractions), "paginated_attractions")
-        return all_attractions
+        请求在线程池中执行，每个请求仍经过列表接口的限速器；最多提前调度2倍并发数的页面，
+        调用方停止迭代时取消尚未开始的页面。响应中没有总数时退回逐页获取
+
+        Args:
+            district_id: 地区ID
+            pages: 最多获取的页数，为None时获取全部页
+            count_per_page: 每页数量
+            concurrency: 同时在途的页面请求数
+            failed_pages: 传入列表时追加获取失败的页码
+
+        Yields:
+            tuple: (页码, 景点信息列表)，获取失败的页面跳过并记录到failed_pages
+        """
+        self.logger.info("正在获取第1页数据...")
+        attractions, total_count = self._fetch_attractions_page(district_id, 1, count_per_page)
+        if attractions is None:
+            self.logger.warning("第1页数据获取失败，停止获取")
+            if failed_pages is not None:
+                failed_pages.append(1)
+            return
+        if not attractions:
+            self.logger.info("第1页没有数据，停止获取")
+            return
+        yield 1, attractions
+
+        if not total_count:
+            self.logger.warning("响应中没有景点总数，改为逐页获取")
+            for page, attractions in self._iter_attraction_pages(district_id, None if pages is None else pages - 1,
+                                                                 count_per_page, start_page=2,
+                                                                 failed_pages=failed_pages):
+                yield page, attractions
+            return
+
+        last_page = math.ceil(int(total_count) / count_per_page)
+        if pages is not None:
+            last_page = min(last_page, pages)
+        self.logger.info(f"地区 {district_id} 共 {total_count} 个景点，并发获取第2~{last_page}页")
+
+        executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="list-fetch")
+        pending = deque()
+        next_page = 2
+        try:
+            while next_page <= last_page or pending:
+                while next_page <= last_page and len(pending) < concurrency * 2:
+                    pending.append((next_page, executor.submit(self._fetch_attractions_page, district_id,
+                                                               next_page, count_per_page)))
+                    next_page += 1
+                page, future = pending.popleft()
+                attractions, _ = future.result()
+                if attractions is None:
+                    self.logger.warning(f"第{page}页获取失败，跳过")
+                    if failed_pages is not None:
+                        failed_pages.append(page)
+                    continue
+                if not attractions:
+                    # 翻页期间景点减少时末尾的页面为空
+                    self.logger.info(f"第{page}页没有数据")
+                    continue
+                yield page, attractions
+        finally:
+            for _, future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    @staticmethod
+    def _drop_seen(attractions: List[Dict], seen: set) -> List[Dict]:
+        """过滤已出现过的景点（按poi_id，缺失时按id），并把新景点加入seen"""
+        unique = []
+        for attraction in attractions:
+            key = attraction.get('poi_id') or attraction.get('id')
+            if key:
+                if key in seen:
+                    continue
+                seen.add(key)
+            unique.append(attraction)
+        return unique
+
+    def iter_attractions(self, district_id: int, pages: int = None, count_per_page: int = 20,
+                         failed_pages: List[int] = None):
+        """逐个产出地区的景点
+
+        生成器被消费到下一页时才发出下一页的请求，内存中最多只有一页景点；提前停止迭代时不再发出请求。
+        某页获取失败时记录日志并停止迭代
+
+        Args:
+            district_id: 地区ID
+            pages: 最多获取的页数，为None时一直获取到空页
+            count_per_page: 每页数量
+            failed_pages: 传入列表时追加获取失败的页码，用于区分获取失败与列表结束
+
+        Yields:
+            dict: 景点信息
+        """
+        for _, attractions in self._iter_attraction_pages(district_id, pages, count_per_page,
+                                                          failed_pages=failed_pages):
+            yield from attractions
+
+    async def aiter_attractions(self, district_id: int, pages: int = None, count_per_page: int = 20,
+                                failed_pages: List[int] = None):
+        """iter_attractions的异步迭代器版本，翻页逻辑相同，每页的请求在线程池中执行，不阻塞事件循环
+
+        消费者取走当前页后才请求下一页
+
+        Args:
+            district_id: 地区ID
+            pages: 最多获取的页数，为None时一直获取到空页
+            count_per_page: 每页数量
+            failed_pages: 传入列表时追加获取失败的页码，用于区分获取失败与列表结束
+
+        Yields:
+            dict: 景点信息
+        """
+        loop = asyncio.get_running_loop()
+        page_iter = self._iter_attraction_pages(district_id, pages, count_per_page, failed_pages=failed_pages)
+        try:
+            while True:
+                # 一次只推进一页，生成器不会被多个线程同时执行
+                item = await loop.run_in_executor(None, next, page_iter, None)
+                if item is None:
+                    return
+                for attraction in item[1]:
+                    yield attraction
+        finally:
+            page_iter.close()
+
+    def build_attraction_index(self, district_id: int, count_per_page: int = 20,
+                               concurrency: int = ATTRACTION_INDEX_CONCURRENCY) -> int:
+        """翻页获取地区的全部景点并重建该地区的索引
+
+        有页面获取失败时结果不完整：已有索引时保留原索引；没有索引时保存为未完成的索引，
+        可以用于查询，但不视为最新，下次查询时重新翻页
+
+        Args:
+            district_id: 地区ID
+            count_per_page: 每页数量
+            concurrency: 翻页的并发数
+
+        Returns:
+            int: 新索引中的景点数，未获取到景点或保留原索引时返回0
+        """
+        self.logger.info(f"开始构建地区 {district_id} 的景点索引")
+        failed_pages = []
+        attractions = self.get_attractions_with_pagination(
+            district_id, pages=None, count_per_page=count_per_page, concurrency=concurrency,
+            failed_pages=failed_pages
+        )
+        if not attractions:
+            self.logger.warning(f"未获取到地区 {district_id} 的景点，保留原索引")
+            return 0
+        if failed_pages:
+            if self.attraction_index.attractions(district_id):
+                self.logger.warning(f"地区 {district_id} 第 {sorted(failed_pages)} 页获取失败，保留原索引")
+                return 0
+            self.attraction_index.build(district_id, attractions, complete=False)
+            self.logger.warning(f"地区 {district_id} 第 {sorted(failed_pages)} 页获取失败，"
+                                f"保存未完成的索引（{len(attractions)} 个景点），下次查询时重新构建")
+            return len(attractions)
+        self.attraction_index.build(district_id, attractions)
+        self.logger.info(f"地区 {district_id} 的景点索引已更新，共 {len(attractions)} 个景点")
+        return len(attractions)
 
     def get_attraction_by_id(self, district_id: int, attraction_id: str, 
-                           count_per_page: int = 20) -> Optional[Dict]:
+                           count_per_page: int = 20, refresh: bool = False) -> Optional[Dict]:
         """根据景点ID获取特定景点信息
 
+        在地区景点索引中按景点ID或POI ID查找；索引不存在、已过期、不完整或refresh为True时先翻页重建索引，
+        之后的查询直接命中本地索引，不再发出请求
+
         Args:
             district_id: 地区ID
-            attraction_id: 景点ID
-            count_per_page: 每页数量
+            attraction_id: 景点ID或POI ID
+            count_per_page: 构建索引时的每页数量
+            refresh: 是否强制重建索引
 
         Returns:
             dict: 景点信息，未找到返回None
         """
         self.logger.info(f"根据ID查找景点，地区ID: {district_id}, 景点ID: {attraction_id}")
-        # 获取第一页数据并查找特定景点
-        attractions = self.get_attractions_list(district_id, 1, count_per_page)
+        if refresh or not self.attraction_index.is_fresh(district_id):
+            self.build_attraction_index(district_id, count_per_page)
 
-        for attraction in attractions:
-            if attraction.get('id') == attraction_id or attraction.get('poi_id') == attraction_id:
-                self.logger.info(f"成功找到景点: {attraction.get('name', 'Unknown')}")
-                self.logger.log_data_extraction(1, "specific_attraction")
-                return attraction
+        attraction = self.attraction_index.lookup(district_id, attraction_id)
+        if attraction:
+            self.logger.info(f"成功找到景点: {attraction.get('name', 'Unknown')}")
+            self.logger.log_data_extraction(1, "specific_attraction")
+            return attraction
 
         self.logger.warning(f"在地区{district_id}中未找到ID为{attraction_id}的景点")
         return None
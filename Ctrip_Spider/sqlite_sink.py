@@ -0,0 +1,358 @@
+"""
+SQLite数据存储模块
+景点列表、景点详情和评论写入同一个SQLite数据库，按景点ID、评论ID和发布时间建立索引
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+# 处理相对导入和绝对导入
+try:
+    from .log import CtripSpiderLogger
+    from .config import SQLITE_BATCH_SIZE, SQLITE_FLUSH_INTERVAL
+except ImportError:
+    # 直接运行时使用绝对导入
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from Ctrip_Spider.log import CtripSpiderLogger
+    from Ctrip_Spider.config import SQLITE_BATCH_SIZE, SQLITE_FLUSH_INTERVAL
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attractions (
+    poi_id INTEGER PRIMARY KEY,
+    sight_id INTEGER,
+    district_id INTEGER,
+    name TEXT,
+    english_name TEXT,
+    longitude REAL,
+    latitude REAL,
+    tags TEXT,
+    features TEXT,
+    price REAL,
+    min_price REAL,
+    rating REAL,
+    review_count INTEGER,
+    cover_image TEXT,
+    address TEXT,
+    district_name TEXT,
+    city_name TEXT,
+    province_name TEXT,
+    star_rating TEXT,
+    open_time TEXT,
+    description TEXT,
+    recommend_duration TEXT,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_attractions_district ON attractions(district_id);
+CREATE INDEX IF NOT EXISTS idx_attractions_sight_id ON attractions(sight_id);
+
+CREATE TABLE IF NOT EXISTS details (
+    poi_id INTEGER PRIMARY KEY,
+    poi_name TEXT,
+    english_name TEXT,
+    district TEXT,
+    latitude REAL,
+    longitude REAL,
+    telephone TEXT,
+    ticket_price REAL,
+    description TEXT,
+    traffic TEXT,
+    updated_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS comments (
+    poi_id INTEGER NOT NULL,
+    comment_id INTEGER NOT NULL,
+    poi_name TEXT,
+    user_nick TEXT,
+    score REAL,
+    content TEXT,
+    publish_time TEXT,
+    useful_count INTEGER,
+    reply_count INTEGER,
+    tourist_type TEXT,
+    ip_location TEXT,
+    time_duration TEXT,
+    image_count INTEGER,
+    image_urls TEXT,
+    scenery_score REAL,
+    fun_score REAL,
+    value_score REAL,
+    recommend_items TEXT,
+    PRIMARY KEY (poi_id, comment_id)
+);
+CREATE INDEX IF NOT EXISTS idx_comments_comment_id ON comments(comment_id);
+CREATE INDEX IF NOT EXISTS idx_comments_publish_time ON comments(poi_id, publish_time);
+"""
+
+ATTRACTION_COLUMNS = (
+    'poi_id', 'sight_id', 'district_id', 'name', 'english_name', 'longitude', 'latitude', 'tags', 'features',
+    'price', 'min_price', 'rating', 'review_count', 'cover_image', 'address', 'district_name', 'city_name',
+    'province_name', 'star_rating', 'open_time', 'description', 'recommend_duration', 'updated_at'
+)
+DETAIL_COLUMNS = (
+    'poi_id', 'poi_name', 'english_name', 'district', 'latitude', 'longitude', 'telephone', 'ticket_price',
+    'description', 'traffic', 'updated_at'
+)
+COMMENT_COLUMNS = (
+    'poi_id', 'comment_id', 'poi_name', 'user_nick', 'score', 'content', 'publish_time', 'useful_count',
+    'reply_count', 'tourist_type', 'ip_location', 'time_duration', 'image_count', 'image_urls',
+    'scenery_score', 'fun_score', 'value_score', 'recommend_items'
+)
+# 以JSON文本保存的列表字段
+JSON_COLUMNS = {'tags', 'features', 'telephone', 'traffic'}
+
+
+def _number(value):
+    """空字符串等无法转换的值存为NULL"""
+    if value in ('', None):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _json(value) -> str:
+    return json.dumps(value if value is not None else [], ensure_ascii=False)
+
+
+class SQLiteSink:
+    """爬取结果的SQLite存储
+
+    所有爬虫可共享同一个实例（内部加锁）。写入先进入内存批次，累计batch_size行或距上次提交
+    超过flush_interval秒时按表各用一个事务批量插入；数据库使用WAL模式，写入时其他进程仍可并发查询。
+    同一景点/评论重复写入时覆盖旧记录，缺少主键（poi_id、commentId）的行跳过并计入skipped_rows
+    """
+
+    def __init__(self, db_path: str, batch_size: int = SQLITE_BATCH_SIZE,
+                 flush_interval: float = SQLITE_FLUSH_INTERVAL, logger: CtripSpiderLogger = None):
+        """
+        初始化存储并创建表和索引
+
+        Args:
+            db_path: 数据库文件路径
+            batch_size: 累计多少行后提交一次事务
+            flush_interval: 距上次提交多少秒后提交（在下一次写入时检查）
+            logger: 日志记录器实例
+        """
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.logger = logger or CtripSpiderLogger("SQLiteSink", "logs")
+
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        # WAL模式下NORMAL只在检查点时fsync，断电最多丢失最近提交的事务，不会损坏数据库
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+        self._lock = threading.RLock()
+        self._pending = {'attractions': [], 'details': [], 'comments': []}
+        self._pending_rows = 0
+        self._last_flush = time.monotonic()
+        self.stats = {'rows_written': 0, 'transactions': 0, 'failed_rows': 0, 'skipped_rows': 0}
+
+    def add_attractions(self, attractions: Iterable[Dict], district_id: int = None):
+        """
+        写入景点列表（CtripAttractionScraper._parse_poi_basic_info的结果），缺少poi_id的景点跳过
+
+        Args:
+            attractions: 景点信息列表
+            district_id: 所属地区ID
+        """
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        rows = []
+        skipped = 0
+        for item in attractions:
+            if item.get('poi_id') in ('', None):
+                skipped += 1
+                continue
+            rows.append((
+                item['poi_id'], item.get('id') or None, district_id, item.get('name', ''),
+                item.get('english_name', ''), _number(item.get('longitude')), _number(item.get('latitude')),
+                _json(item.get('tags')), _json(item.get('features')), _number(item.get('price')),
+                _number(item.get('min_price')), _number(item.get('rating')), item.get('review_count', 0),
+                item.get('cover_image', ''), item.get('address', ''), item.get('district_name', ''),
+                item.get('city_name', ''), item.get('province_name', ''), str(item.get('star_rating', '')),
+                item.get('open_time', ''), item.get('description', ''), str(item.get('recommend_duration', '')),
+                now
+            ))
+        self._skip('attractions', skipped)
+        self._add('attractions', rows)
+
+    def add_detail(self, detail: Dict):
+        """
+        写入景点详情（AttractionDetailFetcher.get_detail的结果），获取失败的结果跳过
+
+        Args:
+            detail: 景点详情
+        """
+        if not detail.get('success', True) or detail.get('poi_id') in ('', None):
+            return
+        coordinates = detail.get('coordinates') or {}
+        self._add('details', [(
+            detail['poi_id'], detail.get('poi_name', ''), detail.get('english_name', ''), detail.get('district', ''),
+            _number(coordinates.get('latitude')), _number(coordinates.get('longitude')),
+            _json(detail.get('telephone')), _number(detail.get('ticket_price')), detail.get('description', ''),
+            _json(detail.get('traffic')), datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        )])
+
+    def add_comments(self, poi_id: str, poi_name: str, comments: Iterable[Dict]):
+        """
+        写入一批评论（CtripCommentSpider._get_page_comments的结果），缺少commentId的评论跳过
+        （否则同一景点下这些评论的主键相同，互相覆盖）
+
+        Args:
+            poi_id: 景点ID
+            poi_name: 景点名称
+            comments: 评论数据列表
+        """
+        comments = list(comments)
+        valid = [comment for comment in comments if comment.get('commentId') not in ('', None)]
+        self._skip('comments', len(comments) - len(valid))
+        self._add('comments', [(
+            poi_id, comment['commentId'], poi_name, comment.get('userNick', ''), _number(comment.get('score')),
+            comment.get('content', ''), comment.get('publishTime', ''), comment.get('usefulCount', 0),
+            comment.get('replyCount', 0), comment.get('touristTypeDisplay', ''), comment.get('ipLocatedName', ''),
+            comment.get('timeDuration', ''), comment.get('imageCount', 0), comment.get('imageUrls', ''),
+            _number(comment.get('sceneryScore')), _number(comment.get('funScore')),
+            _number(comment.get('valueScore')), comment.get('recommendItems', '')
+        ) for comment in valid])
+
+    def _skip(self, table: str, count: int):
+        """记录因缺少主键而跳过的行"""
+        if not count:
+            return
+        with self._lock:
+            self.stats['skipped_rows'] += count
+        self.logger.warning(f"{count} 行{table}数据缺少ID，已跳过")
+
+    def _add(self, table: str, rows: List[tuple]):
+        if not rows:
+            return
+        with self._lock:
+            self._pending[table].extend(rows)
+            self._pending_rows += len(rows)
+            if self._pending_rows >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval:
+                self.flush()
+
+    def flush(self):
+        """提交所有待写入的行，每个表一个事务，失败时只回滚并丢弃该表的批次（记录错误，不中断爬取）"""
+        columns = {'attractions': ATTRACTION_COLUMNS, 'details': DETAIL_COLUMNS, 'comments': COMMENT_COLUMNS}
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._pending_rows:
+                return
+            pending = self._pending
+            self._pending = {table: [] for table in pending}
+            self._pending_rows = 0
+            for table, rows in pending.items():
+                if not rows:
+                    continue
+                placeholders = ', '.join('?' * len(columns[table]))
+                try:
+                    with self._conn:
+                        self._conn.executemany(
+                            f"INSERT OR REPLACE INTO {table} ({', '.join(columns[table])}) VALUES ({placeholders})",
+                            rows
+                        )
+                    self.stats['rows_written'] += len(rows)
+                    self.stats['transactions'] += 1
+                except sqlite3.Error as e:
+                    self.stats['failed_rows'] += len(rows)
+                    self.logger.log_error(f"写入{table}表失败，丢弃 {len(rows)} 行: {e}", self.db_path, "DB_WRITE")
+
+    def query(self, sql: str, params: tuple = ()) -> List[Dict]:
+        """
+        执行查询（先提交待写入的行），返回字典列表，JSON字段解析为列表
+
+        Args:
+            sql: SQL语句
+            params: 参数
+
+        Returns:
+            list: 查询结果
+        """
+        with self._lock:
+            self.flush()
+            cursor = self._conn.execute(sql, params)
+            names = [column[0] for column in cursor.description]
+            rows = cursor.fetchall()
+        results = []
+        for row in rows:
+            record = dict(zip(names, row))
+            for name in JSON_COLUMNS.intersection(record):
+                if isinstance(record[name], str):
+                    record[name] = json.loads(record[name])
+            results.append(record)
+        return results
+
+    def get_attraction(self, poi_id) -> Optional[Dict]:
+        """获取景点列表信息，并附带景点详情（没有详情时为None）"""
+        rows = self.query(
+            "SELECT a.*, d.telephone, d.ticket_price, d.traffic, d.description AS detail_description "
+            "FROM attractions a LEFT JOIN details d ON d.poi_id = a.poi_id WHERE a.poi_id = ?", (poi_id,))
+        return rows[0] if rows else None
+
+    def get_detail(self, poi_id) -> Optional[Dict]:
+        """获取景点详情"""
+        rows = self.query("SELECT * FROM details WHERE poi_id = ?", (poi_id,))
+        return rows[0] if rows else None
+
+    def get_comments(self, poi_id, since: str = None, limit: int = None) -> List[Dict]:
+        """
+        获取景点的评论，按发布时间从新到旧
+
+        Args:
+            poi_id: 景点ID
+            since: 只返回不早于该时间的评论（格式 'YYYY-MM-DD HH:MM:SS'）
+            limit: 最多返回的条数
+
+        Returns:
+            list: 评论列表
+        """
+        sql = "SELECT * FROM comments WHERE poi_id = ?"
+        params = [poi_id]
+        if since:
+            sql += " AND publish_time >= ?"
+            params.append(since)
+        sql += " ORDER BY publish_time DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self.query(sql, tuple(params))
+
+    def count_comments(self, poi_id=None) -> int:
+        """评论条数，poi_id为None时统计全部"""
+        if poi_id is None:
+            return self.query("SELECT COUNT(*) AS n FROM comments")[0]['n']
+        return self.query("SELECT COUNT(*) AS n FROM comments WHERE poi_id = ?", (poi_id,))[0]['n']
+
+    def get_stats(self) -> Dict:
+        """获取写入统计"""
+        with self._lock:
+            return dict(self.stats, pending_rows=self._pending_rows)
+
+    def close(self):
+        """提交待写入的行并关闭数据库"""
+        with self._lock:
+            if self._conn is None:
+                return
+            self.flush()
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
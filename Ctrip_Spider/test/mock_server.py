@@ -0,0 +1,252 @@
+"""
+本地携程接口替身服务器
+用于测试和性能基准，不依赖外网
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def build_comment_item(position: int, poi_id: str = '76865') -> dict:
+    """根据全局位置生成一条确定性的评论（位置0为初始时最新的评论，负数位置为之后新增的评论）"""
+    comment_id = 900000000 - position
+    publish_ms = 1700000000000 - position * 3600 * 1000
+    return {
+        'commentId': comment_id,
+        'userInfo': {'userNick': f'用户{comment_id}'},
+        'score': 5 - position % 3,
+        'content': f'第{position}条评论\n景色很好，  值得一去',
+        'publishTime': f'/Date({publish_ms}+0800)/',
+        'usefulCount': position % 7,
+        'replyCount': position % 2,
+        'touristTypeDisplay': '家庭亲子',
+        'ipLocatedName': '辽宁',
+        'timeDuration': '2小时',
+        'images': [{'imageSrcUrl': f'https://dimg.ctrip.com/{poi_id}/{comment_id}_{i}.jpg'} for i in range(position % 3)],
+        'scores': [
+            {'name': '景色', 'score': 5},
+            {'name': '趣味', 'score': 4},
+            {'name': '性价比', 'score': 4},
+        ],
+        'recommendItems': ['海景'] if position % 4 == 0 else [],
+        'poiName': '星海广场',
+    }
+
+
+def build_attraction_item(position: int, district_id: int = 9) -> dict:
+    """生成景点列表接口中的一个景点"""
+    return {
+        'id': district_id * 100000 + position,
+        'poiId': district_id * 1000000 + position,
+        'name': f'景点{position}',
+        'eName': f'Sight {position}',
+        'coordInfo': {'gDLat': 38.87 + position / 1000, 'gDLon': 121.68 + position / 1000},
+        'resourceTags': ['海景'] if position % 2 == 0 else [],
+        'tagNameList': ['5A景区'] if position % 5 == 0 else [],
+        'themeTags': [],
+        'shortFeatures': [f'特色{position}'],
+        'price': position % 5 * 20,
+        'displayMinPrice': position % 5 * 18,
+        'commentScore': 4.0 + position % 10 / 10,
+        'commentCount': 1000 - position,
+        'coverImageUrl': f'https://dimg.ctrip.com/sight/{position}.jpg',
+        'districtName': '大连',
+    }
+
+
+def build_detail_response(poi_id: int) -> dict:
+    """生成景点详情接口的响应"""
+    return {
+        'templateList': [
+            {'templateName': '头部信息', 'moduleList': [{'moduleName': '基础信息', 'poiBasicModule': {
+                'poiId': poi_id, 'poiName': f'景点{poi_id}', 'poiEName': f'Sight {poi_id}', 'districtName': '大连',
+                'coordinate': {'latitude': 38.87, 'longitude': 121.68}, 'telephoneList': ['0411-12345678'],
+            }}]},
+            {'templateName': '温馨提示', 'moduleList': [{'moduleName': '门票&预约信息', 'ticketAndAppointmentModule': {
+                'ticketDesc': f'成人票{poi_id % 100}.5元'}}]},
+            {'templateName': '信息介绍', 'moduleList': [{'moduleName': '图文详情', 'introductionModule': {
+                'introduction': f'<p>景点<b>{poi_id}</b>&nbsp;介绍</p>\n<div>亚洲最大的城市广场</div>'}}]},
+            {'templateName': '实用攻略', 'moduleList': [{'moduleName': '交通攻略', 'trafficModule': {
+                'trafficDetail': [{'publicTransit': '地铁2号线星海广场站'}],
+                'bigTrafficDetail': [{'poiName': '大连站'}]}}]},
+        ]
+    }
+
+
+def build_search_response(keyword: str) -> dict:
+    """生成景点ID搜索接口的响应，关键词包含“不存在”时没有结果"""
+    if not keyword or '不存在' in keyword:
+        return {'data': []}
+    sight_id = int(hashlib.md5(keyword.encode('utf-8')).hexdigest()[:6], 16)
+    return {'data': [{'id': sight_id, 'word': keyword, 'type': 'sight'}]}
+
+
+class _MockCtripHandler(BaseHTTPRequestHandler):
+    """模拟携程移动端接口的请求处理器（支持HTTP/1.1 keep-alive）"""
+
+    protocol_version = 'HTTP/1.1'
+    # 响应头和响应体分两次写出，关闭Nagle算法避免与客户端延迟ACK叠加产生40ms停顿
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        # 每个新TCP连接进入一次setup，用于统计连接数并模拟握手耗时
+        server = self.server.mock
+        with server.lock:
+            server.connection_count += 1
+        if server.handshake_delay:
+            time.sleep(server.handshake_delay)
+        super().setup()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        # 作为HTTP代理时，请求行中是完整URL；直接应答而不转发，用于代理健康检查
+        server = self.server.mock
+        with server.lock:
+            server.request_count += 1
+            server.paths.append(self.path)
+        if not self.path.startswith('http://'):
+            self._send_json(404, {'error': 'not found'})
+        elif server.proxy_healthy:
+            self._send_json(200, {'proxied': self.path})
+        else:
+            self._send_json(502, {'error': 'bad gateway'})
+
+    def do_POST(self):
+        server = self.server.mock
+        length = int(self.headers.get('Content-Length', 0))
+        raw = self.rfile.read(length) if length else b''
+        try:
+            payload = json.loads(raw.decode('utf-8')) if raw else {}
+        except ValueError:
+            payload = {}
+
+        with server.lock:
+            server.request_count += 1
+            server.paths.append(self.path)
+            scripted_status = server.scripted_statuses.popleft() if server.scripted_statuses else None
+            server.in_flight += 1
+            server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+        try:
+            self._respond(server, payload, scripted_status)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def _respond(self, server, payload: dict, scripted_status: int):
+        if server.latency:
+            time.sleep(server.latency)
+
+        if scripted_status is not None and scripted_status != 200:
+            self._send_json(scripted_status, {'error': f'scripted {scripted_status}'})
+            return
+        if self.path.endswith('/getCommentCollapseList'):
+            self._send_json(200, server.comment_page(payload.get('arg', {})))
+        elif self.path.endswith('/getSightRecreationList'):
+            self._send_json(200, server.attraction_page(payload))
+        elif self.path.endswith('/getPoiMoreDetail'):
+            self._send_json(200, build_detail_response(int(payload.get('poiId', 0))))
+        elif self.path.endswith('/search'):
+            self._send_json(200, build_search_response(payload.get('keyword', '')))
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+
+class MockCtripServer:
+    """本地替身服务器，可作为上下文管理器使用
+
+    Args:
+        total_count: 评论总数
+        attraction_count: 每个地区的景点总数
+        handshake_delay: 每个新连接的模拟握手耗时（秒）
+        latency: 每个请求的模拟服务端耗时（秒）
+    """
+
+    def __init__(self, total_count: int = 10000, handshake_delay: float = 0.0, latency: float = 0.0,
+                 attraction_count: int = 100):
+        self.total_count = total_count
+        self.attraction_count = attraction_count
+        self.handshake_delay = handshake_delay
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.connection_count = 0
+        self.request_count = 0
+        # 正在处理的POST请求数及其峰值，用于验证客户端的并发度
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.paths = []
+        # 预设的状态码序列，按请求顺序依次返回（200表示正常处理），用于模拟限流和故障
+        self.scripted_statuses = deque()
+        # 作为替身代理时是否健康（False时对代理请求返回502）
+        self.proxy_healthy = True
+        # 之后新增的评论数，新增评论排在最前面，原有评论整体后移
+        self.new_count = 0
+        # 发布时间为空的评论位置（同build_comment_item的position），模拟缺失时间的评论
+        self.blank_time_positions = set()
+        self._httpd = None
+        self._thread = None
+
+    def comment_page(self, arg: dict) -> dict:
+        """生成评论分页响应"""
+        page_index = int(arg.get('pageIndex', 1))
+        page_size = int(arg.get('pageSize', 10))
+        poi_id = str(arg.get('poiId', '76865'))
+        total_count = self.total_count + self.new_count
+        start = (page_index - 1) * page_size
+        end = min(start + page_size, total_count)
+        items = [build_comment_item(i - self.new_count, poi_id) for i in range(start, end)]
+        for item, i in zip(items, range(start, end)):
+            if i - self.new_count in self.blank_time_positions:
+                item['publishTime'] = ''
+        return {'result': {'totalCount': total_count, 'items': items}}
+
+    def attraction_page(self, payload: dict) -> dict:
+        """生成景点列表分页响应"""
+        page_index = int(payload.get('index', 1))
+        count = int(payload.get('count', 20))
+        district_id = int(payload.get('districtId', 9))
+        start = (page_index - 1) * count
+        end = min(start + count, self.attraction_count)
+        items = [build_attraction_item(i, district_id) for i in range(start, end)]
+        return {'result': {'sightRecreationList': items, 'totalCount': self.attraction_count}}
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def url(self, path: str) -> str:
+        """返回替身服务器上的完整URL"""
+        return self.base_url + path
+
+    def start(self):
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), _MockCtripHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.mock = self
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
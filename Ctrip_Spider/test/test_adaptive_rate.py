@@ -0,0 +1,125 @@
+import sys
+import os
+import time
+import statistics
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from Ctrip_Spider.log import CtripSpiderLogger
+from Ctrip_Spider.anti_spider import AdaptiveRateController, RateLimiter, EnhancedRequestOptimizer
+from Ctrip_Spider.test.mock_server import MockCtripServer
+
+
+def _controller(**kwargs):
+    logger = CtripSpiderLogger("TestAdaptiveRate", "logs")
+    limiter = RateLimiter(qps=0)
+    params = dict(initial_qps=1.0, min_qps=0.1, max_qps=2.0, increase_step=0.1, decrease_factor=0.5, cooldown=0)
+    params.update(kwargs)
+    return AdaptiveRateController(limiter, logger=logger, **params), limiter
+
+
+def test_additive_increase_multiplicative_decrease():
+    """
+    测试正常响应加性增速、429乘性降速，且速率写回接口令牌桶
+    """
+    controller, limiter = _controller()
+    for _ in range(5):
+        controller.record('comments', status_code=200, response_time=0.1)
+    assert abs(controller.get_rate('comments') - 1.5) < 1e-9
+
+    controller.record('comments', status_code=429, response_time=0.1)
+    assert abs(controller.get_rate('comments') - 0.75) < 1e-9
+    assert abs(limiter.endpoint_buckets['comments'].rate - 0.75) < 1e-9
+
+    # 上下限
+    for _ in range(50):
+        controller.record('comments', status_code=200)
+    assert controller.get_rate('comments') == 2.0
+    for _ in range(50):
+        controller.record('comments', status_code=503)
+    assert controller.get_rate('comments') == 0.1
+
+
+def test_timeouts_latency_spikes_and_cooldown():
+    """
+    测试超时和延迟突增触发降速，冷却期内只降速一次
+    """
+    controller, _ = _controller()
+    controller.record('detail', status_code=200, response_time=0.1)
+    controller.record('detail', status_code=200, response_time=1.0)  # 超过平滑延迟3倍
+    assert abs(controller.get_rate('detail') - 0.55) < 1e-9
+
+    controller, _ = _controller(cooldown=60)
+    controller.record('detail', error=TimeoutError("timeout"))
+    controller.record('detail', error=TimeoutError("timeout"))
+    assert controller.get_rate('detail') == 0.5
+
+
+def test_tracked_per_proxy():
+    """
+    测试按代理分别维护速率
+    """
+    controller, limiter = _controller()
+    controller.record('comments', proxy='http://p1:8080', status_code=403)
+    controller.record('comments', proxy='http://p2:8080', status_code=200)
+    assert controller.get_rate(proxy='http://p1:8080') == 0.5
+    assert abs(controller.get_rate(proxy='http://p2:8080') - 1.1) < 1e-9
+    assert set(limiter.proxy_buckets) == {'http://p1:8080', 'http://p2:8080'}
+
+
+def test_optimizer_exposes_adaptive_rate():
+    """
+    测试优化器根据真实响应调整速率，并通过get_stats暴露当前速率
+    """
+    logger = CtripSpiderLogger("TestAdaptiveRate", "logs")
+    optimizer = EnhancedRequestOptimizer(qps=20, adaptive=True, max_qps=50, max_retries=0, logger=logger)
+    optimizer.rate_controller.cooldown = 0
+
+    with MockCtripServer(total_count=50) as server:
+        url = server.url('/restapi/soa2/13444/json/getCommentCollapseList')
+        for _ in range(3):
+            assert optimizer.make_request('POST', url, endpoint='comments', json={'arg': {}}).status_code == 200
+        server.scripted_statuses.append(429)
+        assert optimizer.make_request('POST', url, endpoint='comments', json={'arg': {}}).status_code == 429
+
+    stats = optimizer.get_stats()['adaptive_rate_stats']['endpoints']['comments']
+    assert stats['increases'] == 3 and stats['decreases'] == 1
+    assert abs(stats['rate'] - (20 + 3 * 0.05) * 0.5) < 1e-3
+    optimizer.close()
+
+
+def test_adaptive_buckets_keep_jitter():
+    """
+    测试自适应模式下接口桶和代理桶保留配置的抖动比例，调整速率后请求间隔仍然随机
+    """
+    logger = CtripSpiderLogger("TestAdaptiveRate", "logs")
+    optimizer = EnhancedRequestOptimizer(qps=40, adaptive=True, max_qps=40, jitter=0.5, max_retries=0, logger=logger)
+    controller = optimizer.rate_controller
+    controller.cooldown = 0
+    limiter = optimizer.rate_limiter
+
+    optimizer.set_delay('comments')
+    controller.record('comments', proxy='http://p1:8080', status_code=429)
+    bucket = limiter.endpoint_buckets['comments']
+    assert abs(bucket.rate - 20) < 1e-9
+    assert bucket.jitter == 0.5 and limiter.proxy_buckets['http://p1:8080'].jitter == 0.5
+
+    # 20 QPS下平均间隔50ms，抖动最多额外25ms；没有抖动时各间隔相差不到1ms
+    times = []
+    for _ in range(16):
+        optimizer.set_delay('comments')
+        times.append(time.monotonic())
+    intervals = [b - a for a, b in zip(times, times[1:])]
+    assert max(intervals) - min(intervals) > 0.005
+    assert statistics.pstdev(intervals) > 0.002
+    optimizer.close()
+
+
+if __name__ == "__main__":
+    test_additive_increase_multiplicative_decrease()
+    test_timeouts_latency_spikes_and_cooldown()
+    test_tracked_per_proxy()
+    test_optimizer_exposes_adaptive_rate()
+    test_adaptive_buckets_keep_jitter()
+    print("自适应限速测试完成")
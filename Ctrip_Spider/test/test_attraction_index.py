@@ -0,0 +1,87 @@
+import os
+import sys
+import logging
+import tempfile
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from Ctrip_Spider.log import CtripSpiderLogger
+from Ctrip_Spider.attraction_index import AttractionIndex
+from Ctrip_Spider.sight_list import CtripAttractionScraper
+from Ctrip_Spider.test.mock_server import MockCtripServer
+
+LOGGER = CtripSpiderLogger("TestAttractionIndex", "logs", level=logging.ERROR)
+LIST_PATH = '/restapi/soa2/13342/json/getSightRecreationList'
+
+
+def make_scraper(server, index_dir, ttl=3600):
+    scraper = CtripAttractionScraper(delay_range=(0, 0), logger=LOGGER,
+                                     attraction_index=AttractionIndex(index_dir, ttl=ttl))
+    scraper.url = server.url(LIST_PATH)
+    return scraper
+
+
+def test_lookup_uses_persisted_index():
+    """首次查询翻页构建索引，之后按景点ID和POI ID查询都不再发出请求，新实例从磁盘加载"""
+    with MockCtripServer(attraction_count=75) as server, tempfile.TemporaryDirectory() as tmp:
+        scraper = make_scraper(server, tmp)
+        # 第4页的景点，只查第1页时找不到
+        attraction = scraper.get_attraction_by_id(9, 900060)
+        assert attraction['name'] == '景点60'
+        assert server.request_count == 4
+
+        assert scraper.get_attraction_by_id(9, '9000061')['name'] == '景点61'
+        assert scraper.get_attraction_by_id(9, 'missing') is None
+        assert server.request_count == 4
+
+        reloaded = make_scraper(server, tmp)
+        assert reloaded.get_attraction_by_id(9, '900074')['poi_id'] == 9000074
+        assert server.request_count == 4
+
+
+def test_index_refreshes_after_ttl():
+    """过期或refresh=True时重建索引；翻页失败时保留原索引"""
+    with MockCtripServer(attraction_count=30) as server, tempfile.TemporaryDirectory() as tmp:
+        scraper = make_scraper(server, tmp, ttl=0)
+        assert scraper.get_attraction_by_id(9, 900029) is not None
+        assert server.request_count == 2
+
+        server.attraction_count = 45
+        assert scraper.get_attraction_by_id(9, 900044)['name'] == '景点44'
+        assert server.request_count == 5
+
+        fresh = make_scraper(server, tmp)
+        server.scripted_statuses.append(404)
+        assert fresh.get_attraction_by_id(9, 900044, refresh=True)['name'] == '景点44'
+        assert len(fresh.attraction_index.attractions(9)) == 45
+
+
+def test_incomplete_sweep_is_not_fresh():
+    """翻页不完整时不覆盖已有索引，没有索引时保存的索引可以查询但不视为最新"""
+    with MockCtripServer(attraction_count=60) as server, tempfile.TemporaryDirectory() as tmp:
+        scraper = make_scraper(server, tmp)
+        # 第1页成功，第2页返回不重试的404，逐页获取在第2页停止
+        server.scripted_statuses.extend([200, 404])
+        assert scraper.build_attraction_index(9, count_per_page=10, concurrency=1) == 10
+        assert not scraper.attraction_index.is_fresh(9)
+        assert scraper.attraction_index.lookup(9, 900005)['name'] == '景点5'
+        assert not make_scraper(server, tmp).attraction_index.is_fresh(9)
+
+        # 下次查询重新翻页，得到完整索引
+        assert scraper.get_attraction_by_id(9, 900015, count_per_page=10)['name'] == '景点15'
+        assert scraper.attraction_index.is_fresh(9)
+
+        # 已有完整索引时，不完整的翻页不替换它
+        server.attraction_count = 70
+        server.scripted_statuses.extend([200, 404])
+        assert scraper.build_attraction_index(9, count_per_page=10, concurrency=1) == 0
+        assert len(scraper.attraction_index.attractions(9)) == 60
+        assert scraper.attraction_index.lookup(9, 900025)['name'] == '景点25'
+
+
+if __name__ == "__main__":
+    test_lookup_uses_persisted_index()
+    test_index_refreshes_after_ttl()
+    test_incomplete_sweep_is_not_fresh()
+    print("景点索引测试通过")
@@ -0,0 +1,68 @@
+import os
+import sys
+import time
+import logging
+import tempfile
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from Ctrip_Spider.log import CtripSpiderLogger
+from Ctrip_Spider.response_cache import ResponseCache
+from Ctrip_Spider.sight_detail import AttractionDetailFetcher
+from Ctrip_Spider.test.mock_server import MockCtripServer
+
+LOGGER = CtripSpiderLogger("TestBatchDetails", "logs", level=logging.ERROR)
+DETAIL_PATH = '/restapi/soa2/18254/json/getPoiMoreDetail'
+
+
+def make_fetcher(server, tmp):
+    fetcher = AttractionDetailFetcher(delay_range=(0, 0), logger=LOGGER, response_cache=ResponseCache(tmp))
+    fetcher.detail_url = server.url(DETAIL_PATH)
+    return fetcher
+
+
+def test_details_fetched_concurrently_keyed_by_poi_id():
+    """并发获取，结果按景点ID索引，回调随完成逐个收到结果；再次获取命中缓存"""
+    with MockCtripServer(latency=0.05) as server, tempfile.TemporaryDirectory() as tmp:
+        fetcher = make_fetcher(server, tmp)
+        poi_ids = list(range(1000, 1020)) + [1000, 1001]
+        streamed = []
+        results = fetcher.get_details(poi_ids, concurrency=5, callback=lambda poi_id, r: streamed.append(poi_id))
+
+        assert set(results) == set(range(1000, 1020)) and sorted(streamed) == list(range(1000, 1020))
+        assert all(results[poi_id]['poi_name'] == f'景点{poi_id}' for poi_id in results)
+        assert server.request_count == 20
+        # 同时在途的请求数不超过并发数（耗时对比见benchmarks）
+        assert 1 < server.peak_in_flight <= 5
+
+        assert fetcher.get_details(range(1000, 1020)) == results
+        assert server.request_count == 20
+
+
+def test_failures_are_isolated():
+    """单个景点抛出异常或响应很慢时，其他景点照常完成"""
+    with MockCtripServer() as server, tempfile.TemporaryDirectory() as tmp:
+        fetcher = make_fetcher(server, tmp)
+        original = fetcher.get_detail
+
+        def get_detail(poi_id, use_cache=True):
+            if poi_id == 3:
+                raise RuntimeError("解析器崩溃")
+            if poi_id == 7:
+                time.sleep(0.5)
+            return original(poi_id, use_cache=use_cache)
+
+        fetcher.get_detail = get_detail
+        order = [poi_id for poi_id, _ in fetcher.iter_details(range(1, 11), concurrency=3)]
+        assert order[-1] == 7 and len(order) == 10
+
+        results = fetcher.get_details(range(1, 11), concurrency=3)
+        assert not results[3]['success'] and '解析器崩溃' in results[3]['error_message']
+        assert all(results[poi_id]['success'] for poi_id in results if poi_id != 3)
+
+
+if __name__ == "__main__":
+    test_details_fetched_concurrently_keyed_by_poi_id()
+    test_failures_are_isolated()
+    print("批量获取详情测试通过")
@@ -0,0 +1,96 @@
+import os
+import sys
+import logging
+import tempfile
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from Ctrip_Spider.log import CtripSpiderLogger
+from Ctrip_Spider.response_cache import ResponseCache
+from Ctrip_Spider.sight_id import SightId
+from Ctrip_Spider.sight_id_map import SightIdMap
+from Ctrip_Spider.test.mock_server import MockCtripServer, build_search_response
+
+LOGGER = CtripSpiderLogger("TestBatchSightSearch", "logs", level=logging.ERROR)
+SEARCH_PATH = '/restapi/soa2/26872/search'
+
+
+def make_searcher(server, tmp):
+    # 关闭响应缓存，只验证LRU和关键词映射
+    searcher = SightId(delay_range=(0, 0), logger=LOGGER, response_cache=ResponseCache(tmp, ttls={}),
+                       id_map=SightIdMap(os.path.join(tmp, 'sight_ids.db')))
+    searcher.search_url = server.url(SEARCH_PATH)
+    return searcher
+
+
+def expected_id(keyword):
+    return str(build_search_response(keyword)['data'][0]['id'])
+
+
+def test_batch_dedupes_and_keeps_input_order():
+    """重复关键词只请求一次，结果与输入顺序对应，未找到的为None"""
+    with MockCtripServer(latency=0.05) as server, tempfile.TemporaryDirectory() as tmp:
+        searcher = make_searcher(server, tmp)
+        keywords = [f'景点{i}' for i in range(20)]
+        batch = keywords + [' 景点3 ', '不存在的景点', '', '景点0']
+        results = searcher.search_sight_ids(batch, concurrency=5)
+
+        assert results == [expected_id(k) for k in keywords] + [expected_id('景点3'), None, None, expected_id('景点0')]
+        assert server.request_count == 21
+        # 同时在途的请求数不超过并发数（耗时对比见benchmarks）
+        assert 1 < server.peak_in_flight <= 5
+
+        # 第二次全部命中LRU，没有结果的关键词重新请求
+        assert searcher.search_sight_ids(batch) == results
+        assert server.request_count == 22
+        searcher.close()
+
+
+def test_persistent_map_survives_restart():
+    """新实例从持久化映射解析之前搜索过的关键词；use_cache=False时全部重新请求"""
+    with MockCtripServer() as server, tempfile.TemporaryDirectory() as tmp:
+        first = make_searcher(server, tmp)
+        first.search_sight_ids(['黄鹤楼', '故宫'])
+        first.close()
+        assert server.request_count == 2
+
+        second = make_searcher(server, tmp)
+        assert second.search_sight_ids(['故宫', '天安门', '黄鹤楼']) == [
+            expected_id('故宫'), expected_id('天安门'), expected_id('黄鹤楼')]
+        assert server.request_count == 3
+        assert second.id_map.count() == 3
+
+        second.search_sight_ids(['故宫', '黄鹤楼'], use_cache=False)
+        assert server.request_count == 5
+        second.close()
+
+
+def test_single_and_batch_search_agree():
+    """单个搜索与批量搜索按相同规则规范化关键词，返回相同类型的景点ID"""
+    with MockCtripServer() as server, tempfile.TemporaryDirectory() as tmp:
+        single = SightId(delay_range=(0, 0), logger=LOGGER, response_cache=ResponseCache(os.path.join(tmp, 'a')),
+                         id_map=SightIdMap(os.path.join(tmp, 'a.db')))
+        single.search_url = server.url(SEARCH_PATH)
+        batch = make_searcher(server, os.path.join(tmp, 'b'))
+
+        for keyword in ['黄鹤楼', ' 黄鹤楼 ', '不存在的景点', '', '  ', None]:
+            for use_cache in (False, True):
+                expected = single.search_sight_id(keyword, use_cache=use_cache)
+                assert batch.search_sight_ids([keyword], use_cache=use_cache) == [expected], keyword
+                assert expected is None or isinstance(expected, str)
+        assert single.search_sight_id(' 黄鹤楼 ') == expected_id('黄鹤楼')
+
+        # 带空白的关键词与去除空白后的关键词共用响应缓存和映射
+        requests_before = server.request_count
+        assert single.search_sight_id('黄鹤楼\n') == batch.search_sight_ids(['黄鹤楼\t'])[0] == expected_id('黄鹤楼')
+        assert server.request_count == requests_before
+        single.close()
+        batch.close()
+
+
+if __name__ == "__main__":
+    test_batch_dedupes_and_keeps_input_order()
+    test_persistent_map_survives_restart()
+    test_single_and_batch_search_agree()
+    print("批量搜索景点ID测试通过")
@@ -0,0 +1,137 @@
+import os
+import sys
+import asyncio
+import logging
+import tempfile
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from Ctrip_Spider.log import CtripSpiderLogger
+from Ctrip_Spider.checkpoint import CheckpointStore
+from Ctrip_Spider.sight_comments import CtripCommentSpider
+from Ctrip_Spider.sight_comments_async import AsyncCtripCommentSpider
+from Ctrip_Spider.test.mock_server import MockCtripServer
+
+LOGGER = CtripSpiderLogger("TestCheckpoint", "logs", level=logging.ERROR)
+COMMENT_PATH = '/restapi/soa2/13444/json/getCommentCollapseList'
+POI_ID, POI_NAME = '76865', '星海广场'
+
+
+def make_spider(server, output_dir, spider_class=CtripCommentSpider, **kwargs):
+    spider = spider_class(output_dir, delay_range=(0, 0), logger=LOGGER, **kwargs)
+    spider.post_url = server.url(COMMENT_PATH)
+    return spider
+
+
+def interrupt_at(spider, stop_page):
+    """让爬虫在请求第stop_page页时被中断，返回记录已请求页码的列表"""
+    fetched = []
+    original = spider._get_page_comments
+
+    def get_page_comments(poi_id, page):
+        if page == stop_page:
+            raise KeyboardInterrupt
+        fetched.append(page)
+        return original(poi_id, page)
+
+    spider._get_page_comments = get_page_comments
+    return fetched
+
+
+def read_csv(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_store_is_atomic():
+    """检查点写入后可读取，不留下临时文件，清除后不存在"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CheckpointStore(tmp)
+        assert store.load('1') is None
+        store.save('1', last_page=3, row_index=30, byte_offset=1234)
+        store.save('1', last_page=4, row_index=40, byte_offset=2345)
+        assert store.load('1')['last_page'] == 4
+        assert os.listdir(tmp) == ['1.json']
+        store.clear('1')
+        assert store.load('1') is None
+
+
+def test_interrupted_crawl_resumes_without_refetching():
+    """中断后重新运行，从断点继续且不再请求已完成的页面，结果与一次爬完相同"""
+    with MockCtripServer(total_count=100) as server, \
+            tempfile.TemporaryDirectory() as reference_dir, tempfile.TemporaryDirectory() as output_dir:
+        reference = make_spider(server, reference_dir)
+        assert reference.crawl_comments(POI_ID, POI_NAME, max_pages=8)
+        expected = read_csv(reference._csv_path(POI_ID, POI_NAME))
+
+        spider = make_spider(server, output_dir)
+        interrupt_at(spider, 5)
+        try:
+            spider.crawl_comments(POI_ID, POI_NAME, max_pages=8)
+            assert False, "应当被中断"
+        except KeyboardInterrupt:
+            pass
+        checkpoint = spider.checkpoints.load(POI_ID)
+        assert checkpoint['last_page'] == 4 and checkpoint['row_index'] == 40
+
+        # 模拟中断时写了一半的数据
+        file_path = spider._csv_path(POI_ID, POI_NAME)
+        with open(file_path, 'a', encoding='utf-8') as f:
+            f.write('40,76865,星海广场,半行')
+
+        spider = make_spider(server, output_dir)
+        fetched = interrupt_at(spider, None)
+        requests_before = server.request_count
+        assert spider.crawl_comments(POI_ID, POI_NAME, max_pages=8)
+        assert fetched == [5, 6, 7, 8]
+        assert server.request_count - requests_before == 4
+        assert read_csv(file_path) == expected
+        assert spider.checkpoints.load(POI_ID) is None
+        assert spider._get_current_index(file_path) == 80
+
+
+def test_resume_disabled_starts_over():
+    """resume=False时忽略检查点并重新爬取"""
+    with MockCtripServer(total_count=100) as server, tempfile.TemporaryDirectory() as output_dir:
+        spider = make_spider(server, output_dir)
+        interrupt_at(spider, 2)
+        try:
+            spider.crawl_comments(POI_ID, POI_NAME, max_pages=3)
+        except KeyboardInterrupt:
+            pass
+        spider = make_spider(server, output_dir)
+        fetched = interrupt_at(spider, None)
+        assert spider.crawl_comments(POI_ID, POI_NAME, max_pages=3, resume=False)
+        assert fetched == [1, 2, 3]
+
+
+def test_async_crawl_resumes_from_sync_checkpoint():
+    """异步爬虫同样从检查点继续"""
+    with MockCtripServer(total_count=100) as server, \
+            tempfile.TemporaryDirectory() as reference_dir, tempfile.TemporaryDirectory() as output_dir:
+        reference = make_spider(server, reference_dir)
+        assert reference.crawl_comments(POI_ID, POI_NAME, max_pages=6)
+        expected = read_csv(reference._csv_path(POI_ID, POI_NAME))
+
+        spider = make_spider(server, output_dir)
+        interrupt_at(spider, 3)
+        try:
+            spider.crawl_comments(POI_ID, POI_NAME, max_pages=6)
+        except KeyboardInterrupt:
+            pass
+
+        async_spider = make_spider(server, output_dir, AsyncCtripCommentSpider, concurrency=4)
+        fetched = interrupt_at(async_spider, None)
+        assert asyncio.run(async_spider.crawl_comments_async(POI_ID, POI_NAME, max_pages=6))
+        async_spider.close()
+        assert sorted(fetched) == [3, 4, 5, 6]
+        assert read_csv(async_spider._csv_path(POI_ID, POI_NAME)) == expected
+
+
+if __name__ == "__main__":
+    test_store_is_atomic()
+    test_interrupted_crawl_resumes_without_refetching()
+    test_resume_disabled_starts_over()
+    test_async_crawl_resumes_from_sync_checkpoint()
+    print("检查点测试通过")
@@ -0,0 +1,130 @@
+import os
+import sys
+import time
+import logging
+import tempfile
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from Ctrip_Spider.log import CtripSpiderLogger
+from Ctrip_Spider.anti_spider import CircuitBreaker, CircuitOpenError, EnhancedRequestOptimizer
+from Ctrip_Spider.sight_comments import CtripCommentSpider
+from Ctrip_Spider.test.mock_server import MockCtripServer
+
+LOGGER = CtripSpiderLogger("TestCircuitBreaker", "logs", level=logging.ERROR)
+COMMENT_PATH = '/restapi/soa2/13444/json/getCommentCollapseList'
+
+
+def test_state_transitions():
+    """closed -> open -> half_open -> closed / open"""
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=0.05, logger=LOGGER)
+    key = 'https://m.ctrip.com/api'
+    for _ in range(2):
+        breaker.record_failure(key)
+    assert breaker.allow(key)
+    breaker.record_success(key)
+    for _ in range(3):
+        breaker.record_failure(key)
+    assert breaker.get_state(key) == CircuitBreaker.OPEN
+    assert not breaker.allow(key)
+
+    time.sleep(0.06)
+    assert breaker.get_state(key) == CircuitBreaker.HALF_OPEN
+    assert breaker.allow(key)
+    # 半开状态只放行一个探测请求
+    assert not breaker.allow(key)
+    breaker.record_failure(key)
+    assert breaker.get_state(key) == CircuitBreaker.OPEN
+
+    time.sleep(0.06)
+    assert breaker.allow(key)
+    breaker.record_success(key)
+    assert breaker.get_state(key) == CircuitBreaker.CLOSED
+    assert breaker.get_stats()[key]['opens'] == 2
+
+
+def test_failure_classification():
+    """异常、403/429和5xx计为失败，其余状态码计为成功"""
+    assert CircuitBreaker.is_failure(error=ValueError())
+    assert CircuitBreaker.is_failure(429)
+    assert CircuitBreaker.is_failure(503)
+    assert not CircuitBreaker.is_failure(200)
+    assert not CircuitBreaker.is_failure(404)
+
+
+def test_open_endpoint_is_skipped_without_request():
+    """接口熔断后请求不再发出，冷却后探测成功即恢复"""
+    with MockCtripServer(total_count=100) as server:
+        optimizer = EnhancedRequestOptimizer(
+            delay_range=(0, 0), failure_threshold=2, circuit_cooldown=0.2, max_retries=0, logger=LOGGER
+        )
+        url = server.url(COMMENT_PATH)
+        server.scripted_statuses.extend([503, 503])
+        for _ in range(2):
+            assert optimizer.make_request('POST', url, json={}).status_code == 503
+
+        sent = server.request_count
+        assert optimizer.make_request('POST', url, json={}) is None
+        try:
+            optimizer.send('POST', url, json={})
+            assert False, "熔断时应抛出CircuitOpenError"
+        except CircuitOpenError:
+            pass
+        assert server.request_count == sent
+
+        time.sleep(0.25)
+        assert optimizer.make_request('POST', url, json={}).status_code == 200
+        assert optimizer.get_stats()['circuit_stats']['endpoints'][url]['state'] == CircuitBreaker.CLOSED
+        optimizer.close()
+
+
+def test_open_proxy_is_skipped_in_selection():
+    """熔断中的代理在选取时被跳过"""
+    bad, good = 'http://10.0.0.1:8080', 'http://10.0.0.2:8080'
+    optimizer = EnhancedRequestOptimizer(
+        delay_range=(0, 0), proxies=[bad, good], use_proxy=True, failure_threshold=1, logger=LOGGER
+    )
+    optimizer.record_response(proxy_url=bad, error=ConnectionError())
+    assert all(optimizer.get_proxy_dict()['http'] == good for _ in range(20))
+    optimizer.close()
+
+
+def test_suspended_proxy_resumes_after_cooldown():
+    """熔断的代理在冷却期内移出轮换，冷却结束后重新参与选取"""
+    bad, good = 'http://10.0.0.1:8080', 'http://10.0.0.2:8080'
+    optimizer = EnhancedRequestOptimizer(
+        delay_range=(0, 0), proxies=[bad, good], use_proxy=True, rotation_mode='round_robin',
+        failure_threshold=1, circuit_cooldown=0.05, logger=LOGGER
+    )
+    optimizer.record_response(proxy_url=bad, error=ConnectionError())
+    assert optimizer.proxy_pool.get_stats()['suspended'] == 1
+    time.sleep(0.06)
+    # bad的使用次数最少，恢复后轮询优先选中它作为探测请求
+    assert optimizer.get_proxy_dict()['http'] == bad
+    assert optimizer.proxy_pool.get_stats()['suspended'] == 0
+    optimizer.close()
+
+
+def test_comment_spider_skips_pages_while_open():
+    """评论接口熔断期间，爬虫跳过剩余页面而不再发请求"""
+    with MockCtripServer(total_count=100) as server, tempfile.TemporaryDirectory() as output_dir:
+        spider = CtripCommentSpider(output_dir, delay_range=(0, 0), logger=LOGGER)
+        spider.optimizer.endpoint_breaker.failure_threshold = 2
+        spider.optimizer.retry_policy.base_delay = 0.01
+        spider.post_url = server.url(COMMENT_PATH)
+        # 总页数请求成功，第1页及其重试失败触发熔断，后续重试和页面都被跳过
+        server.scripted_statuses.extend([200, 500, 500])
+        assert not spider.crawl_comments('76865', '星海广场', max_pages=10)
+        assert server.request_count == 3
+        spider.optimizer.close()
+
+
+if __name__ == "__main__":
+    test_state_transitions()
+    test_failure_classification()
+    test_open_endpoint_is_skipped_without_request()
+    test_open_proxy_is_skipped_in_selection()
+    test_suspended_proxy_resumes_after_cooldown()
+    test_comment_spider_skips_pages_while_open()
+    print("熔断测试通过")
@@ -0,0 +1,130 @@
+import os
+import sys
+import logging
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from Ctrip_Spider.log import CtripSpiderLogger
+from Ctrip_Spider.anti_spider import EnhancedRequestOptimizer, RetryPolicy
+from Ctrip_Spider.sight_list import CtripAttractionScraper
+from Ctrip_Spider.test.mock_server import MockCtripServer, build_attraction_item
+
+LOGGER = CtripSpiderLogger("TestConcurrentPagination", "logs", level=logging.ERROR)
+LIST_PATH = '/restapi/soa2/13342/json/getSightRecreationList'
+
+
+def make_scraper(server):
+    scraper = CtripAttractionScraper(delay_range=(0, 0), logger=LOGGER)
+    scraper.url = server.url(LIST_PATH)
+    return scraper
+
+
+def test_concurrent_pages_merge_in_order():
+    """按第一页的总数并发获取其余页面，结果与逐页获取一致，同时在途的请求数不超过并发数"""
+    with MockCtripServer(attraction_count=95, latency=0.05) as server:
+        scraper = make_scraper(server)
+        sequential = scraper.get_attractions_with_pagination(9, pages=None, count_per_page=10)
+        # 逐页模式多请求一次空页才停止
+        assert server.request_count == 11
+        assert server.peak_in_flight == 1
+
+        server.peak_in_flight = 0
+        concurrent = scraper.get_attractions_with_pagination(9, pages=None, count_per_page=10, concurrency=5)
+        assert server.request_count == 11 + 10
+        assert 1 < server.peak_in_flight <= 5
+
+        assert concurrent == sequential
+        assert [a['name'] for a in concurrent] == [f'景点{i}' for i in range(95)]
+
+        scraper.get_attractions_with_pagination(9, pages=3, count_per_page=10, concurrency=5)
+        assert server.request_count == 21 + 3
+
+
+def test_duplicates_across_pages_are_dropped():
+    """翻页期间列表前移导致的跨页重复景点只保留一次"""
+    with MockCtripServer(attraction_count=50) as server:
+        original = server.attraction_page
+
+        def shifted_page(payload):
+            # 从第3页开始列表整体前移2个位置，第2页末尾的景点在第3页开头重复出现
+            response = original(payload)
+            page = int(payload.get('index', 1))
+            if page >= 3:
+                count = int(payload.get('count', 20))
+                start = (page - 1) * count - 2
+                response['result']['sightRecreationList'] = [
+                    build_attraction_item(i) for i in range(start, min(start + count, 50))
+                ]
+            return response
+
+        server.attraction_page = shifted_page
+        scraper = make_scraper(server)
+        attractions = scraper.get_attractions_with_pagination(9, pages=None, count_per_page=10, concurrency=3)
+        poi_ids = [a['poi_id'] for a in attractions]
+        # 按总数只请求5页，前移后最后2个景点落在第6页之外
+        assert server.request_count == 5
+        assert len(poi_ids) == len(set(poi_ids)) == 48
+        assert [a['name'] for a in attractions] == [f'景点{i}' for i in range(48)]
+
+
+def fail_pages(scraper, failures):
+    """让指定页面的前若干次请求失败，failures: {页码: 失败次数}"""
+    original = scraper._fetch_attractions_page
+
+    def fetch_attractions_page(district_id, page, count):
+        if failures.get(page, 0) > 0:
+            failures[page] -= 1
+            return None, None
+        return original(district_id, page, count)
+
+    scraper._fetch_attractions_page = fetch_attractions_page
+
+
+def test_failed_pages_are_reported():
+    """获取失败的页面记录到failed_pages，两种翻页方式一致"""
+    with MockCtripServer(attraction_count=100) as server:
+        for concurrency in (1, 4):
+            scraper = make_scraper(server)
+            fail_pages(scraper, {4: 1})
+            failed_pages = []
+            attractions = scraper.get_attractions_with_pagination(9, pages=None, count_per_page=10,
+                                                                  concurrency=concurrency, failed_pages=failed_pages)
+            assert failed_pages == [4]
+            ids = {a['poi_id'] for a in attractions}
+            # 逐页获取时在失败的第4页停止，并发获取时跳过第4页
+            assert 9000020 in ids and 9000030 not in ids
+            assert len(attractions) == (30 if concurrency == 1 else 90)
+
+
+def test_pages_are_retried_only_by_optimizer():
+    """页面的临时故障只由优化器按重试策略重试，持续失败的页面最多请求max_retries+1次"""
+    with MockCtripServer(attraction_count=30) as server:
+        policy = RetryPolicy(max_retries=2, base_delay=0.01, max_delay=0.01)
+        optimizer = EnhancedRequestOptimizer(delay_range=(0, 0), retry_policy=policy, logger=LOGGER)
+        scraper = CtripAttractionScraper(logger=LOGGER, optimizer=optimizer)
+        scraper.url = server.url(LIST_PATH)
+
+        # 第2页第一次返回503，重试一次后成功
+        server.scripted_statuses.extend([200, 503])
+        assert len(scraper.get_attractions_with_pagination(9, pages=None, count_per_page=10)) == 30
+        assert server.request_count == 4 + 1
+        assert policy.budget.get_stats()['retries'] == 1
+
+        # 第2页持续返回503，重试用尽后记录为失败页
+        server.request_count = 0
+        server.scripted_statuses.extend([200] + [503] * 3)
+        failed_pages = []
+        attractions = scraper.get_attractions_with_pagination(9, pages=None, count_per_page=10,
+                                                              failed_pages=failed_pages)
+        assert len(attractions) == 10 and failed_pages == [2]
+        assert server.request_count == 1 + 3
+        assert policy.budget.get_stats()['requests'] == 4 + 2
+
+
+if __name__ == "__main__":
+    test_concurrent_pages_merge_in_order()
+    test_duplicates_across_pages_are_dropped()
+    test_failed_pages_are_reported()
+    test_pages_are_retried_only_by_optimizer()
+    print("并发分页测试通过")
@@ -0,0 +1,62 @@
+import sys
+import os
+import time
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from Ctrip_Spider.log import CtripSpiderLogger
+from Ctrip_Spider.sight_comments import CtripCommentSpider
+from Ctrip_Spider.test.mock_server import MockCtripServer
+
+
+POIS = [
+    ['76865', '星海广场'],
+    ['75628', '棒棰岛'],
+    ['75633', '大连森林动物园'],
+]
+
+
+def test_worker_pool_streams_results_and_shares_budget():
+    """
+    测试工作池模式：每个景点写入独立CSV，结果逐个产出，所有线程共用同一频率预算
+    """
+    logger = CtripSpiderLogger("TestMultiplePois", "logs")
+
+    with MockCtripServer(total_count=50) as server, tempfile.TemporaryDirectory() as tmp:
+        spider = CtripCommentSpider(tmp, delay_range=(0.05, 0.05), logger=logger)
+        spider.post_url = server.url('/restapi/soa2/13444/json/getCommentCollapseList')
+
+        start_time = time.monotonic()
+        finished = list(spider.iter_crawl_multiple_pois(POIS, max_pages=2, workers=3))
+        elapsed = time.monotonic() - start_time
+
+        assert sorted(poi_id for poi_id, _, _ in finished) == sorted(poi_id for poi_id, _ in POIS)
+        assert all(success for _, _, success in finished)
+        for poi_id, poi_name in POIS:
+            assert os.path.exists(os.path.join(tmp, f'{poi_id}_{poi_name}.csv'))
+
+        # 每个景点入队1次 + 页间1次，共6次延迟预约，共享预算下至少间隔5个延迟
+        assert spider.optimizer.request_count == 6
+        assert elapsed >= 5 * 0.05
+
+
+def test_crawl_multiple_pois_with_workers_returns_dict():
+    """
+    测试crawl_multiple_pois在并行模式下仍返回汇总字典
+    """
+    logger = CtripSpiderLogger("TestMultiplePois", "logs")
+
+    with MockCtripServer(total_count=50) as server, tempfile.TemporaryDirectory() as tmp:
+        spider = CtripCommentSpider(tmp, delay_range=(0, 0), logger=logger)
+        spider.post_url = server.url('/restapi/soa2/13444/json/getCommentCollapseList')
+
+        results = spider.crawl_multiple_pois(POIS, max_pages=2, workers=2)
+        assert results == {f"{poi_name}({poi_id})": True for poi_id, poi_name in POIS}
+
+
+if __name__ == "__main__":
+    test_worker_pool_streams_results_and_shares_budget()
+    test_crawl_multiple_pois_with_workers_returns_dict()
+    print("并行批量爬取测试完成")
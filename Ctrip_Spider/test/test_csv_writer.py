@@ -0,0 +1,149 @@
+import os
+import sys
+import time
+import logging
+import tempfile
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from Ctrip_Spider.log import CtripSpiderLogger
+from Ctrip_Spider.csv_writer import BufferedCsvWriter
+from Ctrip_Spider.sight_comments import CtripCommentSpider
+from Ctrip_Spider.test.mock_server import MockCtripServer
+
+LOGGER = CtripSpiderLogger("TestCsvWriter", "logs", level=logging.ERROR)
+COMMENT_PATH = '/restapi/soa2/13444/json/getCommentCollapseList'
+POI_ID, POI_NAME = '76865', '星海广场'
+BOM = '\ufeff'.encode('utf-8')
+
+
+def make_spider(server, output_dir, **kwargs):
+    spider = CtripCommentSpider(output_dir, delay_range=(0, 0), logger=LOGGER, **kwargs)
+    spider.post_url = server.url(COMMENT_PATH)
+    return spider
+
+
+def read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_bom_written_once_and_header_only_for_empty_file():
+    """BOM和表头只在空文件开头写入一次，多次追加打开不会重复"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'a.csv')
+        for i in range(3):
+            with BufferedCsvWriter(path, header=['序号', '内容']) as writer:
+                writer.writerows([[i, f'第{i}行']])
+        data = read_bytes(path)
+        assert data.startswith(BOM) and data.count(BOM) == 1
+        assert data.decode('utf-8-sig').splitlines() == ['序号,内容', '0,第0行', '1,第1行', '2,第2行']
+
+        with BufferedCsvWriter(path, header=['序号'], truncate=True):
+            pass
+        assert read_bytes(path) == BOM + '序号\r\n'.encode('utf-8')
+
+
+def test_flush_by_rows_and_interval():
+    """缓冲按行数或时间阈值写出，写出前不落盘"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'a.csv')
+        writer = BufferedCsvWriter(path, flush_rows=20, flush_interval=3600)
+        size = os.path.getsize(path)
+        writer.writerows([[i] for i in range(10)])
+        assert not writer.flush_due() and os.path.getsize(path) == size
+        writer.writerows([[i] for i in range(10, 20)])
+        assert writer.flush_due()
+        writer.flush()
+        assert writer.pending_rows == 0 and os.path.getsize(path) == writer.tell() > size
+
+        writer.flush_interval = 0.05
+        writer.writerows([[20]])
+        assert not writer.flush_due()
+        time.sleep(0.06)
+        assert writer.flush_due()
+        writer.close()
+        assert writer.closed and read_bytes(path).decode('utf-8-sig').splitlines()[-1] == '20'
+
+
+def test_failed_batch_is_rolled_back():
+    """一批行写入途中出错时整批回退，不留下半批数据"""
+    def rows():
+        yield [1]
+        raise KeyboardInterrupt
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'a.csv')
+        writer = BufferedCsvWriter(path)
+        writer.writerows([[0]])
+        try:
+            writer.writerows(rows())
+            assert False, "应当被中断"
+        except KeyboardInterrupt:
+            pass
+        assert writer.rows == writer.pending_rows == 1
+        writer.close()
+        assert read_bytes(path) == BOM + b'0\r\n'
+
+
+def test_checkpoints_follow_flushes():
+    """检查点只随写缓冲写出保存，输出与逐页写出相同"""
+    with MockCtripServer(total_count=100) as server, \
+            tempfile.TemporaryDirectory() as reference_dir, tempfile.TemporaryDirectory() as output_dir:
+        reference = make_spider(server, reference_dir, csv_flush_rows=1)
+        assert reference.crawl_comments(POI_ID, POI_NAME, max_pages=10)
+
+        spider = make_spider(server, output_dir, csv_flush_rows=30, csv_flush_interval=3600)
+        saved_pages = []
+        original_save = spider.checkpoints.save
+
+        def save(poi_id, **state):
+            saved_pages.append(state['last_page'])
+            return original_save(poi_id, **state)
+
+        spider.checkpoints.save = save
+        assert spider.crawl_comments(POI_ID, POI_NAME, max_pages=10)
+        assert saved_pages == [3, 6, 9]
+        assert read_bytes(spider._csv_path(POI_ID, POI_NAME)) == read_bytes(reference._csv_path(POI_ID, POI_NAME))
+
+
+def test_interrupted_page_write_is_discarded():
+    """中断发生在某页写入途中时丢弃缓冲，从上一个检查点继续，结果与一次爬完相同"""
+    with MockCtripServer(total_count=100) as server, \
+            tempfile.TemporaryDirectory() as reference_dir, tempfile.TemporaryDirectory() as output_dir:
+        reference = make_spider(server, reference_dir)
+        assert reference.crawl_comments(POI_ID, POI_NAME, max_pages=8)
+
+        spider = make_spider(server, output_dir, csv_flush_rows=20, csv_flush_interval=3600)
+        original_add_many = spider.dedup.add_many
+        calls = []
+
+        def add_many(poi_id, comment_ids):
+            calls.append(poi_id)
+            if len(calls) == 5:
+                raise KeyboardInterrupt  # 第5页已进入写缓冲，尚未记录
+            return original_add_many(poi_id, comment_ids)
+
+        spider.dedup.add_many = add_many
+        try:
+            spider.crawl_comments(POI_ID, POI_NAME, max_pages=8)
+            assert False, "应当被中断"
+        except KeyboardInterrupt:
+            pass
+        file_path = spider._csv_path(POI_ID, POI_NAME)
+        checkpoint = spider.checkpoints.load(POI_ID)
+        assert checkpoint['last_page'] == 4 and spider._get_current_index(file_path) == 40
+
+        spider = make_spider(server, output_dir)
+        assert spider.crawl_comments(POI_ID, POI_NAME, max_pages=8)
+        assert read_bytes(file_path) == read_bytes(reference._csv_path(POI_ID, POI_NAME))
+
+
+if __name__ == "__main__":
+    test_bom_written_once_and_header_only_for_empty_file()
+    test_flush_by_rows_and_interval()
+    test_failed_batch_is_rolled_back()
+    test_checkpoints_follow_flushes()
+    test_interrupted_page_write_is_discarded()
+    print("CSV写入器测试通过")
@@ -0,0 +1,95 @@
+import os
+import sys
+import csv
+import logging
+import tempfile
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from Ctrip_Spider.log import CtripSpiderLogger
+from Ctrip_Spider.dedup import BloomFilter, CommentDedupIndex
+from Ctrip_Spider.sight_comments import CtripCommentSpider
+from Ctrip_Spider.test.mock_server import MockCtripServer
+
+LOGGER = CtripSpiderLogger("TestDedupIndex", "logs", level=logging.ERROR)
+COMMENT_PATH = '/restapi/soa2/13444/json/getCommentCollapseList'
+POI_ID, POI_NAME = '76865', '星海广场'
+
+
+def test_bloom_filter_has_no_false_negatives():
+    """布隆过滤器没有漏判，误判率接近设定值"""
+    bloom = BloomFilter(10000, error_rate=0.01)
+    for value in range(0, 20000, 2):
+        bloom.add(value)
+    assert all(bloom.might_contain(value) for value in range(0, 20000, 2))
+    false_positives = sum(bloom.might_contain(value) for value in range(1, 20000, 2))
+    assert false_positives < 10000 * 0.03
+
+    restored = BloomFilter.from_bytes(bloom.to_bytes())
+    assert restored.covered == 10000
+    assert all(restored.might_contain(value) for value in range(0, 20000, 2))
+
+
+def test_index_persists_and_grows():
+    """索引跨实例持久化，超出初始容量后扩容，未写回的布隆过滤器从日志补齐"""
+    with tempfile.TemporaryDirectory() as tmp:
+        index = CommentDedupIndex(tmp, initial_capacity=16)
+        index.add_many(POI_ID, range(1000, 1100))
+        index.add_many('75628', ['5', 'not-a-number', ''])
+        assert index.contains(POI_ID, 1050) and index.contains(POI_ID, '1099')
+        assert not index.contains(POI_ID, 1100)
+        assert not index.contains('75628', 1050)
+        index.flush()
+        index.add_many(POI_ID, [7])  # 未写回布隆过滤器
+
+        reopened = CommentDedupIndex(tmp)
+        assert reopened.count(POI_ID) == 101
+        assert reopened.count('75628') == 1
+        assert reopened.contains(POI_ID, 7) and reopened.contains(POI_ID, 1000)
+        assert not reopened.contains(POI_ID, 999)
+        assert os.path.getsize(os.path.join(tmp, f'{POI_ID}.ids')) == 101 * 8
+
+
+def test_truncate_and_reset():
+    """截断后被截掉的ID不再视为已记录，重置后清空"""
+    with tempfile.TemporaryDirectory() as tmp:
+        index = CommentDedupIndex(tmp)
+        index.add_many(POI_ID, [1, 2, 3])
+        index.flush()
+        index.add_many(POI_ID, [4, 5])
+        index.truncate(POI_ID, 3)
+        assert index.count(POI_ID) == 3
+        assert index.contains(POI_ID, 3) and not index.contains(POI_ID, 4)
+        index.reset(POI_ID)
+        assert index.count(POI_ID) == 0 and not index.contains(POI_ID, 1)
+
+
+def test_shifted_pagination_does_not_duplicate_rows():
+    """爬取过程中有新评论导致翻页偏移时，重复的评论不会写入CSV"""
+    with MockCtripServer(total_count=50) as server, tempfile.TemporaryDirectory() as output_dir:
+        spider = CtripCommentSpider(output_dir, delay_range=(0, 0), logger=LOGGER)
+        spider.post_url = server.url(COMMENT_PATH)
+        original = spider._get_page_comments
+
+        def get_page_comments(poi_id, page):
+            if page == 3:
+                server.new_count = 4  # 第3页开始整体后移4条
+            return original(poi_id, page)
+
+        spider._get_page_comments = get_page_comments
+        assert spider.crawl_comments(POI_ID, POI_NAME, max_pages=5)
+
+        with open(spider._csv_path(POI_ID, POI_NAME), newline='', encoding='utf-8-sig') as f:
+            rows = list(csv.reader(f))[1:]
+        comment_ids = [row[3] for row in rows]
+        assert len(comment_ids) == len(set(comment_ids)) == 46
+        assert [int(row[0]) for row in rows] == list(range(46))
+
+
+if __name__ == "__main__":
+    test_bloom_filter_has_no_false_negatives()
+    test_index_persists_and_grows()
+    test_truncate_and_reset()
+    test_shifted_pagination_does_not_duplicate_rows()
+    print("去重索引测试通过")
@@ -0,0 +1,57 @@
+import os
+import sys
+import random
+import logging
+
+from bs4 import BeautifulSoup
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from Ctrip_Spider.log import CtripSpiderLogger
+from Ctrip_Spider.html_text import html_to_text
+from Ctrip_Spider.sight_detail import AttractionDetailFetcher
+from Ctrip_Spider.test.mock_server import build_detail_response
+
+LOGGER = CtripSpiderLogger("TestHtmlText", "logs", level=logging.ERROR)
+
+# 覆盖常见标签和各类边界情况：隐藏文本的标签、空元素、注释/声明/CDATA、字符引用、不完整的标记
+TOKENS = [
+    '<p>', '</p>', '<P>', '</P>', '<b>', '</b>', '<br>', '<br/>', '</br>', '<img src="a.jpg" />', '<strong/>',
+    '<div class="x">', '</div>', '<span style="color: red;">', '</span>', '<p title="a>b">', '<a\n href=x>', '</a>',
+    '<template>', '</template>', '<script>', '</script>', '<Script>', '<style>', '</style>',
+    '<ruby>', '<rt>', '</rt>', '<rp>', '</rp>', '<textarea>', '</textarea>', '<title>', '</title>',
+    '<!-- 注释 -->', '<!---->', '<![CDATA[cd]]>', '<![if x]>', '<!DOCTYPE html>', '<?pi?>',
+    '&nbsp;', '&nbsp', '&amp;', '&foo;', '&copy', '&#65;', '&#x41;', '&#150;', '&#0;', '&#12ab', '&#xZZ;', '&#',
+    '景色很好', 'a', '  ', '\n', '\xa0', '<', '>', '&', '</',
+]
+
+
+def soup_text(markup):
+    """原实现"""
+    return ' '.join(BeautifulSoup(markup, 'html.parser').get_text().split()).strip()
+
+
+def test_output_matches_beautifulsoup():
+    """随机组合的标记片段与BeautifulSoup的结果完全一致"""
+    rng = random.Random(20261016)
+    for _ in range(3000):
+        markup = ''.join(rng.choice(TOKENS) for _ in range(rng.randint(1, 30)))
+        assert html_to_text(markup) == soup_text(markup), repr(markup)
+    assert html_to_text('  纯文本\n描述  ') == '纯文本 描述'
+    assert html_to_text('<p>a<script>var x = "<p>";</script>b</p><rt>c</rt>&nbsp;d') == 'ab d'
+
+
+def test_description_parsed_without_tree():
+    """详情解析得到的描述与原实现一致"""
+    fetcher = AttractionDetailFetcher(delay_range=(0, 0), logger=LOGGER)
+    response = build_detail_response(87211)
+    result = fetcher._parse_core_data(response)
+    introduction = response['templateList'][2]['moduleList'][0]['introductionModule']['introduction']
+    assert result['description'] == soup_text(introduction) == '景点87211 介绍 亚洲最大的城市广场'
+
+
+if __name__ == "__main__":
+    test_output_matches_beautifulsoup()
+    test_description_parsed_without_tree()
+    print("HTML转文本测试通过")
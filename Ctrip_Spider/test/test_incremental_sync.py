@@ -0,0 +1,117 @@
+import os
+import sys
+import csv
+import logging
+import tempfile
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from Ctrip_Spider.log import CtripSpiderLogger
+from Ctrip_Spider.sight_comments import CtripCommentSpider
+from Ctrip_Spider.test.mock_server import MockCtripServer
+
+LOGGER = CtripSpiderLogger("TestIncrementalSync", "logs", level=logging.ERROR)
+COMMENT_PATH = '/restapi/soa2/13444/json/getCommentCollapseList'
+POI_ID, POI_NAME = '76865', '星海广场'
+
+
+def make_spider(server, output_dir):
+    spider = CtripCommentSpider(output_dir, delay_range=(0, 0), logger=LOGGER)
+    spider.optimizer.retry_policy.max_retries = 0
+    spider.post_url = server.url(COMMENT_PATH)
+    return spider
+
+
+def read_rows(spider):
+    with open(spider._csv_path(POI_ID, POI_NAME), newline='', encoding='utf-8-sig') as f:
+        return list(csv.reader(f))[1:]
+
+
+def test_only_new_comments_are_fetched_and_appended():
+    """增量同步只请求新评论所在的页，并把新评论追加到CSV末尾"""
+    with MockCtripServer(total_count=300) as server, tempfile.TemporaryDirectory() as output_dir:
+        spider = make_spider(server, output_dir)
+        assert spider.crawl_comments(POI_ID, POI_NAME, max_pages=100)
+        full_requests = server.request_count
+        assert len(read_rows(spider)) == 300
+
+        server.new_count = 13
+        requests_before = server.request_count
+        assert spider.crawl_comments(POI_ID, POI_NAME, incremental=True)
+        assert server.request_count - requests_before == 2
+        rows = read_rows(spider)
+        assert len(rows) == 313
+        assert [int(row[0]) for row in rows[-13:]] == list(range(300, 313))
+        assert [int(row[3]) for row in rows[-13:]] == [900000000 + k for k in range(13, 0, -1)]
+
+        # 没有新评论时只请求一页
+        requests_before = server.request_count
+        assert spider.crawl_comments(POI_ID, POI_NAME, incremental=True)
+        assert server.request_count - requests_before == 1
+        assert len(read_rows(spider)) == 313
+        assert full_requests > 30
+
+
+def test_marker_recovered_from_existing_csv():
+    """没有同步状态时从已有CSV中找到最新评论"""
+    with MockCtripServer(total_count=50) as server, tempfile.TemporaryDirectory() as output_dir:
+        spider = make_spider(server, output_dir)
+        assert spider.crawl_comments(POI_ID, POI_NAME, max_pages=5)
+        spider.sync_state.clear(POI_ID)
+
+        server.new_count = 4
+        requests_before = server.request_count
+        assert spider.crawl_comments(POI_ID, POI_NAME, incremental=True)
+        assert server.request_count - requests_before == 1
+        assert len(read_rows(spider)) == 54
+
+
+def test_failed_sync_writes_nothing():
+    """中途请求失败时不写入数据也不推进同步状态，下次同步补齐"""
+    with MockCtripServer(total_count=50) as server, tempfile.TemporaryDirectory() as output_dir:
+        spider = make_spider(server, output_dir)
+        assert spider.crawl_comments(POI_ID, POI_NAME, max_pages=5)
+
+        server.new_count = 15
+        server.scripted_statuses.extend([200, 503])
+        assert not spider.crawl_comments(POI_ID, POI_NAME, incremental=True)
+        assert len(read_rows(spider)) == 50
+
+        assert spider.crawl_comments(POI_ID, POI_NAME, incremental=True)
+        assert len(read_rows(spider)) == 65
+
+
+def test_blank_publish_time_does_not_stop_sync():
+    """发布时间为空的评论不参与最新评论标记，也不会使同步提前结束而漏掉之后的新评论"""
+    with MockCtripServer(total_count=50) as server, tempfile.TemporaryDirectory() as output_dir:
+        spider = make_spider(server, output_dir)
+        assert spider.crawl_comments(POI_ID, POI_NAME, max_pages=5)
+
+        # 新增4条评论，最新的一条和第三条没有发布时间
+        server.new_count = 4
+        server.blank_time_positions = {-4, -2}
+        assert spider.crawl_comments(POI_ID, POI_NAME, incremental=True)
+        rows = read_rows(spider)
+        assert len(rows) == 54
+        assert [int(row[3]) for row in rows[-4:]] == [900000004, 900000003, 900000002, 900000001]
+        marker = spider.sync_state.load(POI_ID)
+        assert marker['publish_time'] == spider._convert_time(f'/Date({1700000000000 + 3 * 3600 * 1000}+0800)/')
+        assert marker['comment_ids'] == ['900000003']
+
+        # 再次同步：已保存的无时间评论被去重，不重复写入，同步正常完成
+        requests_before = server.request_count
+        assert spider.crawl_comments(POI_ID, POI_NAME, incremental=True)
+        assert server.request_count - requests_before == 1
+        assert len(read_rows(spider)) == 54
+
+    assert CtripCommentSpider._newest_marker([{'commentId': 1, 'publishTime': ''},
+                                              {'commentId': 2, 'publishTime': '/Date(abc)/'}]) is None
+
+
+if __name__ == "__main__":
+    test_only_new_comments_are_fetched_and_appended()
+    test_marker_recovered_from_existing_csv()
+    test_failed_sync_writes_nothing()
+    test_blank_publish_time_does_not_stop_sync()
+    print("增量同步测试通过")
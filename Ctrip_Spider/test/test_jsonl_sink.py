@@ -0,0 +1,101 @@
+import os
+import sys
+import logging
+import tempfile
+import threading
+import time
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from Ctrip_Spider.log import CtripSpiderLogger
+from Ctrip_Spider.jsonl_sink import JsonlWriter, read_jsonl
+from Ctrip_Spider.sight_list import CtripAttractionScraper
+from Ctrip_Spider.test.mock_server import MockCtripServer
+
+LOGGER = CtripSpiderLogger("TestJsonlSink", "logs", level=logging.ERROR)
+LIST_PATH = '/restapi/soa2/13342/json/getSightRecreationList'
+
+
+def make_scraper(server):
+    scraper = CtripAttractionScraper(delay_range=(0, 0), logger=LOGGER)
+    scraper.url = server.url(LIST_PATH)
+    return scraper
+
+
+def test_reader_skips_partial_line_and_follows_writer():
+    """读取时跳过写了一半的行；follow模式下读取写入过程中追加的行"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'a.jsonl')
+        with JsonlWriter(path, fsync_interval=0) as writer:
+            writer.write_records([{'id': 1, 'name': '星海广场'}, {'id': 2}])
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write('{"id": 3, "na')
+        assert [r['id'] for r in read_jsonl(path)] == [1, 2]
+
+        writer = JsonlWriter(path)
+
+        def produce():
+            for i in range(5):
+                writer.write_records([{'id': i}])
+                time.sleep(0.02)
+            writer.close()
+
+        thread = threading.Thread(target=produce)
+        thread.start()
+        records = list(read_jsonl(path, follow=True, idle_timeout=0.5, poll_interval=0.01))
+        thread.join()
+        assert [r['id'] for r in records] == [0, 1, 2, 3, 4]
+
+
+def test_pagination_streams_pages_to_jsonl():
+    """分页获取时逐页写出，collect=False时不在内存中收集"""
+    with MockCtripServer(attraction_count=45) as server, tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'attractions.jsonl')
+        scraper = make_scraper(server)
+        lines_seen = {}
+        original = scraper._fetch_attractions_page
+
+        def fetch_attractions_page(district_id, page, count):
+            # 获取每一页之前，之前的页面已可被下游读取
+            lines_seen[page] = sum(1 for _ in read_jsonl(path)) if os.path.exists(path) else 0
+            return original(district_id, page, count)
+
+        scraper._fetch_attractions_page = fetch_attractions_page
+        result = scraper.get_attractions_with_pagination(9, pages=6, count_per_page=10, output_path=path,
+                                                         collect=False)
+        assert result == []
+        assert lines_seen == {1: 0, 2: 10, 3: 20, 4: 30, 5: 40, 6: 45}
+        records = list(read_jsonl(path))
+        assert len(records) == 45 and records[44]['name'] == '景点44'
+
+        assert scraper.get_attractions_with_pagination(9, pages=2, count_per_page=10, output_path=path) == \
+            list(read_jsonl(path))
+
+
+def test_interrupted_pagination_keeps_fetched_pages():
+    """中途中断时已获取的页面保留在文件中"""
+    with MockCtripServer(attraction_count=100) as server, tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'attractions.jsonl')
+        scraper = make_scraper(server)
+        original = scraper._fetch_attractions_page
+
+        def fetch_attractions_page(district_id, page, count):
+            if page == 3:
+                raise KeyboardInterrupt
+            return original(district_id, page, count)
+
+        scraper._fetch_attractions_page = fetch_attractions_page
+        try:
+            scraper.get_attractions_with_pagination(9, pages=5, count_per_page=10, output_path=path)
+            assert False, "应当被中断"
+        except KeyboardInterrupt:
+            pass
+        assert [r['poi_id'] for r in read_jsonl(path)] == [9000000 + i for i in range(20)]
+
+
+if __name__ == "__main__":
+    test_reader_skips_partial_line_and_follows_writer()
+    test_pagination_streams_pages_to_jsonl()
+    test_interrupted_pagination_keeps_fetched_pages()
+    print("JSON Lines输出测试通过")
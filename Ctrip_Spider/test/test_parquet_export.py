@@ -0,0 +1,113 @@
+import os
+import sys
+import logging
+import tempfile
+from datetime import datetime
+
+import pytest
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from Ctrip_Spider import parquet_export
+from Ctrip_Spider.log import CtripSpiderLogger
+from Ctrip_Spider.parquet_export import convert_comment, iter_csv_comments, COMMENT_COLUMNS
+from Ctrip_Spider.sight_comments import CtripCommentSpider
+from Ctrip_Spider.test.mock_server import MockCtripServer
+
+LOGGER = CtripSpiderLogger("TestParquetExport", "logs", level=logging.ERROR)
+COMMENT_PATH = '/restapi/soa2/13444/json/getCommentCollapseList'
+
+
+def crawl(server, output_dir, poi_id, poi_name, pages, **kwargs):
+    spider = CtripCommentSpider(output_dir, delay_range=(0, 0), logger=LOGGER, **kwargs)
+    spider.post_url = server.url(COMMENT_PATH)
+    assert spider.crawl_comments(poi_id, poi_name, max_pages=pages)
+    return spider._csv_path(poi_id, poi_name)
+
+
+def test_convert_comment_types():
+    """分数转为浮点数、计数转为整数、发布时间转为时间、图片链接转为列表，空值为None"""
+    row = convert_comment('76865', '星海广场', [
+        '900000001', '用户', '5', '内容', '2023-11-14 22:13:20', '3', '0', '家庭亲子', '辽宁', '2小时',
+        '2', 'https://a.jpg;https://b.jpg', '', '4', '4.5', '海景;夜景'
+    ])
+    record = dict(zip((name for name, _ in COMMENT_COLUMNS), row))
+    assert record['poi_id'] == 76865 and record['comment_id'] == 900000001
+    assert record['score'] == 5.0 and record['scenery_score'] is None and record['value_score'] == 4.5
+    assert record['useful_count'] == 3 and record['image_count'] == 2
+    assert record['publish_time'] == datetime(2023, 11, 14, 22, 13, 20)
+    assert record['image_urls'] == ['https://a.jpg', 'https://b.jpg']
+    assert record['recommend_items'] == ['海景', '夜景']
+    assert convert_comment('1', 'x', [''] * 16)[6] is None
+
+
+def test_csv_rows_match_spider_comments():
+    """从CSV读取的行与爬取时直接写入的行类型和取值一致"""
+    with MockCtripServer(total_count=30) as server, tempfile.TemporaryDirectory() as tmp:
+        file_path = crawl(server, tmp, '76865', '星海广场', 3)
+        rows = list(iter_csv_comments(file_path))
+        assert len(rows) == 30
+        spider = CtripCommentSpider(tmp, delay_range=(0, 0), logger=LOGGER)
+        spider.post_url = server.url(COMMENT_PATH)
+        comments = spider._get_page_comments('76865', 1)
+        direct = [convert_comment('76865', '星海广场', (c[key] for key in parquet_export.COMMENT_KEYS))
+                  for c in comments]
+        assert rows[:10] == direct
+
+
+def test_missing_pyarrow_raises_import_error():
+    """未安装pyarrow时给出安装提示"""
+    original = parquet_export.pa
+    parquet_export.pa = None
+    try:
+        with pytest.raises(ImportError, match='pip install pyarrow'):
+            parquet_export.ParquetCommentWriter(os.path.join(tempfile.gettempdir(), 'x.parquet'))
+    finally:
+        parquet_export.pa = original
+
+
+def test_export_row_groups_per_poi():
+    """每个行组只包含一个景点，按景点和列读取时只读需要的数据"""
+    pq = pytest.importorskip('pyarrow.parquet')
+    with MockCtripServer(total_count=50) as server, tempfile.TemporaryDirectory() as tmp:
+        crawl(server, tmp, '76865', '星海广场', 3)
+        crawl(server, tmp, '75628', '棒棰岛', 5)
+        output_path = os.path.join(tmp, 'comments.parquet')
+        assert parquet_export.export_comments(tmp, output_path, row_group_size=40, logger=LOGGER) == 80
+
+        # 写入文件的schema与声明的一致（时间戳精度不被Parquet改写）
+        assert pq.read_schema(output_path).remove_metadata() == parquet_export.comment_schema()
+        metadata = pq.ParquetFile(output_path).metadata
+        assert metadata.num_rows == 80 and metadata.num_row_groups == 3
+        for i in range(metadata.num_row_groups):
+            stats = metadata.row_group(i).column(0).statistics
+            assert stats.min == stats.max
+
+        table = parquet_export.read_comments(output_path, columns=['poi_id', 'score', 'publish_time'],
+                                             poi_ids=['76865'])
+        assert table.num_rows == 30 and table.column_names == ['poi_id', 'score', 'publish_time']
+        assert str(table.schema.field('publish_time').type) == 'timestamp[ms]'
+        assert str(table.schema.field('score').type) == 'double'
+
+
+def test_spider_writes_parquet_directly():
+    """爬虫可把Parquet写入器作为sink，爬取时直接写出列式文件"""
+    pytest.importorskip('pyarrow')
+    with MockCtripServer(total_count=30) as server, tempfile.TemporaryDirectory() as tmp:
+        output_path = os.path.join(tmp, 'comments.parquet')
+        with parquet_export.ParquetCommentWriter(output_path, logger=LOGGER) as sink:
+            crawl(server, tmp, '76865', '星海广场', 3, sink=sink)
+        table = parquet_export.read_comments(output_path)
+        assert table.num_rows == 30
+        assert table.column('image_urls').to_pylist()[2] == [
+            'https://dimg.ctrip.com/76865/899999998_0.jpg', 'https://dimg.ctrip.com/76865/899999998_1.jpg']
+
+
+if __name__ == "__main__":
+    test_convert_comment_types()
+    test_csv_rows_match_spider_comments()
+    test_missing_pyarrow_raises_import_error()
+    test_export_row_groups_per_poi()
+    test_spider_writes_parquet_directly()
+    print("Parquet导出测试通过")
@@ -0,0 +1,74 @@
+import sys
+import os
+import time
+import socket
+import logging
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from Ctrip_Spider.log import CtripSpiderLogger
+from Ctrip_Spider.anti_spider import ProxyPool
+from Ctrip_Spider.test.mock_server import MockCtripServer
+
+
+TEST_URL = 'http://proxy-check.test/ping'
+
+
+def _closed_port_proxy():
+    """返回一个没有监听的本地端口作为不可用代理"""
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return f'http://127.0.0.1:{port}'
+
+
+def test_concurrent_check_all_proxies():
+    """
+    测试并发检查代理：本地替身代理可用，未监听端口不可用
+    """
+    logger = CtripSpiderLogger("TestProxyHealth", "logs", level=logging.WARNING)
+
+    with MockCtripServer() as good, MockCtripServer() as bad:
+        bad.proxy_healthy = False
+        dead = _closed_port_proxy()
+        pool = ProxyPool([good.base_url, bad.base_url, dead], logger=logger)
+
+        pool.check_all_proxies(TEST_URL, max_workers=3, timeout=2)
+
+        assert pool.proxy_stats[good.base_url]['is_active']
+        assert not pool.proxy_stats[bad.base_url]['is_active']
+        assert not pool.proxy_stats[dead]['is_active']
+        assert good.paths == [TEST_URL]
+
+
+def test_background_revalidation_restores_proxy():
+    """
+    测试后台复检把恢复健康的代理重新放回轮换
+    """
+    logger = CtripSpiderLogger("TestProxyHealth", "logs", level=logging.WARNING)
+
+    with MockCtripServer() as proxy_server:
+        proxy = proxy_server.base_url
+        pool = ProxyPool([proxy], logger=logger)
+        for _ in range(3):
+            pool.mark_fail(proxy)
+        assert pool.get_random_proxy() is None
+
+        pool.start_revalidation(interval=0.05, test_url=TEST_URL, timeout=2)
+        try:
+            deadline = time.monotonic() + 5
+            while pool.get_stats()['active'] == 0 and time.monotonic() < deadline:
+                time.sleep(0.02)
+        finally:
+            pool.stop_revalidation()
+
+        assert pool.get_random_proxy() == proxy
+        assert pool.proxy_stats[proxy]['fail_count'] == 0
+
+
+if __name__ == "__main__":
+    test_concurrent_check_all_proxies()
+    test_background_revalidation_restores_proxy()
+    print("代理健康检查测试完成")
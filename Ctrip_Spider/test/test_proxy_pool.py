@@ -0,0 +1,91 @@
+import sys
+import os
+import random
+import logging
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from Ctrip_Spider.log import CtripSpiderLogger
+from Ctrip_Spider.anti_spider import ProxyPool
+
+
+def _pool(count):
+    logger = CtripSpiderLogger("TestProxyPool", "logs", level=logging.WARNING)
+    return ProxyPool([f'http://10.0.{i // 256}.{i % 256}:8080' for i in range(count)], logger=logger)
+
+
+def _naive_least_used(pool):
+    """旧实现：每次排序全部可用代理，平局时取先加入的代理"""
+    active = [p for p in pool.proxies if pool.proxy_stats[p]['is_active']]
+    active.sort(key=lambda p: (pool.proxy_stats[p]['success_count'], pool._order[p]))
+    return active[0] if active else None
+
+
+def test_selection_matches_naive_implementation():
+    """
+    测试随机增删、成功、失败操作后，最少使用选取与旧的排序实现结果一致，随机选取只返回可用代理
+    """
+    rng = random.Random(7)
+    pool = _pool(200)
+    for step in range(3000):
+        proxy = rng.choice(pool.proxies)
+        action = rng.random()
+        if action < 0.5:
+            pool.mark_success(proxy)
+        elif action < 0.8:
+            pool.mark_fail(proxy)
+        elif action < 0.85:
+            pool.remove_proxy(proxy)
+            pool.add_proxy(proxy)
+
+        assert pool.get_round_robin_proxy() == _naive_least_used(pool)
+        picked = pool.get_random_proxy()
+        if picked is not None:
+            assert pool.proxy_stats[picked]['is_active']
+
+    active = {p for p in pool.proxies if pool.proxy_stats[p]['is_active']}
+    assert pool.get_stats()['active'] == len(active)
+
+
+def test_remove_proxy_keeps_index_consistent():
+    """
+    测试移除代理（与末尾元素交换后弹出）后代理列表与下标字典保持一致
+    """
+    rng = random.Random(11)
+    pool = _pool(50)
+    removed = set()
+    for _ in range(30):
+        proxy = rng.choice(pool.proxies)
+        pool.remove_proxy(proxy)
+        removed.add(proxy)
+        assert len(pool.proxies) == len(pool._proxy_index) == len(pool.proxy_stats)
+        assert all(pool.proxies[i] == p for p, i in pool._proxy_index.items())
+
+    assert not removed & set(pool.proxies)
+    assert all(pool.get_random_proxy() not in removed for _ in range(100))
+    pool.remove_proxy(proxy)
+    pool.add_proxy(proxy)
+    assert pool.proxies[pool._proxy_index[proxy]] == proxy
+
+
+def test_reactivated_proxy_is_selectable():
+    """
+    测试失败下线后再次成功的代理重新参与选取
+    """
+    pool = _pool(2)
+    first, second = pool.proxies
+    pool.mark_fail(first, max_fails=1)
+    assert {pool.get_random_proxy() for _ in range(20)} == {second}
+
+    pool.mark_success(first)
+    assert pool.get_stats()['active'] == 2
+    assert first in {pool.get_random_proxy() for _ in range(50)}
+    assert pool.get_round_robin_proxy() == second
+
+
+if __name__ == "__main__":
+    test_selection_matches_naive_implementation()
+    test_reactivated_proxy_is_selectable()
+    test_remove_proxy_keeps_index_consistent()
+    print("代理池测试完成")
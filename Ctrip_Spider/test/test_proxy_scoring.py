@@ -0,0 +1,74 @@
+import os
+import sys
+import logging
+from collections import Counter
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from Ctrip_Spider.log import CtripSpiderLogger
+from Ctrip_Spider.anti_spider import ProxyPool, EnhancedRequestOptimizer
+
+LOGGER = CtripSpiderLogger("TestProxyScoring", "logs", level=logging.ERROR)
+FAST = 'http://10.0.0.1:8080'
+SLOW = 'http://10.0.0.2:8080'
+FLAKY = 'http://10.0.0.3:8080'
+
+
+def test_latency_ewma_and_percentiles():
+    """记录延迟后EWMA和分位数正确"""
+    pool = ProxyPool([FAST], logger=LOGGER)
+    assert pool.get_latency_stats(FAST)['ewma'] is None
+
+    for value in [0.1] * 19 + [1.0]:
+        pool.record_latency(FAST, value)
+    stats = pool.get_latency_stats(FAST)
+    assert stats['samples'] == 20
+    assert stats['p50'] == 0.1
+    assert stats['p95'] == 1.0
+    assert 0.1 < stats['ewma'] < 1.0
+    assert FAST in pool.get_stats()['latency']
+
+
+def test_weighted_prefers_fast_reliable_proxy():
+    """加权选取偏向快而稳定的代理，同时慢代理仍会被探索"""
+    pool = ProxyPool([FAST, SLOW, FLAKY], logger=LOGGER)
+    for _ in range(10):
+        pool.record_latency(FAST, 0.1)
+        pool.mark_success(FAST)
+        pool.record_latency(SLOW, 2.0)
+        pool.mark_success(SLOW)
+        pool.record_latency(FLAKY, 0.1)
+    pool.mark_fail(FLAKY, max_fails=100)
+    pool.mark_fail(FLAKY, max_fails=100)
+
+    counts = Counter(pool.get_weighted_proxy() for _ in range(3000))
+    assert counts[FAST] > counts[FLAKY] > counts[SLOW]
+    assert counts[SLOW] > 0
+
+
+def test_unmeasured_proxy_is_explored_first():
+    """尚无延迟数据的代理得分最优，会被优先尝试"""
+    pool = ProxyPool([FAST, SLOW], logger=LOGGER, explore_rate=0.0, weighted_candidates=8)
+    pool.record_latency(FAST, 0.1)
+    counts = Counter(pool.get_weighted_proxy() for _ in range(200))
+    assert counts[SLOW] > counts[FAST]
+
+
+def test_optimizer_records_latency_in_weighted_mode():
+    """优化器在weighted模式下使用加权选取，并把响应时间记入代理池"""
+    optimizer = EnhancedRequestOptimizer(
+        delay_range=(0, 0), proxies=[FAST], use_proxy=True, proxy_mode='weighted', logger=LOGGER
+    )
+    assert optimizer.get_proxy_dict() == {'http': FAST, 'https': FAST}
+    optimizer.record_response(proxy_url=FAST, status_code=200, response_time=0.25)
+    assert optimizer.proxy_pool.get_latency_stats(FAST)['ewma'] == 0.25
+    optimizer.close()
+
+
+if __name__ == "__main__":
+    test_latency_ewma_and_percentiles()
+    test_weighted_prefers_fast_reliable_proxy()
+    test_unmeasured_proxy_is_explored_first()
+    test_optimizer_records_latency_in_weighted_mode()
+    print("代理延迟评分测试通过")
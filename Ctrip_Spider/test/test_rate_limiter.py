@@ -0,0 +1,80 @@
+import sys
+import os
+import time
+import asyncio
+import threading
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from Ctrip_Spider.anti_spider import TokenBucket, RateLimiter
+
+
+def test_token_bucket_enforces_rate_across_threads():
+    """
+    测试多个线程共享令牌桶时，总速率不超过目标QPS（突发部分除外）
+    """
+    bucket = TokenBucket(rate=50, burst=5)
+
+    def worker():
+        for _ in range(10):
+            bucket.acquire()
+
+    start_time = time.monotonic()
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start_time
+
+    # 40个令牌，前5个为突发，其余35个以50QPS补充
+    assert elapsed >= 35 / 50 - 0.05
+    assert bucket.get_stats()['acquired'] == 40
+
+
+def test_token_bucket_async():
+    """
+    测试协程并发获取令牌时同样受限速约束
+    """
+    bucket = TokenBucket(rate=100, burst=1)
+
+    async def run():
+        await asyncio.gather(*(bucket.acquire_async() for _ in range(21)))
+
+    start_time = time.monotonic()
+    asyncio.run(run())
+    assert time.monotonic() - start_time >= 20 / 100 - 0.02
+
+
+def test_rate_limiter_endpoint_bucket():
+    """
+    测试接口桶比全局桶更严格时以接口桶为准，其他接口不受影响
+    """
+    limiter = RateLimiter(qps=1000, burst=1, endpoint_limits={'comments': (20, 1)})
+
+    start_time = time.monotonic()
+    for _ in range(5):
+        limiter.acquire('comments')
+    assert time.monotonic() - start_time >= 4 / 20 - 0.01
+
+    start_time = time.monotonic()
+    for _ in range(5):
+        limiter.acquire('search')
+    assert time.monotonic() - start_time < 4 / 20
+
+
+def test_unlimited_bucket_never_waits():
+    """
+    测试QPS为0时不限速
+    """
+    bucket = TokenBucket(rate=0, jitter=0.5)
+    assert all(bucket.acquire() == 0 for _ in range(100))
+
+
+if __name__ == "__main__":
+    test_token_bucket_enforces_rate_across_threads()
+    test_token_bucket_async()
+    test_rate_limiter_endpoint_bucket()
+    test_unlimited_bucket_never_waits()
+    print("限速器测试完成")
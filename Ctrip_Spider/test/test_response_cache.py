@@ -0,0 +1,83 @@
+import os
+import sys
+import time
+import logging
+import tempfile
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from Ctrip_Spider.log import CtripSpiderLogger
+from Ctrip_Spider.response_cache import ResponseCache
+from Ctrip_Spider.sight_detail import AttractionDetailFetcher
+from Ctrip_Spider.sight_id import SightId
+from Ctrip_Spider.test.mock_server import MockCtripServer
+
+LOGGER = CtripSpiderLogger("TestResponseCache", "logs", level=logging.ERROR)
+DETAIL_PATH = '/restapi/soa2/18254/json/getPoiMoreDetail'
+SEARCH_PATH = '/restapi/soa2/26872/search'
+
+
+def test_key_ignores_head_and_key_order():
+    """缓存键与head块和字段顺序无关，JSON字符串与字典等价"""
+    a = ResponseCache.make_key('detail', {'poiId': 1, 'scene': 'basic', 'head': {'cid': '1'}})
+    b = ResponseCache.make_key('detail', {'head': {'cid': '2', 'sid': '9'}, 'scene': 'basic', 'poiId': 1})
+    assert a == b == ResponseCache.make_key('detail', '{"scene": "basic", "poiId": 1}')
+    assert a != ResponseCache.make_key('detail', {'poiId': 2, 'scene': 'basic'})
+    assert a != ResponseCache.make_key('search', {'poiId': 1, 'scene': 'basic'})
+
+
+def test_detail_and_search_served_from_cache():
+    """重复获取详情和搜索关键词时命中缓存；use_cache=False时请求接口；过期后重新请求"""
+    with MockCtripServer() as server, tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(tmp, ttls={'detail': 3600, 'search': 0.2})
+        fetcher = AttractionDetailFetcher(delay_range=(0, 0), logger=LOGGER, response_cache=cache)
+        fetcher.detail_url = server.url(DETAIL_PATH)
+        first = fetcher.get_detail(87211)
+        assert first['success'] and server.request_count == 1
+        assert fetcher.get_detail(87211) == first and server.request_count == 1
+        assert fetcher.get_detail(87211, use_cache=False) == first and server.request_count == 2
+
+        searcher = SightId(delay_range=(0, 0), logger=LOGGER, optimizer=fetcher.optimizer, response_cache=cache)
+        searcher.search_url = server.url(SEARCH_PATH)
+        sight_id = searcher.search_sight_id('黄鹤楼')
+        assert sight_id and searcher.search_sight_id('黄鹤楼') == sight_id
+        assert server.request_count == 3
+        # 没有结果的搜索不缓存
+        assert searcher.search_sight_id('不存在的景点') is None
+        assert searcher.search_sight_id('不存在的景点') is None
+        assert server.request_count == 5
+
+        time.sleep(0.25)
+        assert searcher.search_sight_id('黄鹤楼') == sight_id and server.request_count == 6
+        assert cache.get_stats()['hits'] == 2
+
+
+def test_eviction_keeps_recently_used_entries():
+    """超过大小上限时淘汰最久未使用的条目"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(tmp, ttls={'detail': 3600}, max_bytes=4000)
+        body = {'templateList': ['x' * 300]}
+        for poi_id in range(5):
+            cache.put('detail', {'poiId': poi_id}, body)
+        # 读取第0条，使其成为最近使用的条目
+        assert cache.get('detail', {'poiId': 0}) == body
+        for poi_id in range(5, 15):
+            cache.put('detail', {'poiId': poi_id}, body)
+            if poi_id == 8:
+                cache.get('detail', {'poiId': 0})
+
+        assert cache.get_stats()['bytes'] <= 4000
+        assert cache.get('detail', {'poiId': 0}) == body
+        assert cache.get('detail', {'poiId': 1}) is None
+        assert cache.get('detail', {'poiId': 14}) == body
+        # 未配置有效期的接口不缓存
+        cache.put('comments', {'poiId': 1}, body)
+        assert cache.get('comments', {'poiId': 1}) is None
+
+
+if __name__ == "__main__":
+    test_key_ignores_head_and_key_order()
+    test_detail_and_search_served_from_cache()
+    test_eviction_keeps_recently_used_entries()
+    print("响应缓存测试通过")
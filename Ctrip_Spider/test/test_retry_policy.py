@@ -0,0 +1,115 @@
+import os
+import sys
+import logging
+import tempfile
+
+import requests
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from Ctrip_Spider.log import CtripSpiderLogger
+from Ctrip_Spider.config import MAX_RETRIES
+from Ctrip_Spider.anti_spider import RetryBudget, RetryPolicy, EnhancedRequestOptimizer, CircuitOpenError
+from Ctrip_Spider.sight_comments import CtripCommentSpider
+from Ctrip_Spider.test.mock_server import MockCtripServer
+
+LOGGER = CtripSpiderLogger("TestRetryPolicy", "logs", level=logging.ERROR)
+COMMENT_PATH = '/restapi/soa2/13444/json/getCommentCollapseList'
+
+
+def fast_policy(**kwargs) -> RetryPolicy:
+    """退避时间很短的重试策略，便于测试"""
+    return RetryPolicy(base_delay=0.001, max_delay=0.01, **kwargs)
+
+
+def test_retry_rules_and_default_max_retries():
+    """按状态码和异常类型判断是否重试，默认次数取config.MAX_RETRIES"""
+    policy = RetryPolicy()
+    assert policy.max_retries == MAX_RETRIES
+    assert policy.is_retryable(status_code=503)
+    assert policy.is_retryable(status_code=429)
+    assert not policy.is_retryable(status_code=404)
+    assert policy.is_retryable(error=requests.exceptions.ReadTimeout())
+    assert policy.is_retryable(error=requests.exceptions.ProxyError())
+    assert not policy.is_retryable(error=CircuitOpenError())
+    assert not policy.is_retryable(error=ValueError())
+
+
+def test_decorrelated_jitter_bounds():
+    """退避等待介于基础等待和上次等待的3倍之间，且不超过上限"""
+    policy = RetryPolicy(base_delay=0.5, max_delay=4.0)
+    delay = None
+    for _ in range(200):
+        previous = delay or policy.base_delay
+        delay = policy.next_delay(delay)
+        assert policy.base_delay <= delay <= min(policy.max_delay, previous * 3)
+
+
+def test_budget_limits_retry_ratio():
+    """持续故障时重试数不超过首发请求数的ratio倍（加上初始令牌）"""
+    budget = RetryBudget(ratio=0.1, min_retries=2)
+    allowed = 0
+    for _ in range(1000):
+        budget.deposit()
+        if budget.withdraw():
+            allowed += 1
+    assert allowed <= 2 + 1000 * 0.1
+    assert budget.get_stats()['exhausted'] == 1000 - allowed
+
+
+def test_transient_failures_are_retried():
+    """临时故障被重试，不可重试的状态码直接返回"""
+    with MockCtripServer(total_count=100) as server:
+        optimizer = EnhancedRequestOptimizer(delay_range=(0, 0), retry_policy=fast_policy(), logger=LOGGER)
+        url = server.url(COMMENT_PATH)
+
+        server.scripted_statuses.extend([503, 429])
+        assert optimizer.send('POST', url, json={}).status_code == 200
+        assert server.request_count == 3
+
+        server.scripted_statuses.append(404)
+        assert optimizer.send('POST', url, json={}).status_code == 404
+        assert server.request_count == 4
+
+        # 重试用尽后返回最后一次的响应
+        server.scripted_statuses.extend([500] * (MAX_RETRIES + 1))
+        assert optimizer.send('POST', url, json={}).status_code == 500
+        assert optimizer.get_stats()['retry_stats']['retries'] == 2 + MAX_RETRIES
+        optimizer.close()
+
+
+def test_exhausted_budget_stops_retries():
+    """预算耗尽时不再重试"""
+    with MockCtripServer(total_count=100) as server:
+        policy = fast_policy(budget=RetryBudget(ratio=0.0, min_retries=0))
+        optimizer = EnhancedRequestOptimizer(delay_range=(0, 0), retry_policy=policy, logger=LOGGER)
+        server.scripted_statuses.append(503)
+        assert optimizer.send('POST', server.url(COMMENT_PATH), json={}).status_code == 503
+        assert server.request_count == 1
+        optimizer.close()
+
+
+def test_comment_page_survives_transient_failure():
+    """评论页遇到一次临时故障后重试成功，不再丢页"""
+    with MockCtripServer(total_count=30) as server, tempfile.TemporaryDirectory() as output_dir:
+        optimizer = EnhancedRequestOptimizer(delay_range=(0, 0), retry_policy=fast_policy(), logger=LOGGER)
+        spider = CtripCommentSpider(output_dir, logger=LOGGER, optimizer=optimizer)
+        spider.post_url = server.url(COMMENT_PATH)
+        # 总页数请求成功，第1页首次请求失败
+        server.scripted_statuses.extend([200, 502])
+        assert spider.crawl_comments('76865', '星海广场', max_pages=3)
+
+        with open(spider._csv_path('76865', '星海广场'), encoding='utf-8-sig') as f:
+            assert len(f.read().strip().splitlines()) == 1 + 30
+        optimizer.close()
+
+
+if __name__ == "__main__":
+    test_retry_rules_and_default_max_retries()
+    test_decorrelated_jitter_bounds()
+    test_budget_limits_retry_ratio()
+    test_transient_failures_are_retried()
+    test_exhausted_budget_stops_retries()
+    test_comment_page_survives_transient_failure()
+    print("重试策略测试通过")
@@ -0,0 +1,53 @@
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from Ctrip_Spider.log import CtripSpiderLogger
+from Ctrip_Spider.anti_spider import SessionPool, EnhancedRequestOptimizer
+from Ctrip_Spider.test.mock_server import MockCtripServer
+
+
+def test_session_pool_reuses_connections():
+    """
+    测试连接池在多次请求间复用同一个keep-alive连接
+    """
+    logger = CtripSpiderLogger("TestSessionPool", "logs")
+    pool = SessionPool(pool_maxsize=2, logger=logger)
+
+    with MockCtripServer(total_count=50) as server:
+        url = server.url('/restapi/soa2/13444/json/getCommentCollapseList')
+        for page in range(1, 6):
+            response = pool.request('POST', url, json={'arg': {'pageIndex': page}}, timeout=5)
+            assert response.status_code == 200
+            assert len(response.json()['result']['items']) == 10
+
+        assert server.request_count == 5
+        assert server.connection_count == 1
+    pool.close()
+
+
+def test_optimizer_shares_session_pool():
+    """
+    测试多个优化器可以共享同一个连接池
+    """
+    logger = CtripSpiderLogger("TestSessionPool", "logs")
+    pool = SessionPool(logger=logger)
+    first = EnhancedRequestOptimizer(delay_range=(0, 0), session_pool=pool, logger=logger)
+    second = EnhancedRequestOptimizer(delay_range=(0, 0), session_pool=pool, logger=logger)
+
+    with MockCtripServer(total_count=50) as server:
+        url = server.url('/restapi/soa2/13444/json/getCommentCollapseList')
+        assert first.make_request('POST', url, json={'arg': {'pageIndex': 1}}).status_code == 200
+        assert second.make_request('POST', url, json={'arg': {'pageIndex': 2}}).status_code == 200
+        assert server.connection_count == 1
+
+    assert first.get_stats()['session_stats']['sessions'] == 1
+    pool.close()
+
+
+if __name__ == "__main__":
+    test_session_pool_reuses_connections()
+    test_optimizer_shares_session_pool()
+    print("连接池测试完成")
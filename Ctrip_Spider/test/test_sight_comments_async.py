@@ -0,0 +1,80 @@
+import sys
+import os
+import asyncio
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from Ctrip_Spider.log import CtripSpiderLogger
+from Ctrip_Spider.anti_spider import EnhancedRequestOptimizer
+from Ctrip_Spider.sight_comments import CtripCommentSpider
+from Ctrip_Spider.sight_comments_async import AsyncCtripCommentSpider
+from Ctrip_Spider.test.mock_server import MockCtripServer
+
+
+COMMENT_PATH = '/restapi/soa2/13444/json/getCommentCollapseList'
+
+
+def _read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_async_crawl_matches_sync_output():
+    """
+    测试异步爬虫并发请求时仍按页序写出与同步版完全相同的CSV
+    """
+    logger = CtripSpiderLogger("TestAsyncComments", "logs")
+
+    with MockCtripServer(total_count=200, latency=0.01) as server, tempfile.TemporaryDirectory() as tmp:
+        sync_dir = os.path.join(tmp, 'sync')
+        async_dir = os.path.join(tmp, 'async')
+
+        sync_spider = CtripCommentSpider(sync_dir, delay_range=(0, 0), logger=logger)
+        sync_spider.post_url = server.url(COMMENT_PATH)
+        assert sync_spider.crawl_comments('76865', '星海广场', max_pages=20)
+
+        async_spider = AsyncCtripCommentSpider(async_dir, delay_range=(0, 0), concurrency=8, logger=logger)
+        async_spider.post_url = server.url(COMMENT_PATH)
+        assert asyncio.run(async_spider.crawl_comments_async('76865', '星海广场', max_pages=20))
+        async_spider.close()
+
+        file_name = '76865_星海广场.csv'
+        assert _read(os.path.join(sync_dir, file_name)) == _read(os.path.join(async_dir, file_name))
+
+
+def test_close_keeps_shared_optimizer():
+    """
+    测试关闭异步爬虫时不关闭传入的共享优化器，自己创建的优化器照常关闭
+    """
+    logger = CtripSpiderLogger("TestAsyncComments", "logs")
+
+    with MockCtripServer(total_count=20) as server, tempfile.TemporaryDirectory() as tmp:
+        optimizer = EnhancedRequestOptimizer(delay_range=(0, 0), logger=logger)
+        async_spider = AsyncCtripCommentSpider(tmp, delay_range=(0, 0), logger=logger, optimizer=optimizer)
+        async_spider.post_url = server.url(COMMENT_PATH)
+        assert asyncio.run(async_spider.crawl_comments_async('76865', '星海广场', max_pages=2))
+        async_spider.close()
+        assert optimizer.session_pool.get_stats()['sessions'] == 1
+
+        # 共享同一优化器的其他爬虫仍复用原来的连接
+        sync_spider = CtripCommentSpider(tmp, delay_range=(0, 0), logger=logger, optimizer=optimizer)
+        sync_spider.post_url = server.url(COMMENT_PATH)
+        connections = server.connection_count
+        assert sync_spider.crawl_comments('76866', '老虎滩', max_pages=1)
+        assert server.connection_count == connections
+        sync_spider.close()
+        optimizer.close()
+
+        own_spider = AsyncCtripCommentSpider(tmp, delay_range=(0, 0), logger=logger)
+        own_spider.post_url = server.url(COMMENT_PATH)
+        assert asyncio.run(own_spider.crawl_comments_async('76867', '棒棰岛', max_pages=1))
+        own_spider.close()
+        assert own_spider.optimizer.session_pool.get_stats()['sessions'] == 0
+
+
+if __name__ == "__main__":
+    test_async_crawl_matches_sync_output()
+    test_close_keeps_shared_optimizer()
+    print("异步评论爬虫测试完成")
@@ -0,0 +1,129 @@
+import os
+import sys
+import sqlite3
+import logging
+import tempfile
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from Ctrip_Spider.log import CtripSpiderLogger
+from Ctrip_Spider.sqlite_sink import SQLiteSink
+from Ctrip_Spider.sight_comments import CtripCommentSpider
+from Ctrip_Spider.sight_list import CtripAttractionScraper
+from Ctrip_Spider.sight_detail import AttractionDetailFetcher
+from Ctrip_Spider.response_cache import ResponseCache
+from Ctrip_Spider.test.mock_server import MockCtripServer
+
+LOGGER = CtripSpiderLogger("TestSQLiteSink", "logs", level=logging.ERROR)
+COMMENT_PATH = '/restapi/soa2/13444/json/getCommentCollapseList'
+LIST_PATH = '/restapi/soa2/13342/json/getSightRecreationList'
+DETAIL_PATH = '/restapi/soa2/18254/json/getPoiMoreDetail'
+
+
+def make_comment(i):
+    return {
+        'commentId': 5000 + i, 'userNick': f'用户{i}', 'score': 5, 'content': f'评论{i}',
+        'publishTime': f'2024-01-{i % 28 + 1:02d} 10:00:00', 'usefulCount': i, 'replyCount': 0,
+        'touristTypeDisplay': '', 'ipLocatedName': '辽宁', 'timeDuration': '', 'imageCount': 0,
+        'imageUrls': '', 'sceneryScore': '', 'funScore': 4, 'valueScore': 4, 'recommendItems': ''
+    }
+
+
+def test_batched_writes_in_wal_mode():
+    """写入按批次提交，WAL模式下其他连接可并发读取已提交的数据"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'ctrip.db')
+        sink = SQLiteSink(db_path, batch_size=500, flush_interval=3600, logger=LOGGER)
+        assert sink.query("PRAGMA journal_mode")[0]['journal_mode'] == 'wal'
+
+        sink.add_comments('76865', '星海广场', [make_comment(i) for i in range(1200)])
+        sink.add_comments('76865', '星海广场', [make_comment(i) for i in range(1200, 1300)])
+        reader = sqlite3.connect(db_path)
+        assert reader.execute("SELECT COUNT(*) FROM comments").fetchone()[0] == 1200
+        assert sink.get_stats()['pending_rows'] == 100
+
+        # 查询前先提交待写入的行；重复写入覆盖旧记录
+        sink.add_comments('76865', '星海广场', [make_comment(0)])
+        assert sink.count_comments('76865') == 1300
+        sink.close()
+        assert reader.execute("SELECT COUNT(*) FROM comments").fetchone()[0] == 1300
+        assert reader.execute("SELECT fun_score, scenery_score FROM comments LIMIT 1").fetchone() == (4.0, None)
+        reader.close()
+
+
+def test_rows_without_id_and_failed_tables():
+    """缺少commentId的评论跳过并计数而不是互相覆盖；某个表写入失败时只丢弃该表的批次"""
+    with tempfile.TemporaryDirectory() as tmp, SQLiteSink(os.path.join(tmp, 'ctrip.db'), logger=LOGGER) as sink:
+        comments = [make_comment(i) for i in range(5)]
+        comments[1]['commentId'] = ''
+        del comments[2]['commentId']
+        sink.add_comments('76865', '星海广场', comments)
+        assert sink.count_comments('76865') == 3
+        assert sink.get_stats()['skipped_rows'] == 2
+
+        sink.add_attractions([{'poi_id': 9000001, 'name': '景点1'}, {'name': '缺少ID'}], district_id=9)
+        bad = make_comment(10)
+        bad['content'] = {'text': '无法写入的值'}
+        sink.add_comments('76865', '星海广场', [make_comment(11), bad])
+        sink.flush()
+        assert sink.get_attraction(9000001)['name'] == '景点1'
+        assert sink.count_comments('76865') == 3
+        stats = sink.get_stats()
+        assert stats['failed_rows'] == 2 and stats['skipped_rows'] == 3 and stats['rows_written'] == 4
+
+
+def test_lookups_use_indexes():
+    """按景点ID、评论ID和发布时间的查询走索引"""
+    with tempfile.TemporaryDirectory() as tmp, SQLiteSink(os.path.join(tmp, 'ctrip.db'), logger=LOGGER) as sink:
+        def plan(sql, params):
+            return ' '.join(row['detail'] for row in sink.query(f"EXPLAIN QUERY PLAN {sql}", params))
+
+        assert 'idx_comments_comment_id' in plan("SELECT * FROM comments WHERE comment_id = ?", (1,))
+        assert 'idx_comments_publish_time' in plan(
+            "SELECT * FROM comments WHERE poi_id = ? AND publish_time >= ? ORDER BY publish_time DESC", (1, ''))
+        assert 'SEARCH comments USING COVERING INDEX' in plan("SELECT COUNT(*) FROM comments WHERE poi_id = ?", (1,))
+        assert 'idx_attractions_district' in plan("SELECT * FROM attractions WHERE district_id = ?", (9,))
+
+
+def test_scrapers_write_to_shared_sink():
+    """景点列表、详情和评论写入同一个数据库，可按景点ID关联查询"""
+    with MockCtripServer(total_count=50, attraction_count=30) as server, tempfile.TemporaryDirectory() as tmp:
+        sink = SQLiteSink(os.path.join(tmp, 'ctrip.db'), logger=LOGGER)
+
+        scraper = CtripAttractionScraper(delay_range=(0, 0), logger=LOGGER, sink=sink)
+        scraper.url = server.url(LIST_PATH)
+        attractions = scraper.get_attractions_with_pagination(district_id=9, pages=3, count_per_page=10)
+        poi_id = attractions[0]['poi_id']
+
+        fetcher = AttractionDetailFetcher(delay_range=(0, 0), logger=LOGGER, optimizer=scraper.optimizer, sink=sink,
+                                          response_cache=ResponseCache(os.path.join(tmp, 'cache')))
+        fetcher.detail_url = server.url(DETAIL_PATH)
+        assert fetcher.get_detail(poi_id)['success']
+
+        spider = CtripCommentSpider(os.path.join(tmp, 'Datasets'), delay_range=(0, 0), logger=LOGGER,
+                                    optimizer=scraper.optimizer, sink=sink)
+        spider.post_url = server.url(COMMENT_PATH)
+        assert spider.crawl_comments(str(poi_id), '景点0', max_pages=3)
+
+        assert sink.query("SELECT COUNT(*) AS n FROM attractions WHERE district_id = 9")[0]['n'] == 30
+        attraction = sink.get_attraction(poi_id)
+        assert attraction['name'] == '景点0' and sorted(attraction['tags']) == ['5A景区', '海景']
+        assert attraction['telephone'] == ['0411-12345678'] and attraction['traffic'] == ['地铁2号线星海广场站', '大连站']
+
+        comments = sink.get_comments(poi_id, limit=5)
+        assert len(comments) == 5 and comments[0]['publish_time'] >= comments[-1]['publish_time']
+        assert sink.count_comments(poi_id) == 30
+        joined = sink.query(
+            "SELECT a.name, COUNT(c.comment_id) AS n, AVG(c.score) AS avg_score FROM attractions a "
+            "JOIN comments c ON c.poi_id = a.poi_id GROUP BY a.poi_id")
+        assert joined[0]['name'] == '景点0' and joined[0]['n'] == 30
+        sink.close()
+
+
+if __name__ == "__main__":
+    test_batched_writes_in_wal_mode()
+    test_rows_without_id_and_failed_tables()
+    test_lookups_use_indexes()
+    test_scrapers_write_to_shared_sink()
+    print("SQLite存储测试通过")
@@ -0,0 +1,112 @@
+import os
+import sys
+import asyncio
+import logging
+import tempfile
+from itertools import islice
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from Ctrip_Spider.log import CtripSpiderLogger
+from Ctrip_Spider.sight_comments import CtripCommentSpider
+from Ctrip_Spider.sight_comments_async import AsyncCtripCommentSpider
+from Ctrip_Spider.sight_list import CtripAttractionScraper
+from Ctrip_Spider.test.mock_server import MockCtripServer
+
+LOGGER = CtripSpiderLogger("TestStreamingIterators", "logs", level=logging.ERROR)
+COMMENT_PATH = '/restapi/soa2/13444/json/getCommentCollapseList'
+LIST_PATH = '/restapi/soa2/13342/json/getSightRecreationList'
+
+
+def make_spider(server, output_dir, spider_class=CtripCommentSpider, **kwargs):
+    spider = spider_class(output_dir, delay_range=(0, 0), logger=LOGGER, **kwargs)
+    spider.post_url = server.url(COMMENT_PATH)
+    return spider
+
+
+def test_iter_comments_fetches_lazily():
+    """只在消费到下一页时才请求，提前停止后不再请求"""
+    with MockCtripServer(total_count=100) as server, tempfile.TemporaryDirectory() as tmp:
+        spider = make_spider(server, tmp)
+        comments = spider.iter_comments('76865', max_pages=10)
+        first = list(islice(comments, 15))
+        comments.close()
+        # 总页数请求 + 第1、2页
+        assert server.request_count == 3
+        assert [c['commentId'] for c in first] == [900000000 - i for i in range(15)]
+
+        all_comments = list(spider.iter_comments('76865', max_pages=10))
+        assert len(all_comments) == 100 and not os.listdir(tmp)
+
+
+def test_aiter_comments_applies_backpressure():
+    """异步迭代器最多提前调度prefetch页，消费者停下时不再发出请求"""
+    async def consume(spider):
+        comments = spider.aiter_comments('76865', max_pages=50, prefetch=3)
+        first = [comment async for comment in _take(comments, 5)]
+        await asyncio.sleep(0.3)
+        requested = server.request_count
+        rest = [comment async for comment in comments]
+        return first + rest, requested
+
+    with MockCtripServer(total_count=500) as server, tempfile.TemporaryDirectory() as tmp:
+        spider = make_spider(server, tmp, AsyncCtripCommentSpider, concurrency=2)
+        comments, requested = asyncio.run(consume(spider))
+        spider.close()
+        # 总页数请求 + 正在消费的第1页 + 提前调度的3页
+        assert requested <= 1 + 1 + 3
+        assert [c['commentId'] for c in comments] == [900000000 - i for i in range(500)]
+
+
+async def _take(iterator, count):
+    for _ in range(count):
+        yield await iterator.__anext__()
+
+
+def test_iter_attractions_stops_at_empty_page():
+    """按页产出景点，遇到空页停止；异步版本结果一致"""
+    with MockCtripServer(attraction_count=25) as server:
+        scraper = CtripAttractionScraper(delay_range=(0, 0), logger=LOGGER)
+        scraper.url = server.url(LIST_PATH)
+        first = next(scraper.iter_attractions(9, count_per_page=10))
+        assert first['name'] == '景点0' and server.request_count == 1
+
+        attractions = list(scraper.iter_attractions(9, count_per_page=10))
+        assert len(attractions) == 25 and server.request_count == 1 + 4
+
+        async def collect():
+            return [a async for a in scraper.aiter_attractions(9, pages=2, count_per_page=10)]
+
+        assert asyncio.run(collect()) == attractions[:20]
+
+
+def test_iter_attractions_reports_failed_page():
+    """中途某页获取失败时同步和异步版本都停止并记录失败页码，可与列表结束区分"""
+    with MockCtripServer(attraction_count=50) as server:
+        scraper = CtripAttractionScraper(delay_range=(0, 0), logger=LOGGER)
+        scraper.url = server.url(LIST_PATH)
+
+        server.scripted_statuses.extend([200, 404])
+        failed_pages = []
+        attractions = list(scraper.iter_attractions(9, count_per_page=10, failed_pages=failed_pages))
+        assert len(attractions) == 10 and failed_pages == [2]
+
+        async def collect(failed):
+            return [a async for a in scraper.aiter_attractions(9, count_per_page=10, failed_pages=failed)]
+
+        server.scripted_statuses.extend([200, 404])
+        async_failed = []
+        assert asyncio.run(collect(async_failed)) == attractions and async_failed == [2]
+
+        # 没有失败时完整获取到空页
+        complete = []
+        assert len(asyncio.run(collect(complete))) == 50 and not complete
+
+
+if __name__ == "__main__":
+    test_iter_comments_fetches_lazily()
+    test_aiter_comments_applies_backpressure()
+    test_iter_attractions_stops_at_empty_page()
+    test_iter_attractions_reports_failed_page()
+    print("流式迭代接口测试通过")
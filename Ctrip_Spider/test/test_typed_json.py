@@ -0,0 +1,110 @@
+import os
+import sys
+import json
+import logging
+
+import pytest
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from Ctrip_Spider.log import CtripSpiderLogger
+from Ctrip_Spider.typed_json import decode_response
+from Ctrip_Spider.sight_comments import CtripCommentSpider
+from Ctrip_Spider.sight_detail import AttractionDetailFetcher
+from Ctrip_Spider.sight_list import CtripAttractionScraper
+from Ctrip_Spider.test.mock_server import build_attraction_item, build_comment_item, build_detail_response
+
+LOGGER = CtripSpiderLogger("TestTypedJson", "logs", level=logging.ERROR)
+
+
+def _comment_page():
+    items = [build_comment_item(i) for i in range(10)]
+    items[1]['userInfo'] = None
+    items[2]['images'] = None
+    items[3]['scores'].append({'name': '服务'})
+    del items[4]['content']
+    items.append(None)
+    for item in items[:5]:
+        if item:
+            item['commentKeywordList'] = [{'keyword': '景色', 'count': 3}]
+    return {'ResponseStatus': {'Ack': 'Success'}, 'result': {'totalCount': 10, 'items': items}}
+
+
+def _attraction_page():
+    items = [build_attraction_item(i) for i in range(20)]
+    items[0]['star'] = '5A'
+    items[1]['commentScore'] = 4
+    items[2]['imageList'] = ['https://dimg.ctrip.com/sight/2.jpg']
+    return {'result': {'totalCount': 20, 'sightRecreationList': items}}
+
+
+def _detail_response():
+    response = build_detail_response(87211)
+    response['templateList'].append({'templateName': '周边推荐', 'moduleList': [
+        {'moduleName': '附近景点', 'nearbyModule': {'poiList': [{'poiId': 1, 'distance': 120}]}}]})
+    return response
+
+
+def test_typed_decode_matches_json():
+    """类型化解码丢弃不解析的字段，三个接口的解析结果与json模块完全一致"""
+    pytest.importorskip('msgspec')
+    spider = CtripCommentSpider(delay_range=(0, 0), logger=LOGGER)
+    scraper = CtripAttractionScraper(logger=LOGGER)
+    fetcher = AttractionDetailFetcher(delay_range=(0, 0), logger=LOGGER)
+    cases = [
+        ('comments', _comment_page(), lambda data: spider._parse_comment_items(data['result']['items'], '76865', 1)),
+        ('list', _attraction_page(),
+         lambda data: [scraper._parse_poi_basic_info(poi) for poi in data['result']['sightRecreationList']]),
+        ('detail', _detail_response(), fetcher._parse_core_data),
+    ]
+    for endpoint, payload, parse in cases:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        typed = decode_response(endpoint, body, typed=True)
+        assert typed != json.loads(body)
+        assert parse(typed) == parse(json.loads(body)), endpoint
+
+    comments = decode_response('comments', json.dumps(_comment_page()).encode('utf-8'), typed=True)
+    assert 'ResponseStatus' not in comments
+    assert 'commentKeywordList' not in comments['result']['items'][0]
+    assert 'poiName' not in comments['result']['items'][0]
+    # 整数保持整数，缺失的字段不补默认值，null保留为None
+    assert isinstance(comments['result']['items'][0]['score'], int)
+    assert 'content' not in comments['result']['items'][4]
+    assert comments['result']['items'][1]['userInfo'] is None
+
+
+def test_schema_mismatch_falls_back_to_json():
+    """字段类型与结构不符（接口改版）时退回json模块解码完整响应"""
+    pytest.importorskip('msgspec')
+    payload = _comment_page()
+    payload['result']['items'][0]['commentId'] = {'value': 1}
+    body = json.dumps(payload).encode('utf-8')
+    assert decode_response('comments', body, typed=True) == json.loads(body)
+
+    body = json.dumps({'error': 'scripted 500'}).encode('utf-8')
+    assert decode_response('detail', body, typed=True) == {'error': 'scripted 500'}
+
+
+def test_invalid_json_raises_decode_error():
+    """无效JSON在两条路径上都抛出json.JSONDecodeError，调用方的异常处理不变"""
+    for typed in (True, False):
+        for endpoint in ('comments', 'detail', 'list', 'search'):
+            with pytest.raises(json.JSONDecodeError):
+                decode_response(endpoint, b'<html>502 Bad Gateway</html>', typed=typed)
+
+
+def test_untyped_decode_keeps_full_response():
+    """关闭类型化解码或其他接口时返回完整响应"""
+    body = json.dumps(_comment_page()).encode('utf-8')
+    assert decode_response('comments', body, typed=False) == json.loads(body)
+    body = json.dumps({'data': [{'id': 1, 'word': '星海广场'}]}).encode('utf-8')
+    assert decode_response('search', body, typed=True) == json.loads(body)
+
+
+if __name__ == "__main__":
+    test_typed_decode_matches_json()
+    test_schema_mismatch_falls_back_to_json()
+    test_invalid_json_raises_decode_error()
+    test_untyped_decode_keeps_full_response()
+    print("类型化解码测试通过")
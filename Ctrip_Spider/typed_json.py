@@ -0,0 +1,209 @@
+"""
+接口响应类型化解码模块
+用msgspec按只包含所需字段的结构解码评论、景点详情和景点列表接口的响应，其余字段在解码时直接跳过，
+不为其创建Python对象；解码结果转换为与json模块相同形状的字典（只含用到的字段），解析代码无需改动
+
+依赖msgspec（可选）: pip install msgspec，未安装时使用json模块解码完整响应
+"""
+import json
+import os
+from typing import Any, Dict, List, Optional, Union
+
+try:
+    import msgspec
+    from msgspec import UNSET, Struct, UnsetType
+except ImportError:
+    msgspec = None
+
+# 处理相对导入和绝对导入
+try:
+    from .config import TYPED_JSON_DECODE
+except ImportError:
+    # 直接运行时使用绝对导入
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from Ctrip_Spider.config import TYPED_JSON_DECODE
+
+
+if msgspec is not None:
+    # 字段缺失时为UNSET，转换为字典时省略，与原始响应中缺少该键一致；值为null时保留None
+    OptStr = Union[str, None, UnsetType]
+    OptInt = Union[int, None, UnsetType]
+    # 整数和小数分别保留原类型（只声明float时整数会被转换为小数）
+    OptNum = Union[int, float, None, UnsetType]
+    OptId = Union[int, str, None, UnsetType]
+    OptScalar = Union[str, int, float, bool, None, UnsetType]
+    OptStrList = Union[List[str], None, UnsetType]
+    OptList = Union[list, None, UnsetType]
+
+    # ---- getCommentCollapseList ----
+
+    class _UserInfo(Struct):
+        userNick: OptStr = UNSET
+
+    class _CommentScore(Struct):
+        name: OptStr = UNSET
+        score: OptNum = UNSET
+
+    class _CommentImage(Struct):
+        imageSrcUrl: OptStr = UNSET
+
+    class _CommentItem(Struct):
+        commentId: OptId = UNSET
+        userInfo: Union[_UserInfo, None, UnsetType] = UNSET
+        score: OptNum = UNSET
+        content: OptStr = UNSET
+        publishTime: OptStr = UNSET
+        usefulCount: OptInt = UNSET
+        replyCount: OptInt = UNSET
+        touristTypeDisplay: OptStr = UNSET
+        ipLocatedName: OptStr = UNSET
+        timeDuration: OptStr = UNSET
+        images: Union[List[Optional[_CommentImage]], None, UnsetType] = UNSET
+        scores: Union[List[Optional[_CommentScore]], None, UnsetType] = UNSET
+        recommendItems: OptStrList = UNSET
+
+    class _CommentResult(Struct):
+        totalCount: OptInt = UNSET
+        items: Union[List[Optional[_CommentItem]], None, UnsetType] = UNSET
+
+    class _CommentPage(Struct):
+        result: Union[_CommentResult, None, UnsetType] = UNSET
+
+    # ---- getPoiMoreDetail ----
+
+    class _Coordinate(Struct):
+        latitude: OptNum = UNSET
+        longitude: OptNum = UNSET
+
+    class _PoiBasicModule(Struct):
+        poiId: OptId = UNSET
+        poiName: OptStr = UNSET
+        poiEName: OptStr = UNSET
+        districtName: OptStr = UNSET
+        coordinate: Union[_Coordinate, None, UnsetType] = UNSET
+        telephoneList: OptList = UNSET
+
+    class _TicketModule(Struct):
+        ticketDesc: OptStr = UNSET
+
+    class _IntroductionModule(Struct):
+        introduction: OptStr = UNSET
+
+    class _TrafficDetail(Struct):
+        publicTransit: OptStr = UNSET
+
+    class _BigTrafficDetail(Struct):
+        poiName: OptStr = UNSET
+
+    class _TrafficModule(Struct):
+        trafficDetail: Union[List[_TrafficDetail], None, UnsetType] = UNSET
+        bigTrafficDetail: Union[List[_BigTrafficDetail], None, UnsetType] = UNSET
+
+    class _DetailModule(Struct):
+        moduleName: OptStr = UNSET
+        poiBasicModule: Union[_PoiBasicModule, None, UnsetType] = UNSET
+        ticketAndAppointmentModule: Union[_TicketModule, None, UnsetType] = UNSET
+        introductionModule: Union[_IntroductionModule, None, UnsetType] = UNSET
+        trafficModule: Union[_TrafficModule, None, UnsetType] = UNSET
+
+    class _DetailTemplate(Struct):
+        templateName: OptStr = UNSET
+        moduleList: Union[List[_DetailModule], None, UnsetType] = UNSET
+
+    class _DetailResponse(Struct):
+        templateList: Union[List[_DetailTemplate], None, UnsetType] = UNSET
+        # 只用于判断接口是否返回错误，内容原样保留
+        error: Any = UNSET
+
+    # ---- getSightRecreationList ----
+
+    class _CoordInfo(Struct):
+        gDLat: OptNum = UNSET
+        gDLon: OptNum = UNSET
+
+    class _SightItem(Struct):
+        name: OptStr = UNSET
+        eName: OptStr = UNSET
+        id: OptId = UNSET
+        poiId: OptId = UNSET
+        coordInfo: Union[_CoordInfo, None, UnsetType] = UNSET
+        resourceTags: OptList = UNSET
+        tagNameList: OptList = UNSET
+        themeTags: OptList = UNSET
+        shortFeatures: OptList = UNSET
+        price: OptScalar = UNSET
+        displayMinPrice: OptScalar = UNSET
+        commentScore: OptScalar = UNSET
+        commentCount: OptScalar = UNSET
+        coverImageUrl: OptStr = UNSET
+        address: OptStr = UNSET
+        districtName: OptStr = UNSET
+        cityName: OptStr = UNSET
+        provinceName: OptStr = UNSET
+        star: OptScalar = UNSET
+        openTime: OptScalar = UNSET
+        description: OptStr = UNSET
+        recommendDuration: OptScalar = UNSET
+
+    class _SightResult(Struct):
+        sightRecreationList: Union[List[_SightItem], None, UnsetType] = UNSET
+        totalCount: OptInt = UNSET
+
+    class _SightPage(Struct):
+        result: Union[_SightResult, None, UnsetType] = UNSET
+
+    _DECODERS = {
+        'comments': msgspec.json.Decoder(_CommentPage),
+        'detail': msgspec.json.Decoder(_DetailResponse),
+        'list': msgspec.json.Decoder(_SightPage),
+    }
+else:
+    _DECODERS = {}
+
+
+def typed_decode_available() -> bool:
+    """是否可以使用类型化解码（已安装msgspec）"""
+    return msgspec is not None
+
+
+def decode_response(endpoint: str, content: Union[bytes, str], typed: bool = None) -> Any:
+    """
+    解码接口响应
+
+    类型化解码得到的字典只包含解析时用到的字段；字段类型与结构不符（接口改版）或响应不是有效JSON时
+    改用json模块解码完整响应，无效JSON照常抛出json.JSONDecodeError
+
+    Args:
+        endpoint: 接口名称，'comments'（getCommentCollapseList）、'detail'（getPoiMoreDetail）
+            或 'list'（getSightRecreationList），其他接口直接用json模块解码
+        content: 响应体（response.content）
+        typed: 是否使用类型化解码，为None时使用配置TYPED_JSON_DECODE；未安装msgspec时忽略
+
+    Returns:
+        与json.loads相同形状的解码结果
+    """
+    if typed is None:
+        typed = TYPED_JSON_DECODE
+    decoder = _DECODERS.get(endpoint) if typed else None
+    if decoder is not None:
+        try:
+            return msgspec.to_builtins(decoder.decode(content))
+        except msgspec.MsgspecError:
+            pass
+    return json.loads(content)
+
+
+def decode_comment_page(content: Union[bytes, str], typed: bool = None) -> Dict:
+    """解码评论接口（getCommentCollapseList）的响应"""
+    return decode_response('comments', content, typed)
+
+
+def decode_detail_response(content: Union[bytes, str], typed: bool = None) -> Dict:
+    """解码景点详情接口（getPoiMoreDetail）的响应"""
+    return decode_response('detail', content, typed)
+
+
+def decode_attraction_page(content: Union[bytes, str], typed: bool = None) -> Dict:
+    """解码景点列表接口（getSightRecreationList）的响应"""
+    return decode_response('list', content, typed)
@@ -0,0 +1,68 @@
+"""
+异步评论爬虫性能基准
+在本地getCommentCollapseList替身接口上对比同步爬取与不同并发数下异步爬取的页/秒
+
+用法:
+    python benchmarks/bench_async_comments.py --pages 300 --latency 0.05 --concurrency 1 5 10 20
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Ctrip_Spider.log import CtripSpiderLogger
+from Ctrip_Spider.sight_comments import CtripCommentSpider
+from Ctrip_Spider.sight_comments_async import AsyncCtripCommentSpider
+from Ctrip_Spider.test.mock_server import MockCtripServer
+
+COMMENT_PATH = '/restapi/soa2/13444/json/getCommentCollapseList'
+
+
+def bench_sync(server: MockCtripServer, pages: int, logger: CtripSpiderLogger) -> float:
+    """同步逐页爬取，返回页/秒"""
+    with tempfile.TemporaryDirectory() as output_dir:
+        spider = CtripCommentSpider(output_dir, delay_range=(0, 0), logger=logger)
+        spider.post_url = server.url(COMMENT_PATH)
+        start_time = time.perf_counter()
+        spider.crawl_comments('76865', '星海广场', max_pages=pages)
+        elapsed = time.perf_counter() - start_time
+        spider.optimizer.close()
+    return pages / elapsed
+
+
+def bench_async(server: MockCtripServer, pages: int, concurrency: int, logger: CtripSpiderLogger) -> float:
+    """异步并发爬取，返回页/秒"""
+    with tempfile.TemporaryDirectory() as output_dir:
+        spider = AsyncCtripCommentSpider(output_dir, delay_range=(0, 0), concurrency=concurrency, logger=logger)
+        spider.post_url = server.url(COMMENT_PATH)
+        start_time = time.perf_counter()
+        asyncio.run(spider.crawl_comments_async('76865', '星海广场', max_pages=pages))
+        elapsed = time.perf_counter() - start_time
+        spider.close()
+    return pages / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="异步评论爬虫性能基准")
+    parser.add_argument('--pages', type=int, default=300, help="爬取页数")
+    parser.add_argument('--latency', type=float, default=0.05, help="替身接口每个请求的模拟耗时（秒）")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 5, 10, 20], help="要测试的并发数")
+    args = parser.parse_args()
+
+    logger = CtripSpiderLogger("BenchAsyncComments", "logs", level=logging.WARNING)
+    with MockCtripServer(total_count=(args.pages + 1) * 10, latency=args.latency) as server:
+        print(f"页数: {args.pages}, 模拟接口耗时: {args.latency * 1000:.0f}ms")
+        print(f"同步逐页:        {bench_sync(server, args.pages, logger):8.1f} 页/秒")
+        for concurrency in args.concurrency:
+            pages_per_sec = bench_async(server, args.pages, concurrency, logger)
+            print(f"异步 并发={concurrency:<4d}  {pages_per_sec:8.1f} 页/秒")
+
+
+if __name__ == "__main__":
+    main()
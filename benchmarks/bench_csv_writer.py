@@ -0,0 +1,120 @@
+"""
+评论CSV写入性能基准
+对比旧实现（每页以追加方式重新打开CSV写入10行）与长期打开的带缓冲写入器写入10万行的耗时和系统调用次数
+
+用法:
+    python benchmarks/bench_csv_writer.py --rows 100000 --flush-rows 200
+"""
+import argparse
+import csv
+import logging
+import os
+import sys
+import tempfile
+import time
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Ctrip_Spider.log import CtripSpiderLogger
+from Ctrip_Spider.csv_writer import BufferedCsvWriter
+from Ctrip_Spider.sight_comments import CtripCommentSpider
+from Ctrip_Spider.test.mock_server import build_comment_item
+
+PAGE_SIZE = 10
+# 与CtripCommentSpider._save_comments写入的列一致
+FIELDS = [
+    'commentId', 'userNick', 'score', 'content', 'publishTime', 'usefulCount', 'replyCount',
+    'touristTypeDisplay', 'ipLocatedName', 'timeDuration', 'imageCount', 'imageUrls',
+    'sceneryScore', 'funScore', 'valueScore', 'recommendItems'
+]
+
+
+def build_pages(spider: CtripCommentSpider, rows: int) -> list:
+    """按评论接口的格式生成每页10行的CSV数据"""
+    comments = spider._parse_comment_items([build_comment_item(i) for i in range(PAGE_SIZE * 10)], '76865', 1)
+    pages = []
+    for start in range(0, rows, PAGE_SIZE):
+        page = []
+        for index in range(start, min(start + PAGE_SIZE, rows)):
+            comment = comments[index % len(comments)]
+            page.append([index, '76865', '星海广场'] + [comment[field] for field in FIELDS])
+        pages.append(page)
+    return pages
+
+
+def write_reopen(file_path: str, pages: list, header: list):
+    """旧实现：每页重新打开文件追加"""
+    with open(file_path, 'w', newline='', encoding='utf-8-sig') as f:
+        csv.writer(f).writerow(header)
+    for page in pages:
+        with open(file_path, 'a', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f)
+            for row in page:
+                writer.writerow(row)
+    return len(pages) + 1
+
+
+def write_buffered(file_path: str, pages: list, header: list, flush_rows: int):
+    """新实现：文件只打开一次，缓冲满时写出"""
+    with BufferedCsvWriter(file_path, header=header, truncate=True,
+                           flush_rows=flush_rows, flush_interval=3600) as writer:
+        for page in pages:
+            writer.writerows(page)
+            if writer.flush_due():
+                writer.flush()
+    return 1
+
+
+def write_syscalls() -> int:
+    """当前进程累计的write系统调用次数（仅Linux可用）"""
+    try:
+        with open('/proc/self/io') as f:
+            for line in f:
+                if line.startswith('syscw:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return -1
+
+
+def run(write, *args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = os.path.join(tmp, 'comments.csv')
+        syscw_before = write_syscalls()
+        start_time = time.perf_counter()
+        opens = write(file_path, *args)
+        elapsed = time.perf_counter() - start_time
+        syscw = write_syscalls() - syscw_before if syscw_before >= 0 else None
+        with open(file_path, 'rb') as f:
+            data = f.read()
+    return {'elapsed': elapsed, 'opens': opens, 'writes': syscw, 'size': len(data), 'data': data}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="评论CSV写入性能基准")
+    parser.add_argument('--rows', type=int, default=100000, help="写入行数")
+    parser.add_argument('--flush-rows', type=int, default=200, help="写入器缓冲行数")
+    args = parser.parse_args()
+
+    logger = CtripSpiderLogger("BenchCsvWriter", "logs", level=logging.ERROR)
+    with tempfile.TemporaryDirectory() as output_dir:
+        spider = CtripCommentSpider(output_dir, delay_range=(0, 0), logger=logger)
+        pages = build_pages(spider, args.rows)
+        header = spider.CSV_HEADER
+
+    reopen = run(write_reopen, pages, header)
+    buffered = run(write_buffered, pages, header, args.flush_rows)
+    assert reopen['data'] == buffered['data'], "两种实现的输出不一致"
+
+    print(f"写入 {args.rows} 行（每页 {PAGE_SIZE} 行，缓冲 {args.flush_rows} 行），文件 {reopen['size'] / 1024 / 1024:.1f}MB")
+    print(f"{'实现':<10} | {'耗时(s)':>8} | {'行/秒':>10} | {'打开次数':>8} | {'write调用':>10}")
+    for name, result in (('每页重开', reopen), ('缓冲写入', buffered)):
+        writes = result['writes'] if result['writes'] is not None else 'n/a'
+        print(f"{name:<10} | {result['elapsed']:>8.3f} | {args.rows / result['elapsed']:>10.0f} | "
+              f"{result['opens']:>8} | {writes:>10}")
+    print(f"加速比: {reopen['elapsed'] / buffered['elapsed']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+景点描述HTML转文本性能基准
+对比旧实现（BeautifulSoup html.parser构建文档树后get_text）与流式提取器html_to_text的耗时，并校验输出一致
+
+语料默认按携程图文详情（introductionModule）的常见结构生成；也可用 --corpus 指定录制的JSON Lines文件，
+每行为一个getPoiMoreDetail响应、一个introductionModule对象或 {"introduction": "..."}
+
+用法:
+    python benchmarks/bench_html_text.py --count 2000
+    python benchmarks/bench_html_text.py --corpus ./Datasets/introductions.jsonl
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Ctrip_Spider.html_text import html_to_text
+
+SENTENCES = [
+    '星海广场位于大连市沙河口区，是亚洲最大的城市广场。',
+    '广场中央有全国最大的汉白玉华表，四周环绕着音乐喷泉和草坪。',
+    '傍晚时分可以在海边栈道散步，欣赏落日和跨海大桥的夜景。',
+    '建议游玩2-3小时，夏季人流较多，请注意防晒&nbsp;并看管好随身物品。',
+    '开放时间：全天开放；门票：免费&amp;部分项目另行收费。',
+]
+
+
+def build_introduction(rng: random.Random) -> str:
+    """生成一段图文详情HTML：若干段落，夹杂样式span、加粗、换行、图片和字符引用"""
+    paragraphs = []
+    for _ in range(rng.randint(3, 12)):
+        parts = []
+        for sentence in rng.sample(SENTENCES, rng.randint(1, 4)):
+            style = rng.choice([
+                '<span style="font-size: 14px; color: rgb(51, 51, 51);">{}</span>',
+                '<strong>{}</strong>',
+                '{}<br/>',
+                '<span>{}</span>&nbsp;',
+            ])
+            parts.append(style.format(sentence))
+        if rng.random() < 0.3:
+            parts.append(f'<img src="https://dimg.ctrip.com/images/{rng.randint(1, 10 ** 8)}.jpg" alt="" />')
+        paragraphs.append('<p>' + ''.join(parts) + '</p>')
+    return '\n'.join(paragraphs)
+
+
+def load_corpus(path: str) -> list:
+    """读取录制的语料，支持完整响应、introductionModule对象或只含introduction字段的对象"""
+    introductions = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if 'templateList' in record:
+                for template in record['templateList']:
+                    for module in template.get('moduleList', []):
+                        intro = module.get('introductionModule', {}).get('introduction')
+                        if intro:
+                            introductions.append(intro)
+            elif record.get('introductionModule'):
+                introductions.append(record['introductionModule'].get('introduction', ''))
+            elif record.get('introduction'):
+                introductions.append(record['introduction'])
+    return introductions
+
+
+def soup_text(markup: str) -> str:
+    """旧实现"""
+    return ' '.join(BeautifulSoup(markup, 'html.parser').get_text().split()).strip()
+
+
+def run(convert, corpus: list, repeat: int):
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        outputs = [convert(markup) for markup in corpus]
+    return time.perf_counter() - start_time, outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="景点描述HTML转文本性能基准")
+    parser.add_argument('--count', type=int, default=2000, help="生成的描述数（未指定--corpus时）")
+    parser.add_argument('--corpus', help="录制的JSON Lines语料文件")
+    parser.add_argument('--repeat', type=int, default=3, help="重复次数")
+    args = parser.parse_args()
+
+    if args.corpus:
+        corpus = load_corpus(args.corpus)
+    else:
+        rng = random.Random(42)
+        corpus = [build_introduction(rng) for _ in range(args.count)]
+    total_kb = sum(len(markup.encode('utf-8')) for markup in corpus) / 1024
+
+    soup_elapsed, expected = run(soup_text, corpus, args.repeat)
+    fast_elapsed, actual = run(html_to_text, corpus, args.repeat)
+    mismatches = sum(1 for a, b in zip(expected, actual) if a != b)
+    assert mismatches == 0, f"{mismatches} 条描述的输出与BeautifulSoup不一致"
+
+    count = len(corpus) * args.repeat
+    print(f"{len(corpus)} 条描述（{total_kb:.0f}KB），重复 {args.repeat} 次，输出全部一致")
+    print(f"{'实现':<14} | {'耗时(s)':>8} | {'条/秒':>8} | {'每条(us)':>8}")
+    for name, elapsed in (('BeautifulSoup', soup_elapsed), ('html_to_text', fast_elapsed)):
+        print(f"{name:<14} | {elapsed:>8.3f} | {count / elapsed:>8.0f} | {elapsed / count * 1e6:>8.1f}")
+    print(f"加速比: {soup_elapsed / fast_elapsed:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+接口响应解码性能基准
+对比当前路径（json模块解码完整响应后解析）与类型化解码（msgspec只解码用到的字段后解析）
+每1000页的耗时和峰值内存（tracemalloc，保留1000页的解码结果），并校验两条路径的解析结果一致
+
+语料默认用替身接口的响应生成，并补充真实响应中存在但不解析的字段（用户头像、各尺寸图片链接、
+原文链接等），使响应体积接近真实接口；也可用 --corpus 指定录制的JSON Lines文件，每行一个 --endpoint 接口的完整响应
+
+用法:
+    python benchmarks/bench_json_decode.py --pages 1000
+    python benchmarks/bench_json_decode.py --endpoint comments --corpus ./Datasets/comment_pages.jsonl
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Ctrip_Spider.log import CtripSpiderLogger
+from Ctrip_Spider.sight_comments import CtripCommentSpider
+from Ctrip_Spider.sight_detail import AttractionDetailFetcher
+from Ctrip_Spider.sight_list import CtripAttractionScraper
+from Ctrip_Spider.typed_json import decode_response, typed_decode_available
+from Ctrip_Spider.test.mock_server import build_attraction_item, build_comment_item, build_detail_response
+
+
+def pad_comment_item(item: dict, position: int) -> dict:
+    """补充评论条目中不解析的字段"""
+    comment_id = item['commentId']
+    item['userInfo'].update({
+        'userId': f'M{comment_id}', 'userImage': f'https://dimg.ctrip.com/head/{comment_id}.jpg',
+        'userMember': 'gold', 'clientAuth': f'{comment_id:x}', 'userCorrelation': {'isFollowed': False},
+    })
+    item['images'] = [dict(image, imageId=comment_id * 10 + i, width=1080, height=1440,
+                           imageThumbUrl=image['imageSrcUrl'] + '_C_180_180.jpg',
+                           imageSmallSizeUrl=image['imageSrcUrl'] + '_W_320_10000.jpg',
+                           imageMiddleSizeUrl=image['imageSrcUrl'] + '_W_640_10000.jpg',
+                           imageBigSizeUrl=image['imageSrcUrl'] + '_W_1080_10000.jpg')
+                      for i, image in enumerate(item['images'])]
+    item.update({
+        'poiId': 76865, 'poiType': 1, 'sourceType': 1, 'commentLevel': position % 3, 'isPicture': bool(item['images']),
+        'isRealUser': True, 'commentOriginalUrl': f'https://you.ctrip.com/comment/{comment_id}.html',
+        'translatedContent': None, 'replyContent': '感谢您的点评，期待再次光临' if position % 2 else '',
+        'commentKeywordList': [{'keyword': '景色', 'count': 3}, {'keyword': '停车', 'count': 1}],
+        'businessReply': None, 'childrenComments': [],
+    })
+    return item
+
+
+def build_pages(endpoint: str, pages: int) -> list:
+    """生成 pages 个响应体（UTF-8字节串）"""
+    bodies = []
+    for page in range(pages):
+        if endpoint == 'comments':
+            items = [pad_comment_item(build_comment_item(page * 10 + i), page * 10 + i) for i in range(10)]
+            payload = {'ResponseStatus': {'Ack': 'Success', 'Timestamp': '/Date(1700000000000+0800)/'},
+                       'result': {'totalCount': pages * 10, 'items': items}}
+        elif endpoint == 'list':
+            items = []
+            for i in range(20):
+                item = build_attraction_item(page * 20 + i)
+                item.update({'sightCategoryInfo': {'categoryId': 1, 'categoryName': '景点'},
+                             'imageList': [f'https://dimg.ctrip.com/sight/{page}_{i}_{n}.jpg' for n in range(5)],
+                             'heatScore': 8.2, 'isFree': False, 'hotRank': {'rankName': '大连景点热门榜', 'rank': i}})
+                items.append(item)
+            payload = {'result': {'totalCount': pages * 20, 'sightRecreationList': items}}
+        else:
+            payload = build_detail_response(1000 + page)
+            payload['templateList'].append({'templateName': '周边推荐', 'moduleList': [
+                {'moduleName': '附近景点', 'nearbyModule': {'poiList': [
+                    {'poiId': n, 'poiName': f'景点{n}', 'distance': n * 120} for n in range(20)]}}]})
+        bodies.append(json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+    return bodies
+
+
+def load_corpus(path: str) -> list:
+    """读取录制的响应，每行一个完整响应"""
+    with open(path, 'rb') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def make_parser(endpoint: str, logger: CtripSpiderLogger):
+    """返回把解码结果解析为爬虫输出的函数"""
+    if endpoint == 'comments':
+        spider = CtripCommentSpider(delay_range=(0, 0), logger=logger)
+        return lambda data: spider._parse_comment_items(data['result']['items'], '76865', 1)
+    if endpoint == 'list':
+        scraper = CtripAttractionScraper(logger=logger)
+        return lambda data: [scraper._parse_poi_basic_info(poi) for poi in data['result']['sightRecreationList']]
+    spider = AttractionDetailFetcher(logger=logger)
+    return spider._parse_core_data
+
+
+def run(bodies: list, decode, parse, repeat: int):
+    """返回 (每1000页耗时, 每1000页峰值内存, 解析结果)"""
+    best = float('inf')
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        outputs = [parse(decode(body)) for body in bodies]
+        best = min(best, time.perf_counter() - start_time)
+
+    # 保留全部解码结果，测量解码后的对象占用的峰值内存
+    tracemalloc.start()
+    decoded = [decode(body) for body in bodies]
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del decoded
+    scale = 1000 / len(bodies)
+    return best * scale, peak * scale, outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="接口响应解码性能基准")
+    parser.add_argument('--endpoint', choices=['comments', 'detail', 'list'], nargs='+',
+                        default=['comments', 'detail', 'list'], help="要测试的接口")
+    parser.add_argument('--pages', type=int, default=1000, help="生成的响应数（未指定--corpus时）")
+    parser.add_argument('--corpus', help="录制的JSON Lines响应文件（只能与一个--endpoint一起使用）")
+    parser.add_argument('--repeat', type=int, default=3, help="计时重复次数（取最好成绩）")
+    args = parser.parse_args()
+    if args.corpus and len(args.endpoint) != 1:
+        parser.error("--corpus 只能与一个 --endpoint 一起使用")
+    if not typed_decode_available():
+        print("未安装msgspec（pip install msgspec），类型化解码会退回json模块，两条路径结果相同")
+
+    logger = CtripSpiderLogger("BenchJsonDecode", "logs", level=logging.WARNING)
+    print(f"{'接口':<9} | {'路径':<6} | {'每1000页耗时(s)':>15} | {'每1000页峰值内存(MB)':>20}")
+    for endpoint in args.endpoint:
+        bodies = load_corpus(args.corpus) if args.corpus else build_pages(endpoint, args.pages)
+        parse = make_parser(endpoint, logger)
+        json_time, json_peak, expected = run(bodies, json.loads, parse, args.repeat)
+        typed_time, typed_peak, actual = run(
+            bodies, lambda body: decode_response(endpoint, body, typed=True), parse, args.repeat)
+        assert expected == actual, f"{endpoint} 接口两条路径的解析结果不一致"
+
+        size_mb = sum(len(body) for body in bodies) / len(bodies) * 1000 / 1024 / 1024
+        for name, elapsed, peak in (('json', json_time, json_peak), ('typed', typed_time, typed_peak)):
+            print(f"{endpoint:<9} | {name:<6} | {elapsed:>15.3f} | {peak / 1024 / 1024:>20.1f}")
+        print(f"{endpoint:<9} | 每1000页响应 {size_mb:.1f}MB，结果一致，"
+              f"加速比: {json_time / typed_time:.1f}x，内存: {typed_peak / json_peak:.0%}")
+
+
+if __name__ == "__main__":
+    main()
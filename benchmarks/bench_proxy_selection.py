@@ -0,0 +1,68 @@
+"""
+代理选取性能基准
+对比旧实现（每次重建可用列表/全量排序）与增量维护结构在不同代理池规模下的单次选取耗时
+
+用法:
+    python benchmarks/bench_proxy_selection.py --sizes 100 1000 10000 20000
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Ctrip_Spider.log import CtripSpiderLogger
+from Ctrip_Spider.anti_spider import ProxyPool
+
+
+def naive_random(pool: ProxyPool):
+    """旧实现的随机选取"""
+    active_proxies = [p for p in pool.proxies if pool.proxy_stats[p]['is_active']]
+    return random.choice(active_proxies) if active_proxies else None
+
+
+def naive_least_used(pool: ProxyPool):
+    """旧实现的最少使用选取"""
+    active_proxies = [p for p in pool.proxies if pool.proxy_stats[p]['is_active']]
+    active_proxies.sort(key=lambda p: pool.proxy_stats[p]['success_count'])
+    return active_proxies[0] if active_proxies else None
+
+
+def time_per_call(select, pool: ProxyPool, rounds: int) -> float:
+    """每轮选取一次并标记成功，返回平均每轮耗时（微秒）"""
+    start_time = time.perf_counter()
+    for _ in range(rounds):
+        proxy = select(pool)
+        pool.mark_success(proxy)
+    return (time.perf_counter() - start_time) / rounds * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="代理选取性能基准")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000, 20000], help="代理池规模")
+    parser.add_argument('--rounds', type=int, default=2000, help="每种实现的选取次数")
+    args = parser.parse_args()
+
+    logger = CtripSpiderLogger("BenchProxySelection", "logs", level=logging.ERROR)
+    print(f"{'代理数':>8} | {'旧随机(us)':>10} | {'新随机(us)':>10} | {'旧最少使用(us)':>14} | {'新最少使用(us)':>14}")
+    for size in args.sizes:
+        proxies = [f'http://10.{i // 65536}.{i // 256 % 256}.{i % 256}:8080' for i in range(size)]
+        results = []
+        for select in (naive_random, ProxyPool.get_random_proxy, naive_least_used, ProxyPool.get_round_robin_proxy):
+            pool = ProxyPool(proxies, logger=logger)
+            # 让约10%的代理处于不可用状态
+            for proxy in proxies[::10]:
+                pool.mark_fail(proxy, max_fails=1)
+            # 旧实现在大池上太慢，按规模减少轮数
+            rounds = args.rounds if select in (ProxyPool.get_random_proxy, ProxyPool.get_round_robin_proxy) \
+                else max(20, args.rounds * 100 // size)
+            results.append(time_per_call(select, pool, rounds))
+        print(f"{size:>8} | {results[0]:>10.1f} | {results[1]:>10.1f} | {results[2]:>14.1f} | {results[3]:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+连接池性能基准
+对比每次请求新建连接（模块级requests.post）与共享keep-alive连接池爬取1000页评论的耗时
+
+用法:
+    python benchmarks/bench_session_pool.py --pages 1000 --handshake-delay 0.005
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import requests
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Ctrip_Spider.log import CtripSpiderLogger
+from Ctrip_Spider.sight_comments import CtripCommentSpider
+from Ctrip_Spider.test.mock_server import MockCtripServer
+
+
+def run_crawl(server: MockCtripServer, pages: int, pooled: bool) -> dict:
+    """在替身服务器上爬取指定页数，返回耗时和新建连接数"""
+    logger = CtripSpiderLogger("BenchSessionPool", "logs", level=logging.WARNING)
+    with tempfile.TemporaryDirectory() as output_dir:
+        spider = CtripCommentSpider(output_dir=output_dir, delay_range=(0, 0), logger=logger)
+        spider.post_url = server.url('/restapi/soa2/13444/json/getCommentCollapseList')
+        if not pooled:
+            # 旧实现：每次请求都走模块级requests.request，无法复用连接
+            spider.optimizer.send = lambda method, url, **kwargs: requests.request(method, url, **kwargs)
+
+        connections_before = server.connection_count
+        start_time = time.perf_counter()
+        spider.crawl_comments('76865', '星海广场', max_pages=pages)
+        elapsed = time.perf_counter() - start_time
+        spider.optimizer.close()
+
+    return {
+        'elapsed': elapsed,
+        'connections': server.connection_count - connections_before
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="连接池性能基准")
+    parser.add_argument('--pages', type=int, default=1000, help="爬取页数")
+    parser.add_argument('--handshake-delay', type=float, default=0.005,
+                        help="每个新连接的模拟握手耗时（秒），用于近似TCP+TLS握手的往返时间")
+    args = parser.parse_args()
+
+    with MockCtripServer(total_count=(args.pages + 1) * 10, handshake_delay=args.handshake_delay) as server:
+        baseline = run_crawl(server, args.pages, pooled=False)
+        pooled = run_crawl(server, args.pages, pooled=True)
+
+    saved = baseline['elapsed'] - pooled['elapsed']
+    print(f"页数: {args.pages}, 模拟握手耗时: {args.handshake_delay * 1000:.1f}ms")
+    print(f"每次新建连接: {baseline['elapsed']:.2f}s, 新建连接 {baseline['connections']} 个")
+    print(f"共享连接池:   {pooled['elapsed']:.2f}s, 新建连接 {pooled['connections']} 个")
+    print(f"节省握手耗时: {saved:.2f}s ({saved / baseline['elapsed'] * 100:.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
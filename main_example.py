@@ -158,9 +158,12 @@ def example_1_search_sight_id():
     print("\n开始搜索景点ID... / Starting to search attraction IDs...")
     results = {}
     
-    for keyword in keywords:
+    # 批量搜索：去重后并发请求，已搜索过的关键词直接从本地映射读取，结果与输入顺序对应
+    # Batch search: deduplicated, resolved concurrently, previously seen keywords served locally, input order kept
+    sight_ids = sight_id_searcher.search_sight_ids(keywords)
+    
+    for keyword, sight_id in zip(keywords, sight_ids):
         print(f"\n搜索关键词 / Searching keyword: {keyword}")
-        sight_id = sight_id_searcher.search_sight_id(keyword)
         
         if sight_id:
             results[keyword] = sight_id
@@ -168,6 +171,7 @@ def example_1_search_sight_id():
         else:
             print(f"  ✗ 未找到景点 / Attraction not found")
     
+    sight_id_searcher.close()
     return results
 
 
@@ -377,65 +381,56 @@ def example_5_complete_workflow():
     
     print(f"✓ 找到景点ID / Found attraction ID: {sight_id}")
     
-    # 步骤2: 获取景点列表（可选，如果需要POI ID）/ Step 2: Get Attraction List (optional, if POI ID needed)
-    print("\n[步骤2 / Step 2] 获取景点列表 / Getting Attraction List...")
+    # 步骤2: 通过地区景点索引查找POI ID / Step 2: Look up POI ID in the district attraction index
+    # 首次查询时翻页构建索引并保存到 Datasets/.attraction_index/，之后直接命中本地索引
+    # The first lookup builds the index from a full pagination sweep; later lookups are local hits
+    print("\n[步骤2 / Step 2] 查找景点POI ID / Looking up Attraction POI ID...")
     scraper = CtripAttractionScraper(
         timeout=10,
         delay_range=(1, 2),
         use_user_agent_rotation=True,
         logger=logger
     )
-    attractions = scraper.get_attractions_list(district_id=9, page=1, count=10)
+    target_attraction = scraper.get_attraction_by_id(district_id=9, attraction_id=sight_id)
     
-    if attractions:
-        print(f"✓ 获取到 {len(attractions)} 个景点 / Retrieved {len(attractions)} attractions")
-        # 找到匹配的景点 / Find matching attraction
-        target_attraction = None
-        for attr in attractions:
-            if attr.get('id') == sight_id:
-                target_attraction = attr
-                break
+    if target_attraction:
+        poi_id = target_attraction.get('poi_id')
+        poi_name = target_attraction.get('name')
+        print(f"✓ 找到目标景点 / Found target attraction: {poi_name} (POI ID: {poi_id})")
+        
+        # 步骤3: 获取景点详情 / Step 3: Get Attraction Details
+        print("\n[步骤3 / Step 3] 获取景点详情 / Getting Attraction Details...")
+        detail_fetcher = AttractionDetailFetcher(
+            delay_range=(1, 2),
+            use_user_agent_rotation=True,
+            logger=logger
+        )
+        detail = detail_fetcher.get_detail(poi_id)
+        
+        if detail.get('success'):
+            print(f"✓ 成功获取详情 / Successfully fetched details")
+            print(f"  描述 / Description: {detail.get('description', '')[:100]}...")
+        
+        # 步骤4: 爬取评论 / Step 4: Scrape Comments
+        print("\n[步骤4 / Step 4] 爬取评论 / Scraping Comments...")
+        comment_spider = CtripCommentSpider(
+            output_dir='./Datasets',
+            delay_range=(1, 2),
+            use_user_agent_rotation=True,
+            logger=logger
+        )
+        success = comment_spider.crawl_comments(
+            poi_id=str(poi_id),
+            poi_name=poi_name,
+            max_pages=2  # 爬取2页作为示例 / Scrape 2 pages as example
+        )
         
-        if target_attraction:
-            poi_id = target_attraction.get('poi_id')
-            poi_name = target_attraction.get('name')
-            print(f"✓ 找到目标景点 / Found target attraction: {poi_name} (POI ID: {poi_id})")
-            
-            # 步骤3: 获取景点详情 / Step 3: Get Attraction Details
-            print("\n[步骤3 / Step 3] 获取景点详情 / Getting Attraction Details...")
-            detail_fetcher = AttractionDetailFetcher(
-                delay_range=(1, 2),
-                use_user_agent_rotation=True,
-                logger=logger
-            )
-            detail = detail_fetcher.get_detail(poi_id)
-            
-            if detail.get('success'):
-                print(f"✓ 成功获取详情 / Successfully fetched details")
-                print(f"  描述 / Description: {detail.get('description', '')[:100]}...")
-            
-            # 步骤4: 爬取评论 / Step 4: Scrape Comments
-            print("\n[步骤4 / Step 4] 爬取评论 / Scraping Comments...")
-            comment_spider = CtripCommentSpider(
-                output_dir='./Datasets',
-                delay_range=(1, 2),
-                use_user_agent_rotation=True,
-                logger=logger
-            )
-            success = comment_spider.crawl_comments(
-                poi_id=str(poi_id),
-                poi_name=poi_name,
-                max_pages=2  # 爬取2页作为示例 / Scrape 2 pages as example
-            )
-            
-            if success:
-                print(f"✓ 评论爬取完成，数据保存在 / Comment scraping completed, data saved in: ./Datasets/")
-            else:
-                print("✗ 评论爬取失败 / Comment scraping failed")
+        if success:
+            print(f"✓ 评论爬取完成，数据保存在 / Comment scraping completed, data saved in: ./Datasets/")
         else:
-            print("未在列表中找到匹配的景点 / Matching attraction not found in list")
+            print("✗ 评论爬取失败 / Comment scraping failed")
     else:
-        print("未获取到景点列表 / No attraction list retrieved")
+        print("未在地区景点中找到匹配的景点 / Matching attraction not found in district")
 
 
 def main():
@@ -481,7 +476,11 @@ def main():
         print("  - 日志文件 / Log Files: ./logs/*.log")
         
     except KeyboardInterrupt:
+        # 评论检查点（Datasets/.checkpoints）在每次CSV写出时保存（每CSV_FLUSH_ROWS行或CSV_FLUSH_INTERVAL秒）；
+        # Ctrl+C中断时会写出已完成的页面并推进检查点，重新运行从最后完成的页继续。
+        # 进程被强制结束时只能从上一次写出处继续，最多重新爬取约CSV_FLUSH_ROWS行对应的页面
         print("\n\n用户中断程序 / User interrupted program")
+        print("评论爬取进度已保存，重新运行将从中断处继续 / Comment progress saved, re-run to resume")
     except Exception as e:
         print(f"\n\n发生错误 / Error occurred: {e}")
         import traceback
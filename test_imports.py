@@ -29,6 +29,9 @@ try:
     from Ctrip_Spider.sight_comments import CtripCommentSpider
     print("✓ sight_comments 模块导入成功")
     
+    from Ctrip_Spider.sight_comments_async import AsyncCtripCommentSpider
+    print("✓ sight_comments_async 模块导入成功")
+    
     print("\n所有模块导入成功！")
     
 except ImportError as e: